@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Import time report and startup regression check for the GUI.
+Runs the startup imports in a fresh interpreter with -X importtime; tests/test_startup.py
+runs the same check with pytest.
+
+Usage:
+    python benchmarks/bench_import_time.py            # report the slowest imports
+    python benchmarks/bench_import_time.py --check    # fail if the import budget is exceeded
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# What the GUI imports before the first paint: main plus the first tab
+STARTUP_IMPORTS = "import main; import ui.leaders_tab"
+
+# Budget for the startup imports, median of several fresh interpreters; 65-90 ms measured.
+# Slower machines (CI, the old camp laptops) can raise it with KAMP_IMPORT_BUDGET_MS.
+IMPORT_BUDGET_MS = float(os.environ.get("KAMP_IMPORT_BUDGET_MS", 100))
+
+# Modules that must only be loaded when the user reaches the feature using them
+DEFERRED_MODULES = (
+    "ui.receipts_tab",
+    "ui.pa_tab",
+    "ui.poef_tab",
+    "ui.camps_tab",
+    "services.archive_service",
+    "services.integrity_service",
+    "utils.sql_trace",
+    "logging.handlers",
+    "pathlib",
+    "gzip",
+    "hashlib",
+    "services.export_service",
+    "services.xlsx_service",
+    "services.statement_service",
+    "tkinter.filedialog",
+    "csv",
+    "zipfile",
+    "concurrent.futures",
+    "urllib.request",
+)
+
+def run_importtime():
+    """Run the startup imports with -X importtime and return [(self us, cumulative us, module)]."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_IMPORTS],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((int(self_us), int(cumulative_us), name.strip()))
+    return entries
+
+def measure_startup_ms(runs: int) -> float:
+    """Median wall time of the startup imports over several fresh interpreters."""
+    code = f"import time; t = time.perf_counter(); {STARTUP_IMPORTS}; print((time.perf_counter() - t) * 1000)"
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+        timings.append(float(result.stdout.strip()))
+    return statistics.median(timings)
+
+def find_loaded_deferred_modules():
+    """Return the deferred modules that were actually executed during startup."""
+    code = (
+        f"import sys, types; {STARTUP_IMPORTS}; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} "
+        # Lazily imported modules stay a subclass of ModuleType until first use
+        f"if m in sys.modules and type(sys.modules[m]) is types.ModuleType))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    return [name for name in result.stdout.strip().split(",") if name]
+
+def report(top: int):
+    """Print the total startup import time and the slowest modules."""
+    entries = run_importtime()
+    total_us = sum(self_us for self_us, _, _ in entries)
+    print(f"Startup imports: {total_us / 1000:.1f} ms over {len(entries)} modules")
+    print(f"{'self ms':>9} {'cumul. ms':>10}  module")
+    for self_us, cumulative_us, name in sorted(entries, key=lambda e: e[0], reverse=True)[:top]:
+        print(f"{self_us / 1000:>9.1f} {cumulative_us / 1000:>10.1f}  {name}")
+
+def check(runs: int, budget_ms: float) -> int:
+    """Check the startup import budget and deferred modules; return the exit code."""
+    failures = []
+
+    startup_ms = measure_startup_ms(runs)
+    print(f"Startup imports: {startup_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+    if startup_ms > budget_ms:
+        failures.append(f"startup imports take {startup_ms:.1f} ms, budget is {budget_ms:.0f} ms")
+
+    loaded = find_loaded_deferred_modules()
+    if loaded:
+        failures.append(f"modules loaded at startup that should be deferred: {', '.join(loaded)}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Startup import check passed")
+    return 1 if failures else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Report or check the GUI startup import time.")
+    parser.add_argument("--check", action="store_true", help="Fail when the budget is exceeded")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time for --check")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=20, help="Number of modules to list in the report")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(check(args.runs, args.budget_ms))
+    report(args.top)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the streaming XLSX export.
+Fills a temporary database with N receipt items and measures export time and peak memory.
+
+Usage: python benchmarks/bench_xlsx.py [--rows 1000000]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then not reported
+    resource = None
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services.data_service import DataService
+from services.xlsx_service import XLSXExporter
+
+ITEMS_PER_RECEIPT = 50
+CATEGORIES = ("Groepskas", "POEF", "PA")
+
+def fill_database(db_path: str, rows: int):
+    """Insert rows receipt items spread over receipts, in one transaction."""
+    receipts = (rows + ITEMS_PER_RECEIPT - 1) // ITEMS_PER_RECEIPT
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO receipts (id, date, store_name, total_amount) VALUES (?, ?, 'Colruyt', ?)",
+            ((f"r{r}", "2025-07-15", ITEMS_PER_RECEIPT * 2.5) for r in range(receipts))
+        )
+        conn.executemany(
+            "INSERT INTO receipt_items (id, name, price, quantity, category, date, receipt_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((f"i{i}", f"Item {i}", 2.5, 1.0, CATEGORIES[i % 3], "2025-07-15", f"r{i // ITEMS_PER_RECEIPT}") for i in range(rows))
+        )
+        conn.executemany(
+            "INSERT INTO leaders (id, name, poef_drink_count, poef_cigarette_count) VALUES (?, ?, ?, ?)",
+            ((f"l{l}", f"Leader {l}", l % 40, l % 3) for l in range(100))
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the XLSX export.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of receipt items")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        data_service = DataService(data_dir)
+        start = time.perf_counter()
+        fill_database(data_service.db_path, args.rows)
+        print(f"Filled database with {args.rows} items in {time.perf_counter() - start:.1f} s")
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+        output = os.path.join(data_dir, "bench.xlsx")
+        start = time.perf_counter()
+        counts = XLSXExporter(data_service.db_path).export(output)
+        elapsed = time.perf_counter() - start
+
+        total_rows = sum(counts.values())
+        print(f"Exported {total_rows} rows in {elapsed:.1f} s ({total_rows / elapsed:,.0f} rows/s)")
+        print(f"Workbook size: {os.path.getsize(output) / 1024 / 1024:.1f} MB")
+        if resource:
+            # ru_maxrss is in KB on Linux
+            rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            print(f"Peak RSS growth during export: {(rss_after - rss_before) / 1024:.1f} MB")
+
+if __name__ == "__main__":
+    main()
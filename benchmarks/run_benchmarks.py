@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for Kamp Finances.
+Times the data, finance and UI hot paths on a generated camp and writes the results to JSON.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--preset small] [--repeat 5] [--output results.json]
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+
+The UI benchmarks need a display; on a headless machine run the suite under
+xvfb-run, otherwise they are reported as skipped.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from services.data_service import DataService
+from services.finance_service import FinanceService
+from services.integrity_service import check_integrity
+from services.data_generator import generate_camp, CAMP_START
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# A benchmark is a regression when its median is this much slower than the baseline
+DEFAULT_THRESHOLD = 0.20
+
+# Differences below this are noise, whatever the percentage
+MIN_REGRESSION_MS = 1.0
+
+def time_call(func, repeat: int, setup=None) -> dict:
+    """Run func repeat times (after setup, which is not timed) and summarize the timings in ms."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+def machine_info() -> dict:
+    """Describe the machine and runtime the results were measured on."""
+    info = {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+    }
+    try:
+        import tkinter
+        info["tk"] = str(tkinter.TkVersion)
+    except ImportError:
+        info["tk"] = None
+    return info
+
+def bench_data(data_service: DataService, repeat: int) -> dict:
+    """Benchmark DataService and FinanceService."""
+    results = {}
+    finance_service = FinanceService(data_service)
+
+    # A new DataService per run so nothing is reused between runs
+    results["load_leaders"] = time_call(lambda: DataService(data_service.data_dir).load_leaders(), repeat)
+    results["load_receipts"] = time_call(lambda: DataService(data_service.data_dir).load_receipts(), repeat)
+
+    leaders = data_service.load_leaders()
+    receipts = data_service.load_receipts()
+
+    def change_one_leader():
+        leaders[0].paid_amount += 1.0
+
+    results["save_all_data_one_change"] = time_call(
+        lambda: data_service.save_all_data(leaders, receipts), repeat, setup=change_one_leader
+    )
+    results["generate_summary_report"] = time_call(
+        lambda: finance_service.generate_summary_report(leaders, receipts), repeat
+    )
+    results["calculate_daily_totals"] = time_call(
+        lambda: finance_service.calculate_daily_totals(receipts, CAMP_START.isoformat()), repeat
+    )
+    results["check_integrity"] = time_call(lambda: check_integrity(leaders, receipts), repeat)
+    return results
+
+def bench_ui(repeat: int) -> dict:
+    """Benchmark tab refreshes and the leader summary in a withdrawn main window.
+
+    Must run with the generated camp in ./data, which is where MainWindow looks.
+    """
+    import tkinter as tk
+    from ui.main_window import MainWindow
+    from ui.base_components import DataTable
+
+    try:
+        window = MainWindow()
+    except tk.TclError as e:
+        return {"skipped": f"no display ({e})"}
+    window.withdraw()
+
+    try:
+        # Let the background load finish
+        while not window.data_loaded:
+            window.update()
+            time.sleep(0.005)
+
+        def drain(tab):
+            """Process events until every streaming table of the tab is filled."""
+            tables = [value for value in vars(tab).values() if isinstance(value, DataTable)]
+            while any(table.renderer.is_running() for table in tables):
+                window.update()
+
+        results = {}
+        for attr, _, _ in window.tab_specs:
+            tab = window.ensure_tab(attr)
+            drain(tab)
+
+            def refresh(tab=tab):
+                tab.refresh_data()
+                drain(tab)
+
+            results[f"{attr}.refresh_data"] = time_call(refresh, repeat)
+
+        leaders_tab = window.leaders_tab
+        leaders_tab.selected_leader = max(window.leaders, key=lambda leader: len(leader.pa_purchases))
+
+        def forget_summary():
+            leaders_tab.summary_cache.forget(leaders_tab.selected_leader.id)
+            leaders_tab._summary_leader_id = None
+
+        results["leaders_tab.populate_detailed_summary"] = time_call(
+            leaders_tab.populate_detailed_summary, repeat, setup=forget_summary
+        )
+        results["leaders_tab.populate_detailed_summary_cached"] = time_call(
+            leaders_tab.populate_detailed_summary, repeat
+        )
+        return results
+    finally:
+        window.destroy()
+
+def run_suite(preset: str, seed: int, repeat: int, include_ui: bool) -> dict:
+    """Generate a camp in a temporary folder and run all benchmarks on it."""
+    results = {}
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_service = DataService(os.path.join(temp_dir, "data"))
+        start = time.perf_counter()
+        counts = generate_camp(data_service, preset, seed=seed)
+        print(f"Generated '{preset}' camp in {time.perf_counter() - start:.1f} s: {counts}")
+
+        results.update(bench_data(data_service, repeat))
+
+        try:
+            from bench_import_time import measure_startup_ms
+            results["startup_imports"] = {"runs": repeat, "median_ms": round(measure_startup_ms(repeat), 3)}
+        except Exception as e:
+            results["startup_imports"] = {"skipped": str(e)}
+
+        if include_ui:
+            os.chdir(temp_dir)
+            try:
+                ui_results = bench_ui(repeat)
+            finally:
+                os.chdir(previous_dir)
+            if "skipped" in ui_results:
+                results["ui"] = ui_results
+            else:
+                results.update(ui_results)
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "preset": preset,
+        "seed": seed,
+        "counts": counts,
+        "results": results,
+    }
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Print the change per benchmark against a baseline and return the number of regressions."""
+    if current["preset"] != baseline.get("preset"):
+        print(f"⚠️  Comparing preset '{current['preset']}' against baseline preset '{baseline.get('preset')}'")
+    if current["machine"] != baseline.get("machine"):
+        print("⚠️  Baseline was measured on a different machine or runtime")
+
+    regressions = 0
+    print(f"{'benchmark':<48} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if "median_ms" not in result or not base or "median_ms" not in base:
+            continue
+        change = (result["median_ms"] - base["median_ms"]) / base["median_ms"] if base["median_ms"] else 0.0
+        regressed = change > threshold and result["median_ms"] - base["median_ms"] > MIN_REGRESSION_MS
+        regressions += regressed
+        marker = "  ❌ regression" if regressed else ""
+        print(f"{name:<48} {base['median_ms']:>8.1f}ms {result['median_ms']:>8.1f}ms {change:>+7.0%}{marker}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Kamp Finances benchmark suite.")
+    parser.add_argument("--preset", default="small", help="Generated camp size (tiny, small, medium, large, federation)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark")
+    parser.add_argument("--no-ui", action="store_true", help="Skip the UI benchmarks")
+    parser.add_argument("--output", help="JSON file for the results (default: benchmarks/results/<preset>_<time>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a stored results file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    report = run_suite(args.preset, args.seed, args.repeat, include_ui=not args.no_ui)
+
+    for name, result in report["results"].items():
+        if "median_ms" in result:
+            print(f"  {name:<48} {result['median_ms']:>10.1f} ms")
+        else:
+            print(f"  {name:<48} skipped: {result['skipped']}")
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{args.preset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {regressions} benchmark(s) regressed more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+if __name__ == "__main__":
+    main()
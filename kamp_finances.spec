@@ -19,18 +19,28 @@ a = Analysis(
         'datetime',
         'typing',
         'dataclasses',
-        'src.main',
-        'src.models.leader',
-        'src.models.receipt',
-        'src.models.expense',
-        'src.services.data_service',
-        'src.services.finance_service',
-        'src.ui.main_window',
-        'src.ui.tabs.leaders_tab',
-        'src.ui.tabs.receipts_tab',
-        'src.ui.tabs.pa_items_tab',
-        'src.ui.tabs.poef_tab',
-        'src.ui.components.base_components',
+        # Entry points run.py imports after adding src to sys.path; names are relative to pathex
+        'main',
+        'cli',
+        'ui.main_window',
+        # Loaded from strings (tabs by name, services and stdlib modules through lazy_import),
+        # so the analysis cannot find them
+        'ui.leaders_tab',
+        'ui.receipts_tab',
+        'ui.pa_tab',
+        'ui.poef_tab',
+        'ui.camps_tab',
+        'ui.performance_tab',
+        'services.export_service',
+        'services.xlsx_service',
+        'services.backup_service',
+        'services.sync_service',
+        'services.archive_service',
+        'services.integrity_service',
+        'services.statement_service',
+        'gzip',
+        'hashlib',
+        'json',
     ],
     hookspath=[],
     hooksconfig={},
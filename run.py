@@ -3,6 +3,7 @@
 Launcher script for Kamp Finances application.
 """
 
+import multiprocessing
 import sys
 import os
 
@@ -10,7 +11,12 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 def main():
-    """Launch the Kamp Finances application."""
+    """Launch the Kamp Finances application, or run a CLI subcommand if arguments are given."""
+    if len(sys.argv) > 1:
+        # Batch commands never import tkinter or the UI
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    
     try:
         from main import main as app_main
         print("🚀 Starting Kamp Finances...")
@@ -24,4 +30,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Needed for the statement export process pool in frozen builds
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
@@ -0,0 +1,459 @@
+"""
+Command line interface for Kamp Finances application.
+Runs batch jobs without tkinter: python run.py <subcommand> [options]
+
+Only argparse is imported at module level; every subcommand imports the
+services it needs when it runs, so `--help` stays fast.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+from utils.paths import DEFAULT_DATA_DIR
+
+def cmd_import(args) -> int:
+    """Import leaders or receipt items from a CSV file."""
+    from services.data_service import DataService
+    from services import import_service
+
+    data_service = DataService(args.data_dir)
+    if args.kind == "leaders":
+        result = import_service.import_leaders(data_service, args.file)
+        print(f"✅ Imported {result['imported']} leaders ({result['skipped']} skipped)")
+    else:
+        result = import_service.import_receipts(data_service, args.file)
+        print(f"✅ Imported {result['items']} items in {result['receipts']} receipts")
+    return 0
+
+def cmd_export(args) -> int:
+    """Export the database as CSV files, an Excel workbook or leader statements."""
+    from services.data_service import DataService
+
+    data_service = DataService(args.data_dir)
+    start = time.perf_counter()
+
+    if args.format == "csv":
+        from services.export_service import CSVExporter
+        exporter = CSVExporter(data_service.db_path, delimiter=args.delimiter, decimal_comma=args.decimal_comma)
+        paths = list(exporter.export_all(args.output).values())
+    elif args.format == "xlsx":
+        from services.xlsx_service import XLSXExporter
+        XLSXExporter(data_service.db_path).export(args.output)
+        paths = [args.output]
+    else:
+        from services import statement_service
+        snapshot = statement_service.build_snapshot(data_service.load_leaders(), data_service.load_receipts())
+        if not args.zip:
+            os.makedirs(args.output, exist_ok=True)
+        paths = [statement_service.export_statements(snapshot, args.output, as_zip=args.zip)]
+
+    for path in paths:
+        print(f"  {path}")
+    print(f"✅ Export finished in {time.perf_counter() - start:.1f} s")
+    return 0
+
+def cmd_report(args) -> int:
+    """Print the camp summary, or the statement of one leader."""
+    from services.data_service import DataService
+    from services import archive_service
+
+    summary_path = archive_service.archived_summary_path(args.data_dir)
+    if summary_path:
+        if args.leader:
+            print("❌ This camp is archived; restore it with 'camp unarchive' for leader statements")
+            return 1
+        return print_archived_report(archive_service.read_summary(summary_path))
+
+    data_service = DataService(args.data_dir)
+    leaders = data_service.load_leaders()
+    receipts = data_service.load_receipts()
+
+    if args.leader:
+        from services import statement_service
+        matches = [leader for leader in leaders if leader.name.lower() == args.leader.lower()]
+        if not matches:
+            print(f"❌ No leader named '{args.leader}'")
+            return 1
+        snapshot = statement_service.build_snapshot(leaders, receipts)
+        print(statement_service.render_statement(snapshot, matches[0].id, "txt"))
+        return 0
+
+    total_groepskas = sum(receipt.groepskas_total for receipt in receipts)
+    total_poef = sum(receipt.poef_total for receipt in receipts)
+    total_pa = sum(receipt.pa_total for receipt in receipts)
+
+    print(f"KAMP SUMMARY - {time.strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 50)
+    print(f"Receipts: {len(receipts)}")
+    print(f"Groepskas: €{total_groepskas:.2f}")
+    print(f"POEF: €{total_poef:.2f}")
+    print(f"PA: €{total_pa:.2f}")
+    print(f"Grand Total: €{total_groepskas + total_poef + total_pa:.2f}")
+    print()
+    print(f"{'Leader':<25} {'PA':>10} {'POEF':>10} {'Total':>10} {'Paid':>10} {'Remaining':>10}")
+    print("-" * 80)
+    for leader in leaders:
+        print(f"{leader.name[:25]:<25} {leader.total_pa_expenses:>10.2f} {leader.get_poef_total():>10.2f} "
+              f"{leader.get_total_expenses():>10.2f} {leader.paid_amount:>10.2f} {leader.get_remaining_to_pay():>10.2f}")
+    return 0
+
+def print_archived_report(summary: dict) -> int:
+    """Print the camp summary of an archived camp from its precomputed totals."""
+    info, camp = summary["info"], summary["camp"]
+    print(f"KAMP SUMMARY - {info['name']} (archived {info['archived_at']})")
+    print("=" * 50)
+    print(f"Receipts: {camp['receipts']}")
+    print(f"Groepskas: €{camp['groepskas']:.2f}")
+    print(f"POEF: €{camp['poef']:.2f}")
+    print(f"PA: €{camp['pa']:.2f}")
+    print(f"Grand Total: €{camp['groepskas'] + camp['poef'] + camp['pa']:.2f}")
+    print()
+    print(f"{'Leader':<25} {'PA':>10} {'POEF':>10} {'Total':>10} {'Paid':>10} {'Remaining':>10}")
+    print("-" * 80)
+    for leader in summary["leaders"]:
+        poef = leader["charged"] - leader["total_pa_expenses"]
+        print(f"{leader['name'][:25]:<25} {leader['total_pa_expenses']:>10.2f} {poef:>10.2f} "
+              f"{leader['charged']:>10.2f} {leader['paid_amount']:>10.2f} {leader['charged'] - leader['paid_amount']:>10.2f}")
+    return 0
+
+def cmd_backup(args) -> int:
+    """Back up the database, list the backups or apply the retention policy."""
+    from services.data_service import DataService
+    from services.backup_service import BackupService
+
+    service = BackupService(DataService(args.data_dir).db_path)
+    if args.list:
+        for backup in service.list_backups():
+            print(f"{backup.created:%Y-%m-%d %H:%M:%S}  {backup.size / 1024:>8.0f} KB  {backup.path}")
+        return 0
+
+    if not args.prune_only:
+        path = service.create_backup(compress=args.gzip)
+        print(f"✅ Backup written to {path}")
+    removed = service.prune(args.keep_last, args.hourly, args.daily)
+    if removed:
+        print(f"🗑️  Removed {len(removed)} old backup(s)")
+    return 0
+
+def cmd_restore(args) -> int:
+    """Restore the database from a verified backup."""
+    from services.data_service import DataService
+    from services.backup_service import BackupService
+
+    service = BackupService(DataService(args.data_dir).db_path)
+    backup_path = args.file
+    if backup_path == "latest":
+        backups = service.list_backups()
+        if not backups:
+            print("❌ No backups found")
+            return 1
+        backup_path = backups[0].path
+    safety_path = service.restore(backup_path)
+    print(f"✅ Restored {backup_path} (previous database saved as {safety_path})")
+    return 0
+
+def cmd_sync(args) -> int:
+    """Export or import a changeset for syncing with another laptop."""
+    from services.data_service import DataService
+    from services.sync_service import SyncService
+
+    if args.action in ("export", "import") and not args.file:
+        print(f"❌ sync {args.action} needs a changeset file")
+        return 1
+
+    service = SyncService(DataService(args.data_dir).db_path)
+    if args.action == "export":
+        header = service.export_changeset(args.file, full=args.full)
+        print(f"✅ Exported {header['rows']} changed rows to {args.file}")
+    elif args.action == "import":
+        result = service.import_changeset(args.file)
+        print(f"✅ Applied {result['applied']} rows, merged {result['merged']} changed on both laptops, "
+              f"skipped {result['skipped']} already known")
+        if result["conflicts"]:
+            print(f"⚠️ {result['conflicts']} fields were changed on both laptops and kept this laptop's value; "
+                  f"see 'sync conflicts'")
+    elif args.action == "conflicts":
+        if args.resolve is not None:
+            if args.use is None:
+                print("❌ sync conflicts --resolve needs --use local or --use incoming")
+                return 1
+            if not service.resolve_conflict(args.resolve, args.use == "incoming"):
+                print(f"❌ No conflict {args.resolve}")
+                return 1
+            print(f"✅ Conflict {args.resolve} resolved with the {args.use} value")
+            return 0
+        conflicts = service.list_conflicts()
+        if not conflicts:
+            print("✅ No sync conflicts")
+        for conflict in conflicts:
+            print(f"  [{conflict['id']}] {conflict['label']}, {conflict['field']}: "
+                  f"here {conflict['local_value']!r}, other laptop {conflict['incoming_value']!r}")
+    elif args.action == "new-site":
+        print(f"✅ This database is now site {service.new_site()}")
+    else:
+        changed = service.record_local_changes()
+        print(f"Site {service.get_site_id()}, {changed} new local changes recorded")
+        for site, knowledge, last_sync in service.get_peers():
+            print(f"  peer {site}: last sync {last_sync}, has seen {sum(knowledge.values())} changes")
+        conflicts = service.list_conflicts()
+        if conflicts:
+            print(f"⚠️ {len(conflicts)} sync conflicts to resolve, see 'sync conflicts'")
+    return 0
+
+def cmd_camp(args) -> int:
+    """List, create or switch camps, or report across camps."""
+    from services.camp_registry import CampRegistry
+
+    registry = CampRegistry(args.data_dir or DEFAULT_DATA_DIR)
+    if args.action in ("create", "switch", "archive", "unarchive") and len(args.target) != 1:
+        print(f"❌ camp {args.action} needs one camp {'name' if args.action == 'create' else 'id'}")
+        return 1
+
+    if args.action == "archive":
+        from services.archive_service import ArchiveService
+        sizes = ArchiveService(registry).archive_camp(args.target[0])
+        print(f"✅ Archived {args.target[0]}: {sizes['live_bytes'] / 1024:.0f} KB -> "
+              f"{sizes['snapshot_bytes'] / 1024:.0f} KB snapshot + {sizes['summary_bytes'] / 1024:.0f} KB summary")
+    elif args.action == "unarchive":
+        from services.archive_service import ArchiveService
+        camp = ArchiveService(registry).restore_camp(args.target[0])
+        print(f"✅ {camp.name} can be edited again ({camp.db_path})")
+    elif args.action == "create":
+        camp = registry.create_camp(args.target[0], args.start or "", args.end or "")
+        print(f"✅ Created camp {camp.id} in {camp.data_dir}")
+    elif args.action == "switch":
+        camp = registry.set_active(args.target[0])
+        print(f"✅ {camp.name} is now the active camp")
+    elif args.action == "report" and args.leaders:
+        print(f"{'Leader':<25} {'Camps':>6} {'Charged':>10} {'Paid':>10} {'Remaining':>10}")
+        print("-" * 65)
+        for row in registry.leader_totals(args.target or None, workers=args.workers):
+            print(f"{row['name'][:25]:<25} {row['camps']:>6} {row['charged']:>10.2f} "
+                  f"{row['paid']:>10.2f} {row['outstanding']:>10.2f}")
+    elif args.action == "report":
+        print(f"{'Camp':<25} {'Leaders':>8} {'Receipts':>9} {'Groepskas':>10} {'POEF':>10} {'PA':>10} {'Remaining':>10}")
+        print("-" * 88)
+        for row in registry.camp_totals(args.target or None, workers=args.workers):
+            print(f"{row['camp_id'][:25]:<25} {row['leaders']:>8} {row['receipts']:>9} {row['groepskas']:>10.2f} "
+                  f"{row['poef']:>10.2f} {row['pa']:>10.2f} {row['outstanding']:>10.2f}")
+    else:
+        active = registry.get_active().id
+        for camp in registry.list_camps():
+            marker = "*" if camp.id == active else " "
+            dates = f"{camp.start_date} - {camp.end_date}" if camp.start_date else ""
+            print(f"{marker} {camp.id:<25} {camp.name:<30} {dates:<23} {camp.status}")
+    return 0
+
+def cmd_vacuum(args) -> int:
+    """Compact the database file."""
+    from services.data_service import DataService
+
+    size_before, size_after = DataService(args.data_dir).vacuum()
+    print(f"✅ Database vacuumed: {size_before / 1024:.0f} KB -> {size_after / 1024:.0f} KB")
+    return 0
+
+def cmd_maintain(args) -> int:
+    """Run database maintenance within a time budget and report the storage."""
+    from services.data_service import DataService
+
+    report = DataService(args.data_dir).run_maintenance(budget_seconds=args.budget, force=args.force)
+    before, after = report["before"], report["after"]
+    print(f"File:       {before['file_bytes'] / 1024:.0f} KB -> {after['file_bytes'] / 1024:.0f} KB "
+          f"(WAL {after['wal_bytes'] / 1024:.0f} KB, auto-vacuum {after['auto_vacuum']})")
+    print(f"Free pages: {before['freelist_pages']} -> {after['freelist_pages']} of {after['page_count']}")
+    for task, value in report["tasks"].items():
+        print(f"  {task:<20} {f'{value * 1000:.1f} ms' if isinstance(value, float) else value}")
+    if report["quick_check"]:
+        print(f"Integrity:  {report['quick_check']}")
+    print(f"✅ Maintenance finished in {report['seconds'] * 1000:.0f} ms")
+    return 0 if report["quick_check"] in (None, "ok") else 1
+
+def cmd_check(args) -> int:
+    """Look for orphaned PA assignments and stale totals, optionally repairing them."""
+    from services.data_service import DataService
+    from services import integrity_service
+
+    data_service = DataService(args.data_dir)
+    leaders = data_service.load_leaders()
+    receipts = data_service.load_receipts()
+
+    start = time.perf_counter()
+    issues = integrity_service.check_integrity(leaders, receipts)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for issue in issues:
+        print(f"  {issue.kind:<20} {issue.detail}")
+    if not issues:
+        print(f"✅ No problems in {len(leaders)} leaders and {len(receipts)} receipts ({elapsed_ms:.0f} ms)")
+        return 0
+    print(f"⚠️ {len(issues)} problems found ({elapsed_ms:.0f} ms)")
+    if not args.repair:
+        return 1
+
+    result = integrity_service.repair_integrity(leaders, receipts)
+    data_service.save_all_data(leaders, receipts)
+    for kind, count in result["fixed"].items():
+        if count:
+            print(f"  repaired {count} x {integrity_service.ISSUE_KINDS[kind]}")
+    remaining = integrity_service.check_integrity(leaders, receipts)
+    if remaining:
+        print(f"❌ {len(remaining)} problems left after repairing")
+        return 1
+    print(f"✅ Repaired {result['issues']} problems")
+    return 0
+
+def cmd_bench(args) -> int:
+    """Time the main data operations against the current database."""
+    import tempfile
+    from services.data_service import DataService
+    from services.export_service import CSVExporter
+    from services.xlsx_service import XLSXExporter
+
+    data_service = DataService(args.data_dir)
+    timings = []
+
+    def measure(label, func):
+        start = time.perf_counter()
+        result = func()
+        timings.append((label, time.perf_counter() - start))
+        return result
+
+    leaders = measure("Load leaders", data_service.load_leaders)
+    receipts = measure("Load receipts", data_service.load_receipts)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        measure("CSV export", lambda: CSVExporter(data_service.db_path).export_all(temp_dir))
+        measure("XLSX export", lambda: XLSXExporter(data_service.db_path).export(os.path.join(temp_dir, "bench.xlsx")))
+
+    item_count = sum(len(receipt.items) for receipt in receipts)
+    print(f"Database: {len(leaders)} leaders, {len(receipts)} receipts, {item_count} items")
+    for label, elapsed in timings:
+        print(f"  {label:<15} {elapsed * 1000:>10.1f} ms")
+    return 0
+
+def cmd_generate(args) -> int:
+    """Fill the database with a generated camp for load testing."""
+    from services.data_service import DataService
+    from services.data_generator import generate_camp
+
+    start = time.perf_counter()
+    counts = generate_camp(
+        DataService(args.data_dir), args.preset, seed=args.seed, replace=args.replace,
+        leaders=args.leaders, receipts=args.receipts, items=args.items
+    )
+    print(f"✅ Generated {counts['leaders']} leaders, {counts['receipts']} receipts, {counts['items']} items "
+          f"and {counts['pa_assignments']} PA assignments in {time.perf_counter() - start:.1f} s")
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with all subcommands."""
+    parser = argparse.ArgumentParser(prog="run.py", description="Kamp Finances batch commands. Run without arguments to start the app.")
+    parser.add_argument("--data-dir", help="Folder with kamp_finances.db (default: the active camp's folder)")
+    parser.add_argument("--camp", help="Work on this camp instead of the active one")
+    parser.add_argument("--trace-sql", action="store_true", help="Log every SQL statement to sql_trace.log in the data folder")
+    parser.add_argument("--slow-query-ms", type=float, help="Log statements slower than this to slow_queries.log (default: 50)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Import leaders or receipt items from CSV")
+    import_parser.add_argument("kind", choices=["leaders", "receipts"])
+    import_parser.add_argument("file", help="CSV file to import")
+    import_parser.set_defaults(func=cmd_import)
+
+    export_parser = subparsers.add_parser("export", help="Export CSV files, an Excel workbook or leader statements")
+    export_parser.add_argument("--format", choices=["csv", "xlsx", "statements"], default="csv")
+    export_parser.add_argument("--output", required=True, help="Folder for csv/statements, file for xlsx or --zip")
+    export_parser.add_argument("--delimiter", default=";", help="CSV delimiter (default: ;)")
+    export_parser.add_argument("--decimal-comma", action="store_true", help="Write amounts as 1,50")
+    export_parser.add_argument("--zip", action="store_true", help="Bundle statements in a zip file")
+    export_parser.set_defaults(func=cmd_export)
+
+    report_parser = subparsers.add_parser("report", help="Print the camp summary")
+    report_parser.add_argument("--leader", help="Print the statement of this leader instead")
+    report_parser.set_defaults(func=cmd_report)
+
+    backup_parser = subparsers.add_parser("backup", help="Back up the database")
+    backup_parser.add_argument("--gzip", action="store_true", help="Compress the backup")
+    backup_parser.add_argument("--list", action="store_true", help="List the backups instead")
+    backup_parser.add_argument("--prune-only", action="store_true", help="Only delete old backups")
+    backup_parser.add_argument("--keep-last", type=int, default=10, help="Newest backups to keep (default: 10)")
+    backup_parser.add_argument("--hourly", type=int, default=24, help="Hours with one kept backup each (default: 24)")
+    backup_parser.add_argument("--daily", type=int, default=14, help="Days with one kept backup each (default: 14)")
+    backup_parser.set_defaults(func=cmd_backup)
+
+    sync_parser = subparsers.add_parser("sync", help="Exchange changes with another laptop via a changeset file")
+    sync_parser.add_argument("action", choices=["export", "import", "status", "new-site", "conflicts"])
+    sync_parser.add_argument("file", nargs="?", help="Changeset file to write or read")
+    sync_parser.add_argument("--full", action="store_true", help="Export every row, for a laptop that never synced")
+    sync_parser.add_argument("--resolve", type=int, metavar="ID", help="With conflicts: settle the conflict with this ID")
+    sync_parser.add_argument("--use", choices=["local", "incoming"], help="Value to keep when resolving a conflict")
+    sync_parser.set_defaults(func=cmd_sync)
+
+    restore_parser = subparsers.add_parser("restore", help="Restore the database from a backup")
+    restore_parser.add_argument("file", help="Backup file, or 'latest'")
+    restore_parser.set_defaults(func=cmd_restore)
+
+    camp_parser = subparsers.add_parser("camp", help="List, create or switch camps, or report across camps")
+    camp_parser.add_argument("action", choices=["list", "create", "switch", "report", "archive", "unarchive"])
+    camp_parser.add_argument("target", nargs="*", help="Camp name to create, camp id to switch to or (un)archive, or camp ids to report on")
+    camp_parser.add_argument("--start", help="First day of a new camp (YYYY-MM-DD)")
+    camp_parser.add_argument("--end", help="Last day of a new camp (YYYY-MM-DD)")
+    camp_parser.add_argument("--leaders", action="store_true", help="Report per leader across the camps instead")
+    camp_parser.add_argument("--workers", type=int, help="Worker processes for reports over many camps")
+    camp_parser.set_defaults(func=cmd_camp)
+
+    vacuum_parser = subparsers.add_parser("vacuum", help="Compact the database file")
+    vacuum_parser.set_defaults(func=cmd_vacuum)
+
+    maintain_parser = subparsers.add_parser("maintain", help="Optimize, analyze, free pages and check the database")
+    maintain_parser.add_argument("--budget", type=float, default=10.0, help="Seconds maintenance may take (default: 10)")
+    maintain_parser.add_argument("--force", action="store_true", help="Also analyze and check when they ran recently")
+    maintain_parser.set_defaults(func=cmd_maintain)
+
+    check_parser = subparsers.add_parser("check", help="Find orphaned PA assignments and totals that do not add up")
+    check_parser.add_argument("--repair", action="store_true", help="Fix the problems found and save")
+    check_parser.set_defaults(func=cmd_check)
+
+    bench_parser = subparsers.add_parser("bench", help="Time loading and exporting the current database")
+    bench_parser.set_defaults(func=cmd_bench)
+
+    generate_parser = subparsers.add_parser("generate", help="Fill the database with a generated camp for load testing")
+    generate_parser.add_argument("--preset", choices=["tiny", "small", "medium", "large", "federation"], default="small")
+    generate_parser.add_argument("--seed", type=int, default=0, help="Same seed, same camp (default: 0)")
+    generate_parser.add_argument("--leaders", type=int, help="Override the preset's number of leaders")
+    generate_parser.add_argument("--receipts", type=int, help="Override the preset's number of receipts")
+    generate_parser.add_argument("--items", type=int, help="Override the preset's number of items")
+    generate_parser.add_argument("--replace", action="store_true", help="Delete the existing data first")
+    generate_parser.set_defaults(func=cmd_generate)
+
+    return parser
+
+def resolve_camp_dir(camp_id: Optional[str], archived_ok: bool = False) -> str:
+    """Get the data folder of a camp, or of the active camp."""
+    from services.camp_registry import CampRegistry
+
+    registry = CampRegistry(DEFAULT_DATA_DIR)
+    camp = registry.get_camp(camp_id) if camp_id else registry.get_active()
+    if camp.status == "archived" and not archived_ok:
+        raise ValueError(f"Camp {camp.id} is archived; restore it with 'camp unarchive {camp.id}' first")
+    return camp.data_dir
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a CLI subcommand and return the exit code."""
+    args = build_parser().parse_args(argv)
+    if args.trace_sql:
+        from utils import sql_trace
+        sql_trace.enable(True, args.slow_query_ms)
+    try:
+        if args.data_dir is None and args.func is not cmd_camp:
+            args.data_dir = resolve_camp_dir(args.camp, archived_ok=args.func is cmd_report)
+        return args.func(args)
+    except Exception as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if args.trace_sql:
+            print(f"🔎 SQL trace: {sql_trace.get_tracer(args.data_dir or DEFAULT_DATA_DIR).summary()}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,27 +4,27 @@ Kamp Finances - Scouting Trip Finance Manager
 A Python application to manage expenses during scouting trips.
 """
 
-import tkinter as tk
-from tkinter import ttk, messagebox
+import time
+
+_IMPORT_START = time.perf_counter()
+
+from tkinter import ttk
 import os
-from datetime import datetime
-from typing import Dict, List, Optional
-
-# Import our modules
-from models.leader import Leader
-from models.receipt import Receipt
-from models.expense import Expense, ExpenseCategory
-from services.finance_service import FinanceService
-from services.data_service import DataService
+
+# The main window loads the services it needs; tabs, dialogs and exporters load when first used
 from ui.main_window import MainWindow
 
+IMPORT_TIME = time.perf_counter() - _IMPORT_START
+
 
 class KampFinancesApp:
     """Main application class for Kamp Finances."""
     
     def __init__(self):
         # Initialize the main window
-        self.main_window = MainWindow()
+        # Set KAMP_PREWARM_TABS=1 to build the other tabs while the app is idle
+        prewarm = os.environ.get("KAMP_PREWARM_TABS") == "1"
+        self.main_window = MainWindow(import_time=IMPORT_TIME, prewarm=prewarm)
         
         # Configure style
         self._setup_styles()
@@ -0,0 +1,237 @@
+"""
+Archive service for Kamp Finances application.
+Freezes a finished camp into a compressed read-only snapshot and restores it when
+the camp needs to be edited again.
+
+An archived camp folder holds archive/kamp_finances.db.gz, a VACUUM INTO copy of the
+whole database, and archive/summary.db with precomputed totals per camp, leader,
+receipt and category. Reports read the small summary without decompressing anything;
+the live database is removed, so the camp no longer costs anything to keep around.
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime
+from typing import Dict, Optional
+
+from models.leader import POEF_DRINK_PRICE, POEF_CIGARETTE_PRICE
+from services.camp_registry import ARCHIVE_DIR, SUMMARY_FILE, Camp, CampRegistry, DB_FILE, read_only_uri
+
+SNAPSHOT_FILE = DB_FILE + ".gz"
+
+# Good ratio on SQLite pages without the slow top levels
+COMPRESS_LEVEL = 6
+
+# Bytes read per step when hashing and (de)compressing
+CHUNK_SIZE = 1024 * 1024
+
+# Tables the snapshot must contain to be restored
+REQUIRED_TABLES = {"leaders", "receipts", "receipt_items"}
+
+# Built in the summary database from the attached snapshot
+SUMMARY_TABLES_SQL = [
+    '''
+    CREATE TABLE summary.summary_leaders AS
+    SELECT id, name, total_pa_expenses, poef_drink_count, poef_cigarette_count,
+           total_pa_expenses + poef_drink_count * :drink + poef_cigarette_count * :cigarette AS charged,
+           paid_amount
+    FROM main.leaders
+    ''',
+    '''
+    CREATE TABLE summary.summary_receipts AS
+    SELECT r.id, r.date, r.store_name, r.total_amount, r.groepskas_total, r.poef_total, r.pa_total,
+           (SELECT COUNT(*) FROM main.receipt_items AS i WHERE i.receipt_id = r.id) AS items
+    FROM main.receipts AS r
+    ''',
+    '''
+    CREATE TABLE summary.summary_categories AS
+    SELECT category, COUNT(*) AS items, TOTAL(price * quantity) AS amount
+    FROM main.receipt_items GROUP BY category
+    ''',
+    '''
+    CREATE TABLE summary.summary_camp AS
+    SELECT l.leaders, r.receipts, (SELECT COUNT(*) FROM main.receipt_items) AS items,
+           r.groepskas, r.poef, r.pa, l.charged, l.paid
+    FROM (SELECT COUNT(*) AS leaders, TOTAL(charged) AS charged, TOTAL(paid_amount) AS paid
+          FROM summary.summary_leaders) AS l,
+         (SELECT COUNT(*) AS receipts, TOTAL(groepskas_total) AS groepskas,
+                 TOTAL(poef_total) AS poef, TOTAL(pa_total) AS pa
+          FROM main.receipts) AS r
+    ''',
+    'CREATE TABLE summary.archive_info (key TEXT PRIMARY KEY, value TEXT)',
+]
+
+def _sha256(path: str) -> str:
+    """Hash a file in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _check(conn: sqlite3.Connection):
+    """Raise ValueError if a snapshot is damaged or is not a Kamp Finances database."""
+    result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    if result != "ok":
+        raise ValueError(f"Snapshot failed the integrity check: {result}")
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    missing = REQUIRED_TABLES - tables
+    if missing:
+        raise ValueError(f"Snapshot is missing tables: {', '.join(sorted(missing))}")
+
+def archived_summary_path(data_dir: str) -> Optional[str]:
+    """Get the summary database if data_dir holds an archived camp."""
+    summary_path = os.path.join(data_dir, ARCHIVE_DIR, SUMMARY_FILE)
+    if os.path.exists(summary_path) and not os.path.exists(os.path.join(data_dir, DB_FILE)):
+        return summary_path
+    return None
+
+def read_summary(summary_path: str) -> Dict:
+    """Read the precomputed totals of an archived camp from its summary database."""
+    conn = sqlite3.connect(read_only_uri(summary_path), uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        return {
+            "info": dict(conn.execute("SELECT key, value FROM archive_info").fetchall()),
+            "camp": dict(conn.execute("SELECT * FROM summary_camp").fetchone()),
+            "categories": [dict(row) for row in conn.execute("SELECT * FROM summary_categories ORDER BY category")],
+            "leaders": [dict(row) for row in conn.execute("SELECT * FROM summary_leaders ORDER BY name")],
+            "receipts": [dict(row) for row in conn.execute("SELECT * FROM summary_receipts ORDER BY date, id")],
+        }
+    finally:
+        conn.close()
+
+def _remove_archive(archive_dir: str):
+    """Delete an archive folder, including its read-only files."""
+    for file_name in os.listdir(archive_dir):
+        os.chmod(os.path.join(archive_dir, file_name), 0o644)
+    shutil.rmtree(archive_dir)
+
+class ArchiveService:
+    """Archives camps of a registry and restores them."""
+
+    def __init__(self, registry: CampRegistry):
+        self.registry = registry
+
+    def archive_camp(self, camp_id: str) -> Dict:
+        """Replace a camp's database with a compressed snapshot and a summary; return the sizes.
+
+        The snapshot and summary are complete and verified before the live database
+        is removed, so an interrupted archive leaves the camp as it was.
+        """
+        camp = self.registry.get_camp(camp_id)
+        if camp.status == "archived":
+            raise ValueError(f"Camp {camp_id} is already archived")
+        if camp.id == self.registry.get_active().id:
+            raise ValueError(f"Camp {camp_id} is the active camp; switch to another camp first")
+        if not os.path.exists(camp.db_path):
+            raise ValueError(f"Camp {camp_id} has no database to archive")
+
+        archive_dir = os.path.join(camp.data_dir, ARCHIVE_DIR)
+        os.makedirs(archive_dir, exist_ok=True)
+        live_bytes = sum(os.path.getsize(camp.db_path + suffix)
+                         for suffix in ("", "-wal") if os.path.exists(camp.db_path + suffix))
+
+        work_dir = tempfile.mkdtemp(prefix=".archive_", dir=archive_dir)
+        try:
+            # A compact, consistent copy, even while another program has the database open
+            snapshot_path = os.path.join(work_dir, DB_FILE)
+            source = sqlite3.connect(camp.db_path)
+            try:
+                source.execute("VACUUM INTO ?", (snapshot_path,))
+            finally:
+                source.close()
+
+            summary_path = os.path.join(work_dir, os.path.basename(camp.summary_path))
+            self._write_summary(snapshot_path, summary_path, camp)
+
+            packed_path = os.path.join(work_dir, SNAPSHOT_FILE)
+            with open(snapshot_path, "rb") as raw, gzip.open(packed_path, "wb", compresslevel=COMPRESS_LEVEL) as packed:
+                shutil.copyfileobj(raw, packed, CHUNK_SIZE)
+
+            os.chmod(packed_path, 0o444)
+            os.chmod(summary_path, 0o444)
+            os.replace(packed_path, os.path.join(archive_dir, SNAPSHOT_FILE))
+            os.replace(summary_path, camp.summary_path)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        self.registry.set_status(camp_id, "archived")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(camp.db_path + suffix):
+                os.remove(camp.db_path + suffix)
+
+        return {
+            "live_bytes": live_bytes,
+            "snapshot_bytes": os.path.getsize(os.path.join(archive_dir, SNAPSHOT_FILE)),
+            "summary_bytes": os.path.getsize(camp.summary_path),
+        }
+
+    def _write_summary(self, snapshot_path: str, summary_path: str, camp: Camp):
+        """Check the snapshot and build the summary tables next to it."""
+        # Hashed before it is opened, restore compares the decompressed file against it
+        snapshot_sha256 = _sha256(snapshot_path)
+        conn = sqlite3.connect(snapshot_path)
+        try:
+            _check(conn)
+            conn.execute("ATTACH DATABASE ? AS summary", (summary_path,))
+            for sql in SUMMARY_TABLES_SQL:
+                conn.execute(sql, {"drink": POEF_DRINK_PRICE, "cigarette": POEF_CIGARETTE_PRICE})
+            info = {
+                "camp_id": camp.id,
+                "name": camp.name,
+                "start_date": camp.start_date,
+                "end_date": camp.end_date,
+                "archived_at": datetime.now().isoformat(timespec="seconds"),
+                "snapshot_sha256": snapshot_sha256,
+                "poef_drink_price": str(POEF_DRINK_PRICE),
+                "poef_cigarette_price": str(POEF_CIGARETTE_PRICE),
+            }
+            conn.executemany("INSERT INTO summary.archive_info (key, value) VALUES (?, ?)", info.items())
+            conn.commit()
+        finally:
+            conn.close()
+
+    def read_summary(self, camp_id: str) -> Dict:
+        """Read the precomputed totals of an archived camp."""
+        camp = self.registry.get_camp(camp_id)
+        if not os.path.exists(camp.summary_path):
+            raise ValueError(f"Camp {camp_id} is not archived")
+        return read_summary(camp.summary_path)
+
+    def restore_camp(self, camp_id: str) -> Camp:
+        """Turn an archived camp back into an editable one (status closed)."""
+        camp = self.registry.get_camp(camp_id)
+        archive_dir = os.path.join(camp.data_dir, ARCHIVE_DIR)
+        packed_path = os.path.join(archive_dir, SNAPSHOT_FILE)
+        if camp.status != "archived" or not os.path.exists(packed_path):
+            raise ValueError(f"Camp {camp_id} is not archived")
+        if os.path.exists(camp.db_path):
+            raise ValueError(f"Camp {camp_id} already has a database at {camp.db_path}")
+
+        expected_sha256 = self.read_summary(camp_id)["info"].get("snapshot_sha256")
+        fd, temp_path = tempfile.mkstemp(prefix=".restore_", suffix=".db", dir=camp.data_dir)
+        os.close(fd)
+        try:
+            with gzip.open(packed_path, "rb") as packed, open(temp_path, "wb") as raw:
+                shutil.copyfileobj(packed, raw, CHUNK_SIZE)
+            if expected_sha256 and _sha256(temp_path) != expected_sha256:
+                raise ValueError("Archive snapshot does not match its checksum")
+            conn = sqlite3.connect(temp_path)
+            try:
+                _check(conn)
+            finally:
+                conn.close()
+            os.replace(temp_path, camp.db_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        # The summary would go stale as soon as the camp is edited
+        self.registry.set_status(camp_id, "closed")
+        _remove_archive(archive_dir)
+        return self.registry.get_camp(camp_id)
@@ -0,0 +1,201 @@
+"""
+Backup service for Kamp Finances application.
+Takes online backups with the SQLite backup API, prunes them by a retention policy
+and restores them after verifying the copy.
+"""
+
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+BACKUP_DIR = "backups"
+BACKUP_PREFIX = "kamp_finances_"
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+# Pages copied per backup step, with a short pause between steps so writers are not held up
+PAGES_PER_STEP = 256
+STEP_SLEEP_SECONDS = 0.005
+
+# Default retention: the newest backups plus one per hour and one per day going back
+KEEP_LAST = 10
+KEEP_HOURLY = 24
+KEEP_DAILY = 14
+
+# Automatic backups while the app is open
+AUTO_BACKUP_INTERVAL_MINUTES = 60
+
+# Tables a backup must contain to be restored
+REQUIRED_TABLES = {"leaders", "receipts", "receipt_items"}
+
+@dataclass
+class BackupFile:
+    """A backup in the backup folder."""
+    path: str
+    created: datetime
+    size: int
+    compressed: bool
+
+class BackupService:
+    """Creates, lists, prunes and restores backups of one database."""
+
+    def __init__(self, db_path: str, backup_dir: Optional[str] = None):
+        self.db_path = db_path
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(db_path), BACKUP_DIR)
+        self._backed_up_signature = None
+
+    def create_backup(self, compress: bool = False, tag: str = "",
+                      progress: Optional[Callable[[int, int], None]] = None) -> str:
+        """Back up the live database without blocking writers and return the backup path.
+
+        The copy is checked with PRAGMA quick_check before it replaces anything,
+        so a backup in the folder is always complete.
+        """
+        os.makedirs(self.backup_dir, exist_ok=True)
+        name = BACKUP_PREFIX + datetime.now().strftime(TIMESTAMP_FORMAT) + (f"_{tag}" if tag else "")
+        final_path = os.path.join(self.backup_dir, name + (".db.gz" if compress else ".db"))
+
+        fd, temp_path = tempfile.mkstemp(prefix=".backup_", suffix=".db", dir=self.backup_dir)
+        os.close(fd)
+        try:
+            source = sqlite3.connect(self.db_path)
+            target = sqlite3.connect(temp_path)
+            try:
+                def report(status, remaining, total):
+                    if progress:
+                        progress(total - remaining, total)
+                    time.sleep(STEP_SLEEP_SECONDS)
+
+                source.backup(target, pages=PAGES_PER_STEP, progress=report)
+                self._check(target)
+            finally:
+                target.close()
+                source.close()
+
+            if compress:
+                with open(temp_path, "rb") as raw, gzip.open(temp_path + ".gz", "wb") as packed:
+                    shutil.copyfileobj(raw, packed)
+                os.remove(temp_path)
+                temp_path += ".gz"
+            os.replace(temp_path, final_path)
+        finally:
+            for leftover in (temp_path, temp_path + ".gz"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+        return final_path
+
+    def list_backups(self) -> List[BackupFile]:
+        """List the backups, newest first."""
+        backups = []
+        if not os.path.isdir(self.backup_dir):
+            return backups
+        for file_name in os.listdir(self.backup_dir):
+            if not file_name.startswith(BACKUP_PREFIX) or not file_name.endswith((".db", ".db.gz")):
+                continue
+            stamp = file_name[len(BACKUP_PREFIX):len(BACKUP_PREFIX) + 15]
+            try:
+                created = datetime.strptime(stamp, TIMESTAMP_FORMAT)
+            except ValueError:
+                continue
+            path = os.path.join(self.backup_dir, file_name)
+            backups.append(BackupFile(path, created, os.path.getsize(path), file_name.endswith(".gz")))
+        backups.sort(key=lambda backup: backup.created, reverse=True)
+        return backups
+
+    def select_kept(self, backups: List[BackupFile], keep_last: int = KEEP_LAST, hourly: int = KEEP_HOURLY,
+                    daily: int = KEEP_DAILY, now: Optional[datetime] = None) -> List[BackupFile]:
+        """Pick the backups the retention policy keeps: the newest keep_last, plus the
+        newest backup of each of the last `hourly` hours and `daily` days."""
+        now = now or datetime.now()
+        kept = backups[:keep_last]
+        seen_hours, seen_days = set(), set()
+        for backup in backups:
+            hour = backup.created.replace(minute=0, second=0, microsecond=0)
+            if hour not in seen_hours and now - hour < timedelta(hours=hourly):
+                seen_hours.add(hour)
+                kept.append(backup)
+            day = backup.created.date()
+            if day not in seen_days and (now.date() - day).days < daily:
+                seen_days.add(day)
+                kept.append(backup)
+        return kept
+
+    def db_signature(self) -> tuple:
+        """Size and modification time of the database and its WAL, to tell whether it changed."""
+        signature = []
+        for path in (self.db_path, self.db_path + "-wal"):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                signature.append((stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def changed_since_backup(self) -> bool:
+        """Check whether the database changed since the last automatic backup."""
+        return self.db_signature() != self._backed_up_signature
+
+    def create_automatic_backup(self, compress: bool = True) -> str:
+        """Write a backup, apply the retention policy and remember the state that was backed up."""
+        signature = self.db_signature()
+        path = self.create_backup(compress=compress)
+        self.prune()
+        self._backed_up_signature = signature
+        return path
+
+    def prune(self, keep_last: int = KEEP_LAST, hourly: int = KEEP_HOURLY, daily: int = KEEP_DAILY) -> List[str]:
+        """Delete the backups the retention policy does not keep and return their paths."""
+        backups = self.list_backups()
+        kept = {backup.path for backup in self.select_kept(backups, keep_last, hourly, daily)}
+        removed = []
+        for backup in backups:
+            if backup.path not in kept:
+                os.remove(backup.path)
+                removed.append(backup.path)
+        return removed
+
+    def restore(self, backup_path: str) -> str:
+        """Replace the live database with a verified backup.
+
+        The current database is backed up first (tagged pre-restore) and that path
+        is returned. The backup is decompressed and checked before the live database
+        is touched, and copied in with the backup API so open connections never see
+        a half-written file.
+        """
+        fd, temp_path = tempfile.mkstemp(prefix=".restore_", suffix=".db", dir=os.path.dirname(self.db_path) or ".")
+        os.close(fd)
+        try:
+            opener = gzip.open if backup_path.endswith(".gz") else open
+            with opener(backup_path, "rb") as packed, open(temp_path, "wb") as raw:
+                shutil.copyfileobj(packed, raw)
+
+            source = sqlite3.connect(temp_path)
+            try:
+                self._check(source)
+                safety_path = self.create_backup(tag="pre-restore")
+                target = sqlite3.connect(self.db_path)
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+            finally:
+                source.close()
+        finally:
+            os.remove(temp_path)
+        return safety_path
+
+    def _check(self, conn: sqlite3.Connection):
+        """Raise ValueError if a database copy is damaged or is not a Kamp Finances database."""
+        try:
+            result = conn.execute("PRAGMA quick_check").fetchone()[0]
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"Backup is not a readable database: {e}")
+        if result != "ok":
+            raise ValueError(f"Backup failed the integrity check: {result}")
+        missing = REQUIRED_TABLES - tables
+        if missing:
+            raise ValueError(f"Backup is missing tables: {', '.join(sorted(missing))}")
@@ -0,0 +1,284 @@
+"""
+Camp registry for Kamp Finances application.
+Keeps every camp in its own database file, listed in a shared catalog, and runs
+reports across camps by attaching their databases read-only and aggregating in SQL.
+
+The catalog lives in camps.db in the data folder. The original kamp_finances.db in
+the data folder is registered as the "default" camp, so existing data keeps working.
+"""
+
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from models.leader import POEF_DRINK_PRICE, POEF_CIGARETTE_PRICE
+from services.data_service import DataService
+from utils.paths import DEFAULT_DATA_DIR
+
+CATALOG_FILE = "camps.db"
+CAMPS_DIR = "camps"
+DB_FILE = "kamp_finances.db"
+DEFAULT_CAMP_ID = "default"
+
+# Archived camps keep a compressed snapshot and a small summary database here, see services.archive_service
+ARCHIVE_DIR = "archive"
+SUMMARY_FILE = "summary.db"
+
+CAMP_STATUSES = ("active", "closed", "archived")
+
+# SQLite attaches at most 10 databases to one connection
+ATTACH_BATCH_SIZE = 8
+
+# Below this many camps a process pool costs more than it saves
+MIN_CAMPS_FOR_POOL = 24
+
+# One row per attached camp; {schema} is the name the camp is attached as
+CAMP_TOTALS_SQL = '''
+    SELECT ?, l.leaders, r.receipts, r.groepskas, r.poef, r.pa, l.charged, l.paid
+    FROM (SELECT COUNT(*) AS leaders,
+                 TOTAL(total_pa_expenses + poef_drink_count * ? + poef_cigarette_count * ?) AS charged,
+                 TOTAL(paid_amount) AS paid
+          FROM {schema}.leaders) AS l,
+         (SELECT COUNT(*) AS receipts, TOTAL(groepskas_total) AS groepskas,
+                 TOTAL(poef_total) AS poef, TOTAL(pa_total) AS pa
+          FROM {schema}.receipts) AS r
+'''
+
+# The same for an archived camp, from the totals computed when it was archived
+ARCHIVED_CAMP_TOTALS_SQL = '''
+    SELECT ?, leaders, receipts, groepskas, poef, pa, charged, paid
+    FROM {schema}.summary_camp
+'''
+
+# One row per leader of an attached camp, grouped by name across the batch
+LEADER_ROWS_SQL = '''
+    SELECT ? AS camp_id, name,
+           total_pa_expenses + poef_drink_count * ? + poef_cigarette_count * ? AS charged, paid_amount
+    FROM {schema}.leaders
+'''
+
+ARCHIVED_LEADER_ROWS_SQL = '''
+    SELECT ? AS camp_id, name, charged, paid_amount
+    FROM {schema}.summary_leaders
+'''
+
+@dataclass
+class Camp:
+    """A camp in the catalog."""
+    id: str
+    name: str
+    start_date: str
+    end_date: str
+    folder: str
+    status: str
+    created_at: str
+    data_dir: str = ""
+
+    @property
+    def db_path(self) -> str:
+        return os.path.join(self.data_dir, DB_FILE)
+
+    @property
+    def summary_path(self) -> str:
+        return os.path.join(self.data_dir, ARCHIVE_DIR, SUMMARY_FILE)
+
+def slugify(name: str) -> str:
+    """Turn a camp name into a folder-safe id."""
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+    return slug or "camp"
+
+class CampRegistry:
+    """Catalog of camps, each with its own data folder and database."""
+
+    def __init__(self, root: str = DEFAULT_DATA_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.catalog_path = os.path.join(root, CATALOG_FILE)
+        self._ensure_catalog()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.catalog_path, timeout=10.0)
+
+    def _ensure_catalog(self):
+        """Create the catalog and register the original database as the default camp."""
+        with self._get_connection() as conn:
+            c = conn.cursor()
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS camps (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    start_date TEXT DEFAULT '',
+                    end_date TEXT DEFAULT '',
+                    folder TEXT NOT NULL,
+                    status TEXT DEFAULT 'active',
+                    created_at TEXT NOT NULL
+                )
+            ''')
+            c.execute('CREATE TABLE IF NOT EXISTS catalog_settings (key TEXT PRIMARY KEY, value TEXT)')
+            c.execute('''
+                INSERT INTO camps (id, name, folder, created_at)
+                SELECT ?, 'Default camp', '.', ?
+                WHERE NOT EXISTS (SELECT 1 FROM camps)
+            ''', (DEFAULT_CAMP_ID, datetime.now().isoformat(timespec="seconds")))
+            conn.commit()
+
+    def _camp_from_row(self, row: tuple) -> Camp:
+        camp = Camp(*row)
+        camp.data_dir = os.path.normpath(os.path.join(self.root, camp.folder))
+        return camp
+
+    def list_camps(self) -> List[Camp]:
+        """List all camps, newest first."""
+        with self._get_connection() as conn:
+            rows = conn.execute('''
+                SELECT id, name, start_date, end_date, folder, status, created_at
+                FROM camps ORDER BY start_date DESC, created_at DESC
+            ''').fetchall()
+        return [self._camp_from_row(row) for row in rows]
+
+    def get_camp(self, camp_id: str) -> Camp:
+        """Get a camp by id, raising ValueError if it is not in the catalog."""
+        with self._get_connection() as conn:
+            row = conn.execute('''
+                SELECT id, name, start_date, end_date, folder, status, created_at
+                FROM camps WHERE id = ?
+            ''', (camp_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"Unknown camp: {camp_id}")
+        return self._camp_from_row(row)
+
+    def create_camp(self, name: str, start_date: str = "", end_date: str = "") -> Camp:
+        """Register a new camp and create its empty database."""
+        if not name.strip():
+            raise ValueError("A camp needs a name")
+        existing = {camp.id for camp in self.list_camps()}
+        base = camp_id = slugify(name)
+        suffix = 2
+        while camp_id in existing:
+            camp_id = f"{base}-{suffix}"
+            suffix += 1
+
+        folder = os.path.join(CAMPS_DIR, camp_id)
+        DataService(os.path.join(self.root, folder))
+        with self._get_connection() as conn:
+            conn.execute('''
+                INSERT INTO camps (id, name, start_date, end_date, folder, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (camp_id, name.strip(), start_date, end_date, folder, datetime.now().isoformat(timespec="seconds")))
+        return self.get_camp(camp_id)
+
+    def set_status(self, camp_id: str, status: str):
+        """Mark a camp active, closed or archived."""
+        if status not in CAMP_STATUSES:
+            raise ValueError(f"Unknown camp status: {status}")
+        self.get_camp(camp_id)
+        with self._get_connection() as conn:
+            conn.execute('UPDATE camps SET status = ? WHERE id = ?', (status, camp_id))
+
+    def get_active(self) -> Camp:
+        """Get the camp the app opens, falling back to the default camp and then the newest one."""
+        with self._get_connection() as conn:
+            row = conn.execute("SELECT value FROM catalog_settings WHERE key = 'active_camp'").fetchone()
+        for camp_id in (row[0] if row else None, DEFAULT_CAMP_ID):
+            try:
+                return self.get_camp(camp_id)
+            except ValueError:
+                pass
+        return self.list_camps()[0]
+
+    def set_active(self, camp_id: str) -> Camp:
+        """Make a camp the one the app and CLI open by default."""
+        camp = self.get_camp(camp_id)
+        if camp.status == "archived":
+            raise ValueError(f"Camp {camp_id} is archived; restore it before opening it")
+        with self._get_connection() as conn:
+            conn.execute('''
+                INSERT INTO catalog_settings (key, value) VALUES ('active_camp', ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            ''', (camp_id,))
+        return camp
+
+    def _report_targets(self, camp_ids: Optional[List[str]]) -> List[Tuple[str, str, bool]]:
+        """(camp id, database path, archived) of the camps to report on that have a database."""
+        camps = [self.get_camp(camp_id) for camp_id in camp_ids] if camp_ids else self.list_camps()
+        targets = []
+        for camp in camps:
+            # Archived camps are read from their summary, never from the compressed snapshot
+            if camp.status == "archived" and os.path.exists(camp.summary_path):
+                targets.append((camp.id, camp.summary_path, True))
+            elif os.path.exists(camp.db_path):
+                # A camp that was never opened has no database yet, and nothing to report
+                targets.append((camp.id, camp.db_path, False))
+        return targets
+
+    def camp_totals(self, camp_ids: Optional[List[str]] = None, workers: Optional[int] = None) -> List[Dict]:
+        """Spending and payment totals per camp."""
+        rows = []
+        for batch_rows in _run_batches("camp_totals", self._report_targets(camp_ids), workers):
+            rows.extend(batch_rows)
+        return [
+            {
+                "camp_id": camp_id, "leaders": leaders, "receipts": receipts,
+                "groepskas": groepskas, "poef": poef, "pa": pa,
+                "charged": charged, "paid": paid, "outstanding": charged - paid,
+            }
+            for camp_id, leaders, receipts, groepskas, poef, pa, charged, paid in rows
+        ]
+
+    def leader_totals(self, camp_ids: Optional[List[str]] = None, workers: Optional[int] = None) -> List[Dict]:
+        """Charges and payments per leader name summed over the camps, largest outstanding first."""
+        totals = {}
+        for batch_rows in _run_batches("leader_totals", self._report_targets(camp_ids), workers):
+            # Each batch is already grouped; merge the partial sums
+            for key, name, camps, charged, paid in batch_rows:
+                entry = totals.setdefault(key, {"name": name, "camps": 0, "charged": 0.0, "paid": 0.0})
+                entry["camps"] += camps
+                entry["charged"] += charged
+                entry["paid"] += paid
+        for entry in totals.values():
+            entry["outstanding"] = entry["charged"] - entry["paid"]
+        return sorted(totals.values(), key=lambda entry: (-entry["outstanding"], entry["name"].lower()))
+
+def read_only_uri(db_path: str) -> str:
+    """URI opening a camp database read-only."""
+    # pathlib pulls in urllib.parse; only reports need it
+    from pathlib import Path
+    return Path(db_path).resolve().as_uri() + "?mode=ro"
+
+def _run_batch(task: Tuple[str, List[Tuple[str, str, bool]]]) -> List[tuple]:
+    """Attach one batch of camp databases and run a report query over all of them."""
+    kind, targets = task
+    live_sql, archived_sql = (
+        (CAMP_TOTALS_SQL, ARCHIVED_CAMP_TOTALS_SQL) if kind == "camp_totals" else (LEADER_ROWS_SQL, ARCHIVED_LEADER_ROWS_SQL)
+    )
+    conn = sqlite3.connect("file::memory:", uri=True)
+    try:
+        selects = []
+        parameters = []
+        for index, (camp_id, db_path, archived) in enumerate(targets):
+            conn.execute(f"ATTACH DATABASE ? AS camp{index}", (read_only_uri(db_path),))
+            selects.append((archived_sql if archived else live_sql).format(schema=f"camp{index}"))
+            parameters.extend((camp_id,) if archived else (camp_id, POEF_DRINK_PRICE, POEF_CIGARETTE_PRICE))
+
+        sql = " UNION ALL ".join(selects)
+        if kind == "leader_totals":
+            sql = f'''
+                SELECT lower(trim(name)), MIN(name), COUNT(DISTINCT camp_id), TOTAL(charged), TOTAL(paid_amount)
+                FROM ({sql}) GROUP BY lower(trim(name))
+            '''
+        return conn.execute(sql, parameters).fetchall()
+    finally:
+        conn.close()
+
+def _run_batches(kind: str, targets: List[Tuple[str, str, bool]], workers: Optional[int] = None) -> List[List[tuple]]:
+    """Run a report over all targets in attach-sized batches, across a process pool for many camps."""
+    tasks = [(kind, targets[start:start + ATTACH_BATCH_SIZE]) for start in range(0, len(targets), ATTACH_BATCH_SIZE)]
+    if workers == 1 or len(targets) < MIN_CAMPS_FOR_POOL:
+        return [_run_batch(task) for task in tasks]
+    # Only imported when reporting over many camps; the app imports this module at startup
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_batch, tasks))
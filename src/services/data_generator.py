@@ -0,0 +1,260 @@
+"""
+Synthetic data generator for Kamp Finances application.
+Creates realistic, reproducible camps for load testing and benchmarks.
+"""
+
+import itertools
+import random
+import sqlite3
+from datetime import date, timedelta
+from typing import List, Dict, Optional, Iterator, Tuple
+
+from models.leader import Leader
+from models.expense import ExpenseCategory
+from services.data_service import DataService
+
+# Camp sizes: leaders, receipts, receipt items
+PRESETS = {
+    "tiny": (10, 50, 500),
+    "small": (40, 300, 6_000),
+    "medium": (150, 2_000, 30_000),
+    "large": (1_000, 20_000, 250_000),
+    "federation": (5_000, 200_000, 2_000_000),
+}
+
+# Rows per executemany() call
+INSERT_CHUNK_SIZE = 10_000
+
+CAMP_START = date(2025, 7, 10)
+CAMP_DAYS = 10
+
+# (store, weight): most shopping happens at one supermarket
+STORES = [
+    ("Colruyt", 55), ("Aldi", 15), ("Lidl", 12), ("Delhaize", 8),
+    ("Carrefour", 5), ("Bakkerij Peeters", 4), ("Slagerij Janssens", 1),
+]
+
+# (category, weight) of receipt items
+CATEGORY_WEIGHTS = [(ExpenseCategory.GROEPSKAS, 70), (ExpenseCategory.POEF, 15), (ExpenseCategory.PA, 15)]
+
+# (item name, min price, max price); earlier items are bought more often
+CATALOGUE = {
+    ExpenseCategory.GROEPSKAS: [
+        ("Brood", 1.80, 2.90), ("Melk 1L", 0.95, 1.20), ("Pasta 1kg", 1.40, 2.50), ("Choco", 2.90, 4.50),
+        ("Boter", 2.10, 3.20), ("Kaas", 3.50, 7.90), ("Hesp", 2.80, 5.50), ("Appels 2kg", 2.50, 3.90),
+        ("Bananen", 1.60, 2.40), ("Aardappelen 5kg", 3.90, 6.50), ("Gehakt 1kg", 7.50, 11.90),
+        ("Tomatensaus", 1.20, 2.80), ("Rijst 1kg", 1.60, 2.90), ("Eieren 12st", 2.60, 3.90),
+        ("Yoghurt", 1.90, 3.10), ("Cornflakes", 2.40, 4.20), ("Wc-papier", 4.90, 8.90),
+        ("Afwasmiddel", 1.90, 3.50), ("Vuilzakken", 2.90, 5.90), ("Aluminiumfolie", 2.20, 3.90),
+    ],
+    ExpenseCategory.POEF: [
+        ("Jupiler 24x25cl", 14.90, 19.90), ("Coca-Cola 6x1.5L", 8.90, 12.50), ("Water 6x1.5L", 2.90, 4.20),
+        ("Fanta 6x1.5L", 7.90, 10.90), ("Ice Tea 6x1.5L", 6.90, 9.90), ("Duvel 4x33cl", 7.90, 9.90),
+        ("Fristi 6x20cl", 3.90, 5.20), ("Red Bull 4x25cl", 5.90, 7.90),
+    ],
+    ExpenseCategory.PA: [
+        ("Chips", 1.50, 2.90), ("Sigaretten", 8.50, 9.50), ("Snoep", 1.20, 3.50), ("Zonnecrème", 6.90, 14.90),
+        ("Tandpasta", 1.90, 3.90), ("Shampoo", 2.50, 5.90), ("Batterijen", 4.90, 9.90),
+        ("Muggenspray", 5.90, 9.90), ("Chocoladereep", 0.90, 2.50), ("Postkaarten", 2.00, 6.00),
+        ("Tabak", 9.90, 14.90), ("Deodorant", 2.90, 5.50),
+    ],
+}
+
+FIRST_NAMES = [
+    "Lotte", "Arne", "Emma", "Jonas", "Fien", "Lucas", "Marie", "Wout", "Lien", "Pieter", "Noor", "Bram",
+    "Hanne", "Tom", "Julie", "Robbe", "Elise", "Stijn", "Sarah", "Jens", "Anouk", "Kobe", "Febe", "Seppe",
+]
+LAST_NAMES = [
+    "Peeters", "Janssens", "Maes", "Jacobs", "Mertens", "Willems", "Claes", "Goossens", "Wouters",
+    "De Smet", "Dubois", "Lambert", "Vermeulen", "Hermans", "Aerts", "Van den Broeck",
+]
+
+# Share of PA items split over several leaders, and how many share them
+PA_SHARED_FRACTION = 0.3
+PA_UNASSIGNED_FRACTION = 0.1
+PA_MAX_SHARED = 4
+
+def _zipf_weights(count: int) -> List[float]:
+    """Cumulative weights where item n is picked about 1/n as often as the first."""
+    return list(itertools.accumulate(1.0 / (rank + 1) for rank in range(count)))
+
+class CampGenerator:
+    """Deterministic generator of camp data.
+
+    The same seed and sizes always produce the same leaders, receipts, items,
+    PA assignments and POEF tallies. Rows are streamed into SQLite with
+    executemany() in chunks, so even the federation preset never holds all
+    items in memory.
+    """
+
+    def __init__(self, leaders: int, receipts: int, items: int, seed: int = 0):
+        if leaders < 1 or receipts < 1 or items < receipts:
+            raise ValueError("Need at least one leader and receipt, and at least one item per receipt")
+        self.leader_count = leaders
+        self.receipt_count = receipts
+        self.item_count = items
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        self._store_names = [store for store, _ in STORES]
+        self._store_weights = list(itertools.accumulate(weight for _, weight in STORES))
+        self._categories = [category for category, _ in CATEGORY_WEIGHTS]
+        self._category_weights = list(itertools.accumulate(weight for _, weight in CATEGORY_WEIGHTS))
+        self._catalogue_weights = {category: _zipf_weights(len(entries)) for category, entries in CATALOGUE.items()}
+
+        self.leaders: List[Leader] = []
+
+    @classmethod
+    def from_preset(cls, preset: str, seed: int = 0) -> 'CampGenerator':
+        """Create a generator for one of the PRESETS."""
+        if preset not in PRESETS:
+            raise ValueError(f"Unknown preset '{preset}', choose from {', '.join(PRESETS)}")
+        return cls(*PRESETS[preset], seed=seed)
+
+    def generate_leaders(self) -> List[Leader]:
+        """Create the leaders with unique names and POEF tallies."""
+        rng = self.rng
+        seen = {}
+        self.leaders = []
+        for index in range(self.leader_count):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            seen[name] = seen.get(name, 0) + 1
+            if seen[name] > 1:
+                name = f"{name} {seen[name]}"
+
+            # Most leaders drink a few per day, about a third smokes
+            drinks = max(0, int(rng.gauss(2.5, 1.5) * CAMP_DAYS))
+            cigarettes = rng.randint(1, 6) if rng.random() < 0.3 else 0
+            self.leaders.append(Leader(
+                name=name,
+                id=f"L{index:06d}",
+                poef_drink_count=drinks,
+                poef_cigarette_count=cigarettes,
+                paid_amount=round(rng.choice([0.0, 0.0, 25.0, 50.0]), 2)
+            ))
+        return self.leaders
+
+    def _items_per_receipt(self) -> Iterator[int]:
+        """Yield item counts per receipt, varying around the average and adding up exactly."""
+        remaining_items = self.item_count
+        for remaining_receipts in range(self.receipt_count, 0, -1):
+            if remaining_receipts == 1:
+                yield remaining_items
+                return
+            average = remaining_items / remaining_receipts
+            count = round(self.rng.gauss(average, average / 3))
+            count = min(max(count, 1), remaining_items - (remaining_receipts - 1))
+            remaining_items -= count
+            yield count
+
+    def _assign_pa_item(self, item_id: str, total: float):
+        """Assign a PA item to one or more random leaders, splitting the cost equally."""
+        rng = self.rng
+        roll = rng.random()
+        if roll < PA_UNASSIGNED_FRACTION:
+            return
+        if roll < PA_UNASSIGNED_FRACTION + PA_SHARED_FRACTION and self.leader_count > 1:
+            sharers = rng.sample(self.leaders, min(rng.randint(2, PA_MAX_SHARED), self.leader_count))
+        else:
+            sharers = [rng.choice(self.leaders)]
+        amount = total / len(sharers)
+        for leader in sharers:
+            # Bypass add_pa_purchase, which re-sums every purchase on each call
+            leader.pa_purchases[item_id] = amount
+            leader.total_pa_expenses += amount
+
+    def iter_receipts(self) -> Iterator[Tuple[tuple, List[tuple]]]:
+        """Yield (receipt row, item rows) for every receipt, assigning PA items along the way."""
+        rng = self.rng
+        item_index = 0
+        for receipt_index, item_count in enumerate(self._items_per_receipt()):
+            receipt_id = f"R{receipt_index:07d}"
+            day = CAMP_START + timedelta(days=receipt_index * CAMP_DAYS // self.receipt_count)
+            receipt_date = day.isoformat()
+            store = rng.choices(self._store_names, cum_weights=self._store_weights)[0]
+
+            totals = {category: 0.0 for category in ExpenseCategory}
+            items = []
+            for category in rng.choices(self._categories, cum_weights=self._category_weights, k=item_count):
+                name, low, high = rng.choices(CATALOGUE[category], cum_weights=self._catalogue_weights[category])[0]
+                price = round(rng.uniform(low, high), 2)
+                quantity = float(rng.choices((1, 2, 3, 6), weights=(70, 20, 6, 4))[0])
+                item_id = f"I{item_index:08d}"
+                item_index += 1
+
+                total = price * quantity
+                totals[category] += total
+                items.append((item_id, name, price, quantity, category.value, receipt_date, receipt_id))
+                if category == ExpenseCategory.PA:
+                    self._assign_pa_item(item_id, total)
+
+            receipt_row = (
+                receipt_id, receipt_date, store, sum(totals.values()),
+                totals[ExpenseCategory.GROEPSKAS], totals[ExpenseCategory.POEF], totals[ExpenseCategory.PA]
+            )
+            yield receipt_row, items
+
+    def write(self, data_service: DataService, replace: bool = False) -> Dict[str, int]:
+        """Generate the camp straight into the database and return the row counts.
+
+        Refuses to touch a database that already holds data unless replace is set,
+        in which case all existing leaders, receipts and items are deleted first.
+        """
+        conn = sqlite3.connect(data_service.db_path)
+        try:
+            has_data = conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM leaders) OR EXISTS (SELECT 1 FROM receipts)"
+            ).fetchone()[0]
+            if has_data and not replace:
+                raise ValueError("Database already contains data; generate with replace (--replace) to overwrite it")
+
+            # Throwaway bulk load: skip fsyncs, the caller can regenerate on a crash
+            conn.execute("PRAGMA synchronous = OFF")
+            with conn:
+                conn.execute("DELETE FROM receipt_items")
+                conn.execute("DELETE FROM receipts")
+                conn.execute("DELETE FROM leaders")
+
+                self.generate_leaders()
+                receipt_rows = []
+                item_rows = []
+                for receipt_row, items in self.iter_receipts():
+                    receipt_rows.append(receipt_row)
+                    item_rows.extend(items)
+                    if len(item_rows) >= INSERT_CHUNK_SIZE:
+                        self._insert(conn, receipt_rows, item_rows)
+                        receipt_rows, item_rows = [], []
+                self._insert(conn, receipt_rows, item_rows)
+
+                conn.executemany(DataService.LEADER_UPSERT_SQL, [data_service._leader_row(leader) for leader in self.leaders])
+        finally:
+            conn.close()
+
+        return {
+            "leaders": self.leader_count,
+            "receipts": self.receipt_count,
+            "items": self.item_count,
+            "pa_assignments": sum(len(leader.pa_purchases) for leader in self.leaders),
+        }
+
+    def _insert(self, conn: sqlite3.Connection, receipt_rows: List[tuple], item_rows: List[tuple]):
+        """Insert a chunk of receipts and items."""
+        conn.executemany('''
+            INSERT INTO receipts (id, date, store_name, total_amount, groepskas_total, poef_total, pa_total)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', receipt_rows)
+        conn.executemany('''
+            INSERT INTO receipt_items (id, name, price, quantity, category, date, receipt_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', item_rows)
+
+def generate_camp(data_service: DataService, preset: str = "tiny", seed: int = 0, replace: bool = False,
+                  leaders: Optional[int] = None, receipts: Optional[int] = None, items: Optional[int] = None) -> Dict[str, int]:
+    """Fill a database with a generated camp; explicit sizes override the preset's."""
+    generator = CampGenerator.from_preset(preset, seed=seed)
+    generator.leader_count = leaders or generator.leader_count
+    generator.receipt_count = receipts or generator.receipt_count
+    generator.item_count = items or generator.item_count
+    if generator.item_count < generator.receipt_count:
+        raise ValueError("Need at least one item per receipt")
+    return generator.write(data_service, replace=replace)
@@ -3,22 +3,149 @@ Data service for Kamp Finances application.
 Handles data persistence and loading using SQLite database.
 """
 
+import contextlib
+import functools
 import os
+import random
 import sqlite3
+import sys
+import threading
+import time
 from typing import List, Dict, Optional
 from datetime import datetime
 
 from models.leader import Leader
 from models.receipt import Receipt
 from models.expense import Expense
+from services.sync_service import ensure_sync_tables
+from utils.paths import DEFAULT_DATA_DIR
+from utils.perf import timed
+
+# How long a statement waits for another process to release its lock
+BUSY_TIMEOUT_SECONDS = 10.0
+
+# Retries of a whole transaction that still found the database locked, with growing pauses
+BUSY_RETRIES = 4
+BUSY_BACKOFF_SECONDS = 0.1
+# Longest one retried call waits for locks, lock timeouts and retries together; saves
+# also run on the Tk thread, so this bounds how long a locked database freezes the app
+BUSY_MAX_WAIT_SECONDS = BUSY_TIMEOUT_SECONDS
+
+# Database maintenance, see DataService.run_maintenance
+MAINTENANCE_BUDGET_SECONDS = 2.0
+# ANALYZE and quick_check are only repeated after this long
+ANALYZE_INTERVAL_HOURS = 24
+QUICK_CHECK_INTERVAL_HOURS = 24
+# Rows ANALYZE samples per index, which keeps it fast on large tables
+ANALYSIS_LIMIT = 1000
+# Free pages returned to the file system per incremental_vacuum step, checking the budget in between
+VACUUM_PAGES_PER_STEP = 256
+# The progress handler checks the time budget every this many VM instructions
+BUDGET_CHECK_STEPS = 10000
+# Shorter budget when closing the app, so closing stays quick
+SHUTDOWN_MAINTENANCE_BUDGET_SECONDS = 0.5
+
+class MaintenanceBudgetExceeded(Exception):
+    """A maintenance task ran out of its time budget before it finished."""
+
+# Deadline of the outermost retried call on this thread; connections opened meanwhile wait only until then
+_busy_deadline = threading.local()
+
+def _lock_timeout() -> float:
+    """Seconds a new connection may wait for a lock."""
+    deadline = getattr(_busy_deadline, "value", None)
+    if deadline is None:
+        return BUSY_TIMEOUT_SECONDS
+    return max(0.0, deadline - time.monotonic())
+
+def retry_when_busy(func):
+    """Retry a method whose transaction failed because another process held the database.
+
+    All attempts, and retried calls nested in it, wait BUSY_MAX_WAIT_SECONDS in total at most.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        outermost = getattr(_busy_deadline, "value", None) is None
+        if outermost:
+            _busy_deadline.value = time.monotonic() + BUSY_MAX_WAIT_SECONDS
+        try:
+            for attempt in range(BUSY_RETRIES + 1):
+                try:
+                    return func(*args, **kwargs)
+                except sqlite3.OperationalError as e:
+                    message = str(e)
+                    if attempt == BUSY_RETRIES or ("locked" not in message and "busy" not in message):
+                        raise
+                    # Jitter so two waiting processes do not retry in lockstep
+                    pause = BUSY_BACKOFF_SECONDS * 2 ** attempt * random.uniform(0.5, 1.5)
+                    if time.monotonic() + pause >= _busy_deadline.value:
+                        raise
+                    time.sleep(pause)
+        finally:
+            if outermost:
+                _busy_deadline.value = None
+    return wrapper
+
+def _query_tracer(data_dir: str):
+    """Get the SQL tracer for data_dir if tracing is on; utils.sql_trace is only imported then."""
+    # Tracing is on when KAMP_SQL_TRACE=1 or someone imported the module to call enable()
+    if "utils.sql_trace" not in sys.modules and os.environ.get("KAMP_SQL_TRACE") != "1":
+        return None
+    from utils import sql_trace
+    return sql_trace.get_tracer(data_dir) if sql_trace.is_enabled() else None
 
 class DataService:
     """Service for managing data persistence using SQLite."""
     
-    def __init__(self, data_dir: str = "data"):
+    # Upsert keeps the rowid of existing leaders, so their load order does not change
+    LEADER_UPSERT_SQL = '''
+        INSERT INTO leaders (id, name, total_pa_expenses, poef_drink_count, poef_cigarette_count, pa_purchases, paid_amount)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            name = excluded.name,
+            total_pa_expenses = excluded.total_pa_expenses,
+            poef_drink_count = excluded.poef_drink_count,
+            poef_cigarette_count = excluded.poef_cigarette_count,
+            pa_purchases = excluded.pa_purchases,
+            paid_amount = excluded.paid_amount
+    '''
+    
+    RECEIPT_UPSERT_SQL = '''
+        INSERT INTO receipts (id, date, store_name, total_amount, groepskas_total, poef_total, pa_total)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            date = excluded.date,
+            store_name = excluded.store_name,
+            total_amount = excluded.total_amount,
+            groepskas_total = excluded.groepskas_total,
+            poef_total = excluded.poef_total,
+            pa_total = excluded.pa_total
+    '''
+    
+    ITEM_UPSERT_SQL = '''
+        INSERT INTO receipt_items (id, name, price, quantity, category, date, receipt_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id, receipt_id) DO UPDATE SET
+            name = excluded.name,
+            price = excluded.price,
+            quantity = excluded.quantity,
+            category = excluded.category,
+            date = excluded.date
+    '''
+    
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR):
         self.data_dir = data_dir
         self._ensure_data_directory()
         self.db_path = os.path.join(self.data_dir, "kamp_finances.db")
+        # Set when SQL tracing is on, see utils.sql_trace
+        self.query_tracer = _query_tracer(self.data_dir)
+        # Rows as this instance last loaded or wrote them, per table and key; None until loaded.
+        # Saves only write rows that differ and only delete rows that were removed here, so
+        # rows another process changed in the meantime are left alone.
+        self._saved_rows = {"leaders": None, "receipts": None, "receipt_items": None}
+        self._saved_rows_lock = threading.Lock()
+        # Set by the app, so its ChangeMonitor can tell this instance's commits from other processes'
+        self.change_monitor = None
         self._ensure_tables()
 
     def _ensure_data_directory(self):
@@ -26,13 +153,40 @@ class DataService:
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
 
+    def _commit(self, conn: sqlite3.Connection):
+        """Commit a write transaction, telling the change monitor it was this instance's."""
+        if self.change_monitor is None:
+            conn.commit()
+            return
+        with self.change_monitor.local_commit():
+            conn.commit()
+
+    @contextlib.contextmanager
+    def _local_changes(self):
+        """Tell the change monitor that the commits made inside come from this instance."""
+        if self.change_monitor is None:
+            yield
+            return
+        self.change_monitor.begin_local_changes()
+        try:
+            yield
+        finally:
+            self.change_monitor.end_local_changes()
+
     def _get_connection(self):
-        return sqlite3.connect(self.db_path)
+        if self.query_tracer is not None:
+            return self.query_tracer.connect(self.db_path, timeout=_lock_timeout())
+        return sqlite3.connect(self.db_path, timeout=_lock_timeout())
 
     def _ensure_tables(self):
         """Create tables if they don't exist, and add paid_amount if missing."""
         with self._get_connection() as conn:
             c = conn.cursor()
+            # Free pages can be returned bit by bit during maintenance; only takes effect before
+            # the first table exists, older files are converted by vacuum()
+            c.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            # Readers and the writer no longer block each other; the setting is stored in the file
+            c.execute('PRAGMA journal_mode=WAL')
             # Leaders table
             c.execute('''
                 CREATE TABLE IF NOT EXISTS leaders (
@@ -76,8 +230,22 @@ class DataService:
                     FOREIGN KEY (receipt_id) REFERENCES receipts(id) ON DELETE CASCADE
                 )
             ''')
+            # Items are always looked up per receipt
+            c.execute('CREATE INDEX IF NOT EXISTS idx_receipt_items_receipt_id ON receipt_items (receipt_id)')
+            # Change tracking for syncing between laptops
+            ensure_sync_tables(c)
+            # When each maintenance task last completed
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS maintenance_runs (
+                    task TEXT PRIMARY KEY,
+                    finished_at TEXT NOT NULL,
+                    seconds REAL NOT NULL
+                )
+            ''')
             conn.commit()
 
+    @timed()
+    @retry_when_busy
     def load_leaders(self) -> List[Leader]:
         """Load leaders from SQLite database."""
         leaders = []
@@ -96,126 +264,178 @@ class DataService:
                     "paid_amount": float(row[6]) if row[6] is not None else 0.0
                 }
                 leaders.append(Leader.from_dict(leader_data))
+        self._set_saved_rows("leaders", {leader.id: self._leader_row(leader) for leader in leaders})
         return leaders
 
+    def _set_saved_rows(self, table: str, rows: Dict):
+        """Remember the rows of a table as they are in the database now."""
+        with self._saved_rows_lock:
+            self._saved_rows[table] = rows
+
+    def _update_saved_rows(self, table: str, written: Dict, removed=()):
+        """Record written and removed rows of a table that has been loaded."""
+        with self._saved_rows_lock:
+            saved = self._saved_rows[table]
+            if saved is None:
+                return
+            saved.update(written)
+            for key in removed:
+                saved.pop(key, None)
+
+    def _diff_rows(self, conn: sqlite3.Connection, table: str, rows: Dict, key_sql: str) -> tuple:
+        """Compare rows with the saved rows of a table and return (changed rows, removed keys).
+
+        A table this instance never loaded is compared with the keys in the database,
+        so every row is written and rows missing from `rows` are removed.
+        """
+        with self._saved_rows_lock:
+            saved = self._saved_rows[table]
+            saved = dict(saved) if saved is not None else None
+        if saved is None:
+            saved = {key if len(key) > 1 else key[0]: None for key in conn.execute(key_sql)}
+        changed = [row for key, row in rows.items() if saved.get(key) != row]
+        removed = [key for key in saved if key not in rows]
+        return changed, removed
+
+    @timed()
+    @retry_when_busy
     def save_leaders(self, leaders: List[Leader]):
-        """Save leaders to SQLite database."""
+        """Save leaders, writing only the rows that changed since they were loaded."""
+        rows = {leader.id: self._leader_row(leader) for leader in leaders}
         with self._get_connection() as conn:
-            c = conn.cursor()
-            c.execute("DELETE FROM leaders")  # Clear table before saving all
-            for leader in leaders:
-                leader_dict = leader.to_dict()
-                pa_purchases_str = self._serialize_pa_purchases(leader.pa_purchases)
-                c.execute('''
-                    INSERT INTO leaders (id, name, total_pa_expenses, poef_drink_count, poef_cigarette_count, pa_purchases, paid_amount)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    leader_dict["id"],
-                    leader_dict["name"],
-                    leader_dict["total_pa_expenses"],
-                    leader_dict["poef_drink_count"],
-                    leader_dict["poef_cigarette_count"],
-                    pa_purchases_str,
-                    leader_dict["paid_amount"]
-                ))
-            conn.commit()
+            changed, removed = self._diff_rows(conn, "leaders", rows, "SELECT id FROM leaders")
+            if not changed and not removed:
+                return
+            conn.executemany(self.LEADER_UPSERT_SQL, changed)
+            conn.executemany("DELETE FROM leaders WHERE id = ?", [(leader_id,) for leader_id in removed])
+            self._commit(conn)
+        self._set_saved_rows("leaders", rows)
+
+    @timed()
+    @retry_when_busy
+    def update_leaders(self, leaders: List[Leader]):
+        """Write the given leaders in a single transaction, leaving other leaders untouched."""
+        if not leaders:
+            return
+        rows = {leader.id: self._leader_row(leader) for leader in leaders}
+        with self._get_connection() as conn:
+            conn.executemany(self.LEADER_UPSERT_SQL, list(rows.values()))
+            self._commit(conn)
+        self._update_saved_rows("leaders", rows)
+
+    def _leader_row(self, leader: Leader) -> tuple:
+        """Convert a leader to a row for the leaders table."""
+        leader_dict = leader.to_dict()
+        return (
+            leader_dict["id"],
+            leader_dict["name"],
+            leader_dict["total_pa_expenses"],
+            leader_dict["poef_drink_count"],
+            leader_dict["poef_cigarette_count"],
+            self._serialize_pa_purchases(leader.pa_purchases),
+            leader_dict["paid_amount"]
+        )
 
+    @timed()
+    @retry_when_busy
     def load_receipts(self) -> List[Receipt]:
-        """Load receipts from SQLite database."""
+        """Load receipts and all their items from SQLite database."""
         receipts = []
         with self._get_connection() as conn:
+            # Both reads see the same snapshot, even while another program writes
+            conn.execute("BEGIN")
             c = conn.cursor()
             c.execute("SELECT id, date, store_name, total_amount, groepskas_total, poef_total, pa_total FROM receipts")
-            rows = c.fetchall()
-            for row in rows:
-                receipt_data = {
+            receipt_rows = c.fetchall()
+
+            # All items in one scan, grouped per receipt in rowid order
+            items_by_receipt = {}
+            c.execute("SELECT id, name, price, quantity, category, date, receipt_id FROM receipt_items")
+            for row in c.fetchall():
+                item_data = {
                     "id": row[0],
-                    "date": row[1],
-                    "store_name": row[2],
-                    "total_amount": float(row[3]),
-                    "groepskas_total": float(row[4]),
-                    "poef_total": float(row[5]),
-                    "pa_total": float(row[6])
+                    "name": row[1],
+                    "price": float(row[2]),
+                    "quantity": float(row[3]),
+                    "category": row[4],
+                    "date": row[5],
+                    "receipt_id": row[6]
                 }
-                items = self._load_receipt_items(row[0], conn)
-                receipt = Receipt.from_dict(receipt_data)
-                receipt.items = items
-                receipts.append(receipt)
-        return receipts
-
-    def save_receipts(self, receipts: List[Receipt]):
-        """Save receipts to SQLite database."""
-        with self._get_connection() as conn:
-            c = conn.cursor()
-            c.execute("DELETE FROM receipts")
-            c.execute("DELETE FROM receipt_items")
-            for receipt in receipts:
-                receipt_dict = receipt.to_dict()
-                c.execute('''
-                    INSERT INTO receipts (id, date, store_name, total_amount, groepskas_total, poef_total, pa_total)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    receipt_dict["id"],
-                    receipt_dict["date"],
-                    receipt_dict["store_name"],
-                    receipt_dict["total_amount"],
-                    receipt_dict["groepskas_total"],
-                    receipt_dict["poef_total"],
-                    receipt_dict["pa_total"]
-                ))
-                self._save_receipt_items(receipt.id, receipt.items, conn)
+                items_by_receipt.setdefault(row[6], []).append(Expense.from_dict(item_data))
             conn.commit()
 
-    def _load_receipt_items(self, receipt_id: str, conn=None) -> List[Expense]:
-        """Load items for a specific receipt from SQLite."""
-        close_conn = False
-        if conn is None:
-            conn = self._get_connection()
-            close_conn = True
-        items = []
-        c = conn.cursor()
-        c.execute("SELECT id, name, price, quantity, category, date, receipt_id FROM receipt_items WHERE receipt_id = ?", (receipt_id,))
-        rows = c.fetchall()
-        for row in rows:
-            item_data = {
+        for row in receipt_rows:
+            receipt_data = {
                 "id": row[0],
-                "name": row[1],
-                "price": float(row[2]),
-                "quantity": float(row[3]),
-                "category": row[4],
-                "date": row[5],
-                "receipt_id": row[6]
+                "date": row[1],
+                "store_name": row[2],
+                "total_amount": float(row[3]),
+                "groepskas_total": float(row[4]),
+                "poef_total": float(row[5]),
+                "pa_total": float(row[6])
             }
-            items.append(Expense.from_dict(item_data))
-        if close_conn:
-            conn.close()
-        return items
+            receipt = Receipt.from_dict(receipt_data)
+            receipt.items = items_by_receipt.get(row[0], [])
+            receipts.append(receipt)
+        self._set_saved_rows("receipts", {receipt.id: self._receipt_row(receipt) for receipt in receipts})
+        self._set_saved_rows("receipt_items", self._item_rows(receipts))
+        return receipts
 
-    def _save_receipt_items(self, receipt_id: str, items: List[Expense], conn=None):
-        """Save items for a specific receipt to SQLite."""
-        close_conn = False
-        if conn is None:
-            conn = self._get_connection()
-            close_conn = True
-        c = conn.cursor()
-        for item in items:
-            item_dict = item.to_dict()
-            c.execute('''
-                INSERT INTO receipt_items (id, name, price, quantity, category, date, receipt_id)
+    def _receipt_row(self, receipt: Receipt) -> tuple:
+        """Convert a receipt to a row for the receipts table."""
+        return (receipt.id, receipt.date, receipt.store_name, receipt.total_amount,
+                receipt.groepskas_total, receipt.poef_total, receipt.pa_total)
+
+    def _item_rows(self, receipts: List[Receipt]) -> Dict[tuple, tuple]:
+        """Convert the items of receipts to receipt_items rows keyed by (id, receipt_id)."""
+        rows = {}
+        for receipt in receipts:
+            for item in receipt.items:
+                row = (item.id or "", item.name, item.price, item.quantity,
+                       item.category.value, item.date or "", receipt.id)
+                rows[(row[0], receipt.id)] = row
+        return rows
+
+    @timed()
+    @retry_when_busy
+    def save_receipts(self, receipts: List[Receipt]):
+        """Save receipts and their items, writing only the rows that changed since they were loaded."""
+        receipt_rows = {receipt.id: self._receipt_row(receipt) for receipt in receipts}
+        item_rows = self._item_rows(receipts)
+        with self._get_connection() as conn:
+            changed_receipts, removed_receipts = self._diff_rows(conn, "receipts", receipt_rows, "SELECT id FROM receipts")
+            changed_items, removed_items = self._diff_rows(
+                conn, "receipt_items", item_rows, "SELECT id, receipt_id FROM receipt_items"
+            )
+            if not (changed_receipts or removed_receipts or changed_items or removed_items):
+                return
+            # Receipts before items, and items of removed receipts go with them
+            conn.executemany(self.RECEIPT_UPSERT_SQL, changed_receipts)
+            conn.executemany(self.ITEM_UPSERT_SQL, changed_items)
+            conn.executemany("DELETE FROM receipt_items WHERE id = ? AND receipt_id = ?", removed_items)
+            conn.executemany("DELETE FROM receipts WHERE id = ?", [(receipt_id,) for receipt_id in removed_receipts])
+            self._commit(conn)
+        self._set_saved_rows("receipts", receipt_rows)
+        self._set_saved_rows("receipt_items", item_rows)
+
+    @timed()
+    @retry_when_busy
+    def add_receipts(self, receipts: List[Receipt]):
+        """Insert new receipts and their items in a single transaction, leaving existing receipts untouched."""
+        if not receipts:
+            return
+        receipt_rows = {receipt.id: self._receipt_row(receipt) for receipt in receipts}
+        item_rows = self._item_rows(receipts)
+        with self._get_connection() as conn:
+            conn.executemany('''
+                INSERT INTO receipts (id, date, store_name, total_amount, groepskas_total, poef_total, pa_total)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                item_dict.get("id", ""),
-                item_dict["name"],
-                item_dict["price"],
-                item_dict.get("quantity", 1.0),
-                item_dict.get("category", "Groepskas"),
-                item_dict.get("date", ""),
-                receipt_id
-            ))
-        if close_conn:
-            conn.commit()
-            conn.close()
-    
+            ''', list(receipt_rows.values()))
+            conn.executemany(self.ITEM_UPSERT_SQL, list(item_rows.values()))
+            self._commit(conn)
+        self._update_saved_rows("receipts", receipt_rows)
+        self._update_saved_rows("receipt_items", item_rows)
+
     def _serialize_pa_purchases(self, purchases: Dict[str, float]) -> str:
         """Convert pa_purchases dictionary to serializable string."""
         if not purchases:
@@ -245,8 +465,10 @@ class DataService:
         
         return purchases
     
+    @timed()
+    @retry_when_busy
     def save_all_data(self, leaders: List[Leader], receipts: List[Receipt]):
-        """Save all data to files."""
+        """Save all data to files; both saves share one lock wait budget."""
         self.save_leaders(leaders)
         self.save_receipts(receipts)
     
@@ -302,17 +524,223 @@ class DataService:
             print(f"Error exporting summary: {e}")
             return None
 
-    def backup_data(self):
-        """Create a backup of the SQLite database file."""
-        from shutil import copy2
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_dir = os.path.join(self.data_dir, f"backup_{timestamp}")
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
-        db_backup_path = os.path.join(backup_dir, "kamp_finances.db")
+    @retry_when_busy
+    def vacuum(self) -> tuple:
+        """Rebuild the database file to reclaim free pages; return (size before, size after) in bytes.
+
+        Also switches older files to incremental auto-vacuum, so maintenance can free
+        pages from then on without a full rebuild.
+        """
+        size_before = os.path.getsize(self.db_path)
+        with self._local_changes():
+            conn = self._get_connection()
+            try:
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("VACUUM")
+                # Move the rebuilt pages from the WAL into the database file
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                conn.close()
+        return size_before, os.path.getsize(self.db_path)
+
+    def get_storage_stats(self, conn: Optional[sqlite3.Connection] = None) -> Dict:
+        """File size, WAL size, page counts and auto-vacuum mode of the database."""
+        own_conn = conn is None
+        if own_conn:
+            conn = self._get_connection()
         try:
-            copy2(self.db_path, db_backup_path)
-            return backup_dir
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        finally:
+            if own_conn:
+                conn.close()
+        wal_path = self.db_path + "-wal"
+        return {
+            "file_bytes": os.path.getsize(self.db_path),
+            "wal_bytes": os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+            "page_size": page_size,
+            "page_count": page_count,
+            "freelist_pages": freelist_pages,
+            "auto_vacuum": ("none", "full", "incremental")[auto_vacuum],
+        }
+
+    def _last_maintenance(self, conn: sqlite3.Connection) -> Dict[str, datetime]:
+        """When each maintenance task last completed."""
+        rows = conn.execute("SELECT task, finished_at FROM maintenance_runs").fetchall()
+        return {task: datetime.fromisoformat(finished_at) for task, finished_at in rows}
+
+    def run_maintenance(self, budget_seconds: float = MAINTENANCE_BUDGET_SECONDS, force: bool = False) -> Dict:
+        """Run PRAGMA optimize, ANALYZE, incremental_vacuum, quick_check and a WAL checkpoint
+        within a time budget, and report the storage before and after with the time per task.
+
+        ANALYZE and quick_check are skipped when they ran recently, unless force is set.
+        A task still running when the budget is used up is interrupted and reported as
+        such, so maintenance can run at any idle moment.
+        """
+        with self._local_changes():
+            return self._run_maintenance(budget_seconds, force)
+
+    def _run_maintenance(self, budget_seconds: float, force: bool) -> Dict:
+        start = time.perf_counter()
+        deadline = start + budget_seconds
+        # Only the tasks themselves are interrupted, never the bookkeeping around them
+        budget = {"enforce": False, "exceeded": False}
+
+        def check_budget() -> int:
+            if budget["enforce"] and time.perf_counter() > deadline:
+                budget["exceeded"] = True
+                return 1
+            return 0
+
+        conn = self._get_connection()
+        # Replaces the SQL tracer's step counter on this connection, maintenance is not traced
+        conn.set_progress_handler(check_budget, BUDGET_CHECK_STEPS)
+        report = {"before": self.get_storage_stats(conn), "tasks": {}, "quick_check": None}
+        try:
+            last_run = self._last_maintenance(conn)
+            now = datetime.now()
+
+            def due(task: str, interval_hours: float) -> bool:
+                return force or task not in last_run or (now - last_run[task]).total_seconds() >= interval_hours * 3600
+
+            def run(task: str, work):
+                if time.perf_counter() > deadline:
+                    report["tasks"][task] = "out of time"
+                    return
+                task_start = time.perf_counter()
+                budget["enforce"] = True
+                budget["exceeded"] = False
+                try:
+                    work()
+                except MaintenanceBudgetExceeded:
+                    report["tasks"][task] = "interrupted"
+                    return
+                except sqlite3.OperationalError:
+                    # How SQLite reports that the progress handler stopped a statement
+                    if not budget["exceeded"]:
+                        raise
+                    report["tasks"][task] = "interrupted"
+                    return
+                finally:
+                    budget["enforce"] = False
+                seconds = time.perf_counter() - task_start
+                report["tasks"][task] = seconds
+                conn.execute('''
+                    INSERT INTO maintenance_runs (task, finished_at, seconds) VALUES (?, ?, ?)
+                    ON CONFLICT(task) DO UPDATE SET finished_at = excluded.finished_at, seconds = excluded.seconds
+                ''', (task, datetime.now().isoformat(timespec="seconds"), seconds))
+                conn.commit()
+
+            def analyze():
+                conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+                conn.execute("ANALYZE")
+
+            def incremental_vacuum():
+                while conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+                    if time.perf_counter() > deadline:
+                        raise MaintenanceBudgetExceeded("incremental_vacuum")
+                    conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP})").fetchall()
+                    conn.commit()
+
+            def quick_check():
+                report["quick_check"] = "; ".join(row[0] for row in conn.execute("PRAGMA quick_check").fetchall())
+
+            run("optimize", lambda: conn.execute("PRAGMA optimize"))
+            if due("analyze", ANALYZE_INTERVAL_HOURS):
+                run("analyze", analyze)
+            if report["before"]["freelist_pages"] > 0:
+                if report["before"]["auto_vacuum"] == "incremental":
+                    run("incremental_vacuum", incremental_vacuum)
+                else:
+                    report["tasks"]["incremental_vacuum"] = "needs one full vacuum first"
+            if due("quick_check", QUICK_CHECK_INTERVAL_HOURS):
+                run("quick_check", quick_check)
+            # Returns the pages freed above to the file system and keeps the WAL small
+            run("checkpoint", lambda: conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall())
+            report["after"] = self.get_storage_stats(conn)
+        finally:
+            conn.close()
+        report["seconds"] = time.perf_counter() - start
+        return report
+
+    def backup_data(self, compress: bool = False):
+        """Back up the database with the SQLite backup API and return the backup file path."""
+        from services.backup_service import BackupService
+        try:
+            return BackupService(self.db_path).create_backup(compress=compress)
         except Exception as e:
             print(f"Error backing up database: {e}")
-            return None 
\ No newline at end of file
+            return None
+
+def format_maintenance_report(report: Dict) -> str:
+    """Summarize a maintenance report on one line for the status bar."""
+    after = report["after"]
+    tasks = ", ".join(
+        f"{task} {value * 1000:.0f} ms" if isinstance(value, float) else f"{task} {value}"
+        for task, value in report["tasks"].items()
+    )
+    check = f", check {report['quick_check']}" if report["quick_check"] else ""
+    return (f"Maintenance: {after['file_bytes'] / 1024:.0f} KB, {after['freelist_pages']} free pages, "
+            f"{report['seconds'] * 1000:.0f} ms ({tasks}){check}")
+
+class ChangeMonitor:
+    """Notices commits by other connections with PRAGMA data_version on one open connection.
+
+    data_version only changes when another connection commits, and reading it costs
+    next to nothing, so it can be polled on a timer. The app's own commits go through
+    local_commit(), which records the version right after them; a change seen before
+    one of them is kept until the next has_changed().
+    """
+
+    def __init__(self, db_path: str):
+        # Saves commit on worker threads too
+        self._conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._version = self._read()
+        self._external_change = False
+
+    def _read(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _note_external_change(self):
+        if self._read() != self._version:
+            self._external_change = True
+
+    @contextlib.contextmanager
+    def local_commit(self):
+        """Wrap the commit of a local write transaction.
+
+        The transaction holds the write lock, so no other connection can commit between
+        the version checks before and after the commit.
+        """
+        with self._lock:
+            self._note_external_change()
+            try:
+                yield
+            finally:
+                self._version = self._read()
+
+    def begin_local_changes(self):
+        """Start a run of local commits that cannot go through local_commit(), like maintenance."""
+        with self._lock:
+            self._note_external_change()
+
+    def end_local_changes(self):
+        """Accept the current version after begin_local_changes()."""
+        with self._lock:
+            self._version = self._read()
+
+    def has_changed(self) -> bool:
+        """Check whether another connection committed since the last check."""
+        with self._lock:
+            version = self._read()
+            changed = self._external_change or version != self._version
+            self._version = version
+            self._external_change = False
+            return changed
+
+    def close(self):
+        """Close the monitoring connection."""
+        self._conn.close()
@@ -0,0 +1,178 @@
+"""
+Export service for Kamp Finances application.
+Streams tabular CSV exports straight from the database in fixed-size chunks.
+"""
+
+import csv
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable
+
+from models.leader import POEF_DRINK_PRICE, POEF_CIGARETTE_PRICE
+
+# Rows fetched from the cursor and written per chunk
+EXPORT_CHUNK_SIZE = 1000
+
+# Export tables: header, query, the columns that hold amounts in euro and other decimal columns
+EXPORT_TABLES = {
+    "leaders": {
+        "header": ["ID", "Name", "Total PA Expenses", "POEF Drinks", "POEF Cigarettes",
+                   "POEF Total", "Total Expenses", "Paid Amount", "Remaining to Pay"],
+        "sql": '''
+            SELECT id, name, total_pa_expenses, poef_drink_count, poef_cigarette_count,
+                   poef_total, total_pa_expenses + poef_total, paid_amount,
+                   total_pa_expenses + poef_total - paid_amount
+            FROM (
+                SELECT *, poef_drink_count * :drink_price + poef_cigarette_count * :cigarette_price AS poef_total
+                FROM leaders
+            )
+            ORDER BY rowid
+        ''',
+        "money": {2, 5, 6, 7, 8},
+    },
+    "receipts": {
+        "header": ["ID", "Date", "Store", "Total Amount", "Groepskas", "POEF", "PA", "Items"],
+        "sql": '''
+            SELECT r.id, r.date, r.store_name, r.total_amount, r.groepskas_total, r.poef_total, r.pa_total,
+                   (SELECT COUNT(*) FROM receipt_items i WHERE i.receipt_id = r.id)
+            FROM receipts r
+            ORDER BY r.rowid
+        ''',
+        "money": {3, 4, 5, 6},
+    },
+    "items": {
+        "header": ["ID", "Receipt ID", "Receipt Date", "Store", "Name", "Category",
+                   "Price", "Quantity", "Total Price"],
+        "sql": '''
+            SELECT i.id, i.receipt_id, r.date, r.store_name, i.name, i.category,
+                   i.price, i.quantity, i.price * i.quantity
+            FROM receipt_items i
+            LEFT JOIN receipts r ON r.id = i.receipt_id
+            ORDER BY r.rowid, i.rowid
+        ''',
+        "money": {6, 8},
+        "decimals": {7},
+    },
+    # pa_purchases is stored as "item_id:amount|item_id:amount"; split it in SQL
+    # so assignments stream like any other table
+    "assignments": {
+        "header": ["Leader ID", "Leader", "Item ID", "Item", "Receipt ID", "Receipt Date", "Amount"],
+        "sql": '''
+            WITH RECURSIVE split(leader_rowid, leader_id, leader_name, position, entry, rest) AS (
+                SELECT rowid, id, name, 0, '', pa_purchases || '|'
+                FROM leaders
+                WHERE pa_purchases IS NOT NULL AND pa_purchases != ''
+                UNION ALL
+                SELECT leader_rowid, leader_id, leader_name, position + 1,
+                       substr(rest, 1, instr(rest, '|') - 1),
+                       substr(rest, instr(rest, '|') + 1)
+                FROM split
+                WHERE rest != ''
+            ),
+            assignments AS (
+                SELECT leader_rowid, leader_id, leader_name, position,
+                       substr(entry, 1, instr(entry, ':') - 1) AS item_id,
+                       CAST(substr(entry, instr(entry, ':') + 1) AS REAL) AS amount
+                FROM split
+                WHERE instr(entry, ':') > 0
+            )
+            SELECT a.leader_id, a.leader_name, a.item_id, i.name, i.receipt_id, r.date, a.amount
+            FROM assignments a
+            LEFT JOIN receipt_items i ON i.id = a.item_id
+            LEFT JOIN receipts r ON r.id = i.receipt_id
+            ORDER BY a.leader_rowid, a.position
+        ''',
+        "money": {6},
+    },
+}
+
+class CSVExporter:
+    """Writes CSV exports from SQL cursors with constant memory use.
+
+    Rows are fetched with fetchmany() in chunks of EXPORT_CHUNK_SIZE and written
+    straight to disk, so a 100k-row ledger never sits in memory as a list.
+    Amounts are written with two decimals, with a decimal comma if requested
+    (use it together with delimiter=";" for Belgian Excel).
+    """
+
+    def __init__(self, db_path: str, delimiter: str = ",", decimal_comma: bool = False,
+                 chunk_size: int = EXPORT_CHUNK_SIZE):
+        if len(delimiter) != 1:
+            raise ValueError("Delimiter must be a single character")
+        if decimal_comma and delimiter == ",":
+            raise ValueError("Use a different delimiter than ',' together with a decimal comma")
+        self.db_path = db_path
+        self.delimiter = delimiter
+        self.decimal_comma = decimal_comma
+        self.chunk_size = chunk_size
+
+    def format_amount(self, value) -> str:
+        """Format an amount with two decimals and the configured decimal separator."""
+        if value is None:
+            return ""
+        text = f"{value:.2f}"
+        return text.replace(".", ",") if self.decimal_comma else text
+
+    def format_decimal(self, value) -> str:
+        """Format a non-amount number, e.g. a quantity, with the configured decimal separator."""
+        if value is None:
+            return ""
+        text = f"{value:g}"
+        return text.replace(".", ",") if self.decimal_comma else text
+
+    def iter_rows(self, table: str) -> Iterable[List]:
+        """Yield the formatted rows of one export table, chunk by chunk."""
+        spec = EXPORT_TABLES[table]
+        formatters = {index: self.format_amount for index in spec["money"]}
+        formatters.update({index: self.format_decimal for index in spec.get("decimals", ())})
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute(spec["sql"], {"drink_price": POEF_DRINK_PRICE, "cigarette_price": POEF_CIGARETTE_PRICE})
+            while True:
+                chunk = cursor.fetchmany(self.chunk_size)
+                if not chunk:
+                    break
+                for row in chunk:
+                    yield [formatters[index](value) if index in formatters else value for index, value in enumerate(row)]
+        finally:
+            conn.close()
+
+    def export_table(self, table: str, file_path: str) -> int:
+        """Export one table to a CSV file and return the number of rows written."""
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unknown export table: {table}")
+
+        # Write to a temp file next to the target so a failed export never leaves half a file
+        directory = os.path.dirname(os.path.abspath(file_path))
+        fd, temp_path = tempfile.mkstemp(suffix=".csv.tmp", dir=directory)
+        count = 0
+        try:
+            # utf-8-sig so Excel recognises the € sign and accents in names
+            with os.fdopen(fd, "w", encoding="utf-8-sig", newline="") as f:
+                writer = csv.writer(f, delimiter=self.delimiter)
+                writer.writerow(EXPORT_TABLES[table]["header"])
+                for row in self.iter_rows(table):
+                    writer.writerow(row)
+                    count += 1
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return count
+
+    def export_all(self, directory: str, tables: Optional[List[str]] = None, prefix: Optional[str] = None) -> Dict[str, str]:
+        """Export several tables into a directory and return {table: file path}."""
+        if prefix is None:
+            prefix = f"kamp_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        os.makedirs(directory, exist_ok=True)
+
+        paths = {}
+        for table in tables or list(EXPORT_TABLES):
+            file_path = os.path.join(directory, f"{prefix}_{table}.csv")
+            self.export_table(table, file_path)
+            paths[table] = file_path
+        return paths
@@ -11,6 +11,12 @@ from models.leader import Leader
 from models.receipt import Receipt
 from models.expense import Expense, ExpenseCategory
 from services.data_service import DataService
+from utils.perf import timed
+
+def _leader_state(leader: Leader) -> Tuple:
+    """The leader fields the bulk operations change, to put back if saving them fails."""
+    return (leader.total_pa_expenses, leader.poef_drink_count, leader.poef_cigarette_count,
+            leader.paid_amount, dict(leader.pa_purchases))
 
 class FinanceService:
     """Service for handling finance-related business logic."""
@@ -18,6 +24,16 @@ class FinanceService:
     def __init__(self, data_service: DataService):
         self.data_service = data_service
     
+    def _save_or_restore(self, changed: List[Leader], previous: Dict[str, Tuple]):
+        """Save the changed leaders; if the write fails, undo the changes so memory matches the database."""
+        try:
+            self.data_service.update_leaders(changed)
+        except Exception:
+            for leader in changed:
+                (leader.total_pa_expenses, leader.poef_drink_count, leader.poef_cigarette_count,
+                 leader.paid_amount, leader.pa_purchases) = previous[leader.id]
+            raise
+    
     def process_text_message(self, message: str, leader: Leader) -> List[Dict]:
         """Process a text message containing PA orders and extract items."""
         items = []
@@ -73,6 +89,7 @@ class FinanceService:
         
         return receipt
     
+    @timed()
     def calculate_leader_expenses(self, leader: Leader, receipts: List[Receipt]) -> Dict:
         """Calculate total expenses for a leader."""
         pa_total = leader.total_pa_expenses
@@ -93,9 +110,10 @@ class FinanceService:
             "total_expenses": pa_total + poef_total,
             "pa_items_count": len(leader.pa_purchases),
             "poef_drinks_count": leader.poef_drink_count,
-            "poef_saf_count": leader.poef_saf_count
+            "poef_cigarettes_count": leader.poef_cigarette_count
         }
     
+    @timed()
     def generate_summary_report(self, leaders: List[Leader], receipts: List[Receipt]) -> Dict:
         """Generate a comprehensive summary report."""
         leader_summaries = []
@@ -150,13 +168,205 @@ class FinanceService:
         """Add drinks to the existing POEF count for a leader."""
         leader.add_poef_drinks(count)
     
+    def set_poef_cigarette_count(self, leader: Leader, count: int):
+        """Set the POEF cigarette count for a leader from the paper list."""
+        leader.set_poef_cigarette_count(count)
+    
+    def add_poef_cigarettes(self, leader: Leader, count: int):
+        """Add cigarettes to the existing POEF count for a leader."""
+        leader.add_poef_cigarettes(count)
+    
     def set_poef_saf_count(self, leader: Leader, count: int):
-        """Set the POEF SAF count for a leader from the paper list."""
-        leader.set_poef_saf_count(count)
+        """Set the POEF SAF (cigarette) count for a leader from the paper list."""
+        self.set_poef_cigarette_count(leader, count)
     
     def add_poef_safs(self, leader: Leader, count: int):
-        """Add SAFs to the existing POEF count for a leader."""
-        leader.add_poef_safs(count)
+        """Add SAFs (cigarettes) to the existing POEF count for a leader."""
+        self.add_poef_cigarettes(leader, count)
+    
+    @timed()
+    def set_poef_counts(self, leaders: List[Leader], counts: Dict[str, Dict[str, int]]) -> Dict:
+        """Set drink and cigarette counts for many leaders and save them in one transaction.
+        
+        counts maps leader IDs to {"drinks": n, "cigarettes": n}; a missing key keeps the current count.
+        """
+        leaders_by_id = {leader.id: leader for leader in leaders}
+        updates = []
+        unknown = []
+        
+        # Validate everything before touching any leader
+        for leader_id, leader_counts in counts.items():
+            leader = leaders_by_id.get(leader_id)
+            if leader is None:
+                unknown.append(leader_id)
+                continue
+            
+            drinks = leader_counts.get("drinks", leader.poef_drink_count)
+            cigarettes = leader_counts.get("cigarettes", leader.poef_cigarette_count)
+            if drinks < 0 or cigarettes < 0:
+                raise ValueError(f"POEF counts for {leader.name} cannot be negative")
+            if drinks != leader.poef_drink_count or cigarettes != leader.poef_cigarette_count:
+                updates.append((leader, drinks, cigarettes))
+        
+        drinks_delta = 0
+        cigarettes_delta = 0
+        changed = []
+        previous = {leader.id: _leader_state(leader) for leader, _, _ in updates}
+        for leader, drinks, cigarettes in updates:
+            drinks_delta += drinks - leader.poef_drink_count
+            cigarettes_delta += cigarettes - leader.poef_cigarette_count
+            leader.set_poef_drink_count(drinks)
+            leader.set_poef_cigarette_count(cigarettes)
+            changed.append(leader)
+        
+        self._save_or_restore(changed, previous)
+        
+        return {
+            "updated": len(changed),
+            "unchanged": len(counts) - len(changed) - len(unknown),
+            "unknown": unknown,
+            "drinks_delta": drinks_delta,
+            "cigarettes_delta": cigarettes_delta
+        }
+    
+    @timed()
+    def record_payments(self, leaders: List[Leader], payments: Dict[str, float], add: bool = False) -> Dict:
+        """Record paid amounts for many leaders and save them in one transaction.
+        
+        payments maps leader IDs to amounts, which replace the paid amount or are added to it when add is True.
+        """
+        leaders_by_id = {leader.id: leader for leader in leaders}
+        updates = []
+        unknown = []
+        
+        # Validate everything before touching any leader
+        for leader_id, amount in payments.items():
+            leader = leaders_by_id.get(leader_id)
+            if leader is None:
+                unknown.append(leader_id)
+                continue
+            
+            new_amount = leader.paid_amount + amount if add else amount
+            if new_amount < 0:
+                raise ValueError(f"Paid amount for {leader.name} cannot be negative")
+            if abs(new_amount - leader.paid_amount) >= 0.005:
+                updates.append((leader, new_amount))
+        
+        total_delta = 0.0
+        changed = []
+        previous = {leader.id: _leader_state(leader) for leader, _ in updates}
+        for leader, new_amount in updates:
+            total_delta += new_amount - leader.paid_amount
+            leader.paid_amount = new_amount
+            changed.append(leader)
+        
+        self._save_or_restore(changed, previous)
+        
+        return {
+            "updated": len(changed),
+            "unchanged": len(payments) - len(changed) - len(unknown),
+            "unknown": unknown,
+            "paid_delta": total_delta
+        }
+    
+    @timed()
+    def assign_pa_items(self, leaders: List[Leader], receipts: List[Receipt], assignments: Dict[str, List[str]]) -> Dict:
+        """Assign many PA items at once and save the affected leaders in one transaction.
+        
+        assignments maps PA item IDs to the IDs of the leaders sharing them. The new
+        leaders replace any current assignment and the item cost is split equally.
+        An empty list unassigns the item.
+        """
+        leaders_by_id = {leader.id: leader for leader in leaders}
+        items = self._find_pa_items(receipts, set(assignments))
+        unknown_items = [item_id for item_id in assignments if item_id not in items]
+        unknown_leaders = sorted({
+            leader_id
+            for item_id, leader_ids in assignments.items()
+            for leader_id in leader_ids
+            if leader_id not in leaders_by_id
+        })
+        
+        # Validate everything before touching any leader
+        if unknown_leaders:
+            raise ValueError(f"Unknown leader IDs: {', '.join(unknown_leaders)}")
+        
+        item_ids = set(items)
+        changed = {}
+        previous = {}
+        removed = 0
+        added = 0
+        
+        # Clear the current assignments of these items
+        for leader in leaders:
+            for item_id in item_ids.intersection(leader.pa_purchases):
+                if leader.id not in previous:
+                    previous[leader.id] = _leader_state(leader)
+                leader.remove_pa_purchase(item_id, 0)
+                changed[leader.id] = leader
+                removed += 1
+        
+        # Split every item equally over its new leaders
+        for item_id, item in items.items():
+            leader_ids = list(dict.fromkeys(assignments[item_id]))
+            if not leader_ids:
+                continue
+            amount_per_leader = item.get_total_price() / len(leader_ids)
+            for leader_id in leader_ids:
+                leader = leaders_by_id[leader_id]
+                if leader.id not in previous:
+                    previous[leader.id] = _leader_state(leader)
+                leader.add_pa_purchase(item_id, amount_per_leader)
+                changed[leader.id] = leader
+                added += 1
+        
+        self._save_or_restore(list(changed.values()), previous)
+        
+        return {
+            "items": len(items),
+            "leaders_updated": len(changed),
+            "assignments_added": added,
+            "assignments_removed": removed,
+            "unknown_items": unknown_items
+        }
+    
+    @timed()
+    def unassign_pa_items(self, leaders: List[Leader], item_ids: List[str]) -> Dict:
+        """Remove every assignment of the given PA items and save the affected leaders in one transaction."""
+        item_ids = set(item_ids)
+        changed = []
+        previous = {}
+        removed = 0
+        
+        for leader in leaders:
+            matching = item_ids.intersection(leader.pa_purchases)
+            if matching:
+                previous[leader.id] = _leader_state(leader)
+                for item_id in matching:
+                    leader.remove_pa_purchase(item_id, 0)
+                removed += len(matching)
+                changed.append(leader)
+        
+        self._save_or_restore(changed, previous)
+        
+        return {
+            "items": len(item_ids),
+            "leaders_updated": len(changed),
+            "assignments_removed": removed
+        }
+    
+    def _find_pa_items(self, receipts: List[Receipt], item_ids: set) -> Dict[str, Expense]:
+        """Find PA items by ID, stopping as soon as all of them are found."""
+        found = {}
+        if not item_ids:
+            return found
+        for receipt in receipts:
+            for item in receipt.items:
+                if item.id in item_ids and item.category == ExpenseCategory.PA:
+                    found[item.id] = item
+                    if len(found) == len(item_ids):
+                        return found
+        return found
     
     def get_leaders_by_name(self, leaders: List[Leader], name: str) -> List[Leader]:
         """Find leaders by name (partial match)."""
@@ -167,6 +377,7 @@ class FinanceService:
         """Get receipts for a specific date."""
         return [receipt for receipt in receipts if receipt.date == date]
     
+    @timed()
     def calculate_daily_totals(self, receipts: List[Receipt], date: str) -> Dict:
         """Calculate totals for a specific date."""
         daily_receipts = self.get_receipts_by_date(receipts, date)
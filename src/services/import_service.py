@@ -0,0 +1,117 @@
+"""
+Import service for Kamp Finances application.
+Reads leaders and receipt items from CSV files, e.g. files written by the CSV export.
+"""
+
+import csv
+from datetime import datetime
+from typing import Dict, Optional
+
+from models.leader import Leader
+from models.receipt import Receipt
+from models.expense import Expense, ExpenseCategory
+from services.data_service import DataService
+
+def _csv_reader(f) -> csv.DictReader:
+    """Create a reader for an open CSV file, detecting whether it uses commas, semicolons or tabs."""
+    sample = f.read(4096)
+    f.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    return csv.DictReader(f, dialect=dialect)
+
+def parse_number(text: Optional[str], default: float = 0.0) -> float:
+    """Parse a number that may use a decimal comma or a euro sign."""
+    if text is None or not text.strip():
+        return default
+    text = text.replace("€", "").strip()
+    if "," in text and "." in text:
+        # 1.234,56 -> 1234.56
+        text = text.replace(".", "").replace(",", ".")
+    else:
+        text = text.replace(",", ".")
+    return float(text)
+
+def _new_id(base: str, index: int) -> str:
+    """Build a unique ID for row index of an import, in the timestamp style of the models."""
+    return f"{base}{index:06d}"
+
+def import_leaders(data_service: DataService, file_path: str) -> Dict:
+    """Import leaders from a CSV file with a Name column; existing names are skipped.
+
+    Optional columns: POEF Drinks, POEF Cigarettes and Paid Amount.
+    """
+    existing = {leader.name.strip().lower() for leader in data_service.load_leaders()}
+    base = datetime.now().strftime("%Y%m%d%H%M%S")
+    leaders = []
+    skipped = 0
+
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = _csv_reader(f)
+        if "Name" not in (reader.fieldnames or []):
+            raise ValueError("CSV file needs a 'Name' column")
+        for row in reader:
+            name = (row.get("Name") or "").strip()
+            if not name or name.lower() in existing:
+                skipped += 1
+                continue
+            existing.add(name.lower())
+            leaders.append(Leader(
+                name=name,
+                id=_new_id(base, len(leaders)),
+                poef_drink_count=int(parse_number(row.get("POEF Drinks"))),
+                poef_cigarette_count=int(parse_number(row.get("POEF Cigarettes"))),
+                paid_amount=parse_number(row.get("Paid Amount"))
+            ))
+
+    data_service.update_leaders(leaders)
+    return {"imported": len(leaders), "skipped": skipped}
+
+def import_receipts(data_service: DataService, file_path: str) -> Dict:
+    """Import receipt items from a CSV file, one row per item.
+
+    Required columns: Name and Price. Optional: Receipt ID, Receipt Date (or
+    Date), Store, Category and Quantity. Rows are grouped into receipts by
+    Receipt ID, or by date and store when there is no Receipt ID column.
+    """
+    base = datetime.now().strftime("%Y%m%d%H%M%S")
+    categories = {category.value.lower(): category for category in ExpenseCategory}
+    receipts: Dict[tuple, Receipt] = {}
+    item_count = 0
+
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = _csv_reader(f)
+        missing = {"Name", "Price"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"CSV file is missing columns: {', '.join(sorted(missing))}")
+        for line_number, row in enumerate(reader, start=2):
+            date = (row.get("Receipt Date") or row.get("Date") or datetime.now().strftime("%Y-%m-%d")).strip()
+            store = (row.get("Store") or "Colruyt").strip()
+            key = (row.get("Receipt ID") or "").strip() or (date, store)
+
+            category_name = (row.get("Category") or ExpenseCategory.GROEPSKAS.value).strip().lower()
+            if category_name not in categories:
+                raise ValueError(f"Line {line_number}: unknown category '{row.get('Category')}'")
+
+            receipt = receipts.get(key)
+            if receipt is None:
+                receipt = Receipt(date=date, store_name=store, id=_new_id(base, len(receipts)))
+                receipts[key] = receipt
+
+            receipt.items.append(Expense(
+                name=row["Name"].strip(),
+                price=parse_number(row["Price"]),
+                category=categories[category_name],
+                date=date,
+                quantity=parse_number(row.get("Quantity"), 1.0),
+                receipt_id=receipt.id,
+                id=_new_id(base, item_count)
+            ))
+            item_count += 1
+
+    for receipt in receipts.values():
+        receipt._update_totals()
+    data_service.add_receipts(list(receipts.values()))
+    return {"receipts": len(receipts), "items": item_count}
@@ -0,0 +1,159 @@
+"""
+Integrity service for Kamp Finances application.
+Finds and repairs PA assignments, PA splits and receipt totals that no longer match
+the receipt items, in one pass over hash maps of the loaded leaders and receipts.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List
+
+from models.leader import Leader
+from models.receipt import Receipt
+from models.expense import ExpenseCategory
+from utils.perf import timed
+
+# Amounts closer than this are equal; totals are float sums of prices
+CENT = 0.01
+
+# Issue kind -> description, in the order they are repaired
+ISSUE_KINDS = {
+    "receipt_totals": "Receipt totals do not match its items",
+    "orphaned_assignment": "PA assignment to an item that no longer exists",
+    "not_pa_assignment": "PA assignment to an item that is not PA",
+    "split_mismatch": "PA shares do not add up to the item total",
+    "leader_pa_total": "Leader PA total does not match the assigned shares",
+}
+
+@dataclass
+class IntegrityIssue:
+    """Something in the data that does not add up."""
+    kind: str
+    subject_id: str
+    detail: str
+
+@timed()
+def check_integrity(leaders: List[Leader], receipts: List[Receipt]) -> List[IntegrityIssue]:
+    """Find orphaned PA assignments, splits that do not add up and stale totals."""
+    issues = []
+
+    # Shares per assigned item; only these items have to be looked up below
+    shares = {}
+    for leader in leaders:
+        pa_total = 0.0
+        for item_id, amount in leader.pa_purchases.items():
+            shares[item_id] = shares.get(item_id, 0.0) + amount
+            pa_total += amount
+        if abs(leader.total_pa_expenses - pa_total) >= CENT:
+            issues.append(IntegrityIssue("leader_pa_total", leader.id, f"{leader.name}: PA total "
+                                         f"{leader.total_pa_expenses:.2f} should be {pa_total:.2f}"))
+
+    # One pass over the items recalculates the totals and finds the assigned items;
+    # categories are compared by identity, hashing an Enum member is slow
+    pa, poef, groepskas = ExpenseCategory.PA, ExpenseCategory.POEF, ExpenseCategory.GROEPSKAS
+    assigned_items = {}
+    for receipt in receipts:
+        total = groepskas_total = poef_total = pa_total = 0.0
+        for item in receipt.items:
+            total_price = item.price * item.quantity
+            total += total_price
+            category = item.category
+            if category is groepskas:
+                groepskas_total += total_price
+            elif category is poef:
+                poef_total += total_price
+            elif category is pa:
+                pa_total += total_price
+            if item.id in shares:
+                assigned_items[item.id] = item
+
+        totals = {"total_amount": total, "groepskas_total": groepskas_total, "poef_total": poef_total, "pa_total": pa_total}
+        wrong = [name for name, value in totals.items() if abs(getattr(receipt, name) - value) >= CENT]
+        if wrong:
+            issues.append(IntegrityIssue("receipt_totals", receipt.id, f"{receipt.date} {receipt.store_name}: "
+                                         + ", ".join(f"{name} {getattr(receipt, name):.2f} should be {totals[name]:.2f}"
+                                                     for name in wrong)))
+
+    stale = set()
+    for item_id, assigned in shares.items():
+        item = assigned_items.get(item_id)
+        if item is None or item.category is not pa:
+            stale.add(item_id)
+        elif abs(assigned - item.get_total_price()) >= CENT:
+            issues.append(IntegrityIssue("split_mismatch", item_id, f"{item.name}: shares add up to "
+                                         f"{assigned:.2f}, item total is {item.get_total_price():.2f}"))
+
+    # Rare, so the leaders are only walked again to name who holds the stale assignments
+    if stale:
+        for leader in leaders:
+            for item_id in stale.intersection(leader.pa_purchases):
+                amount = leader.pa_purchases[item_id]
+                item = assigned_items.get(item_id)
+                if item is None:
+                    issues.append(IntegrityIssue("orphaned_assignment", leader.id,
+                                                 f"{leader.name}: €{amount:.2f} for deleted item {item_id}"))
+                else:
+                    issues.append(IntegrityIssue("not_pa_assignment", leader.id,
+                                                 f"{leader.name}: €{amount:.2f} for {item.category.value} item {item.name}"))
+
+    order = list(ISSUE_KINDS)
+    issues.sort(key=lambda issue: order.index(issue.kind))
+    return issues
+
+@timed()
+def repair_integrity(leaders: List[Leader], receipts: List[Receipt]) -> Dict:
+    """Fix everything check_integrity reports, in memory, and return what changed.
+
+    Receipt totals are recalculated, assignments to missing or non-PA items are
+    dropped and PA items whose shares do not add up are split equally again over
+    the same leaders, as assigning them does. The caller saves the changed models.
+    """
+    issues = check_integrity(leaders, receipts)
+    fixed = {kind: 0 for kind in ISSUE_KINDS}
+    changed_leaders = {}
+    changed_receipts = {}
+    receipts_by_id = {receipt.id: receipt for receipt in receipts}
+    leaders_by_id = {leader.id: leader for leader in leaders}
+
+    for issue in issues:
+        if issue.kind == "receipt_totals":
+            receipt = receipts_by_id[issue.subject_id]
+            receipt._update_totals()
+            changed_receipts[receipt.id] = receipt
+            fixed[issue.kind] += 1
+
+    items = {item.id: item for receipt in receipts for item in receipt.items}
+    pa_item_ids = {item_id for item_id, item in items.items() if item.category is ExpenseCategory.PA}
+    for leader in leaders:
+        stale = set(leader.pa_purchases) - pa_item_ids
+        for item_id in stale:
+            fixed["orphaned_assignment" if item_id not in items else "not_pa_assignment"] += 1
+            leader.remove_pa_purchase(item_id, 0)
+        if stale:
+            changed_leaders[leader.id] = leader
+
+    split_items = {issue.subject_id for issue in issues if issue.kind == "split_mismatch"}
+    if split_items:
+        assigned = {}
+        for leader in leaders:
+            for item_id in split_items.intersection(leader.pa_purchases):
+                assigned.setdefault(item_id, []).append(leader)
+        for item_id, item_leaders in assigned.items():
+            amount_per_leader = items[item_id].get_total_price() / len(item_leaders)
+            for leader in item_leaders:
+                leader.add_pa_purchase(item_id, amount_per_leader)
+                changed_leaders[leader.id] = leader
+            fixed["split_mismatch"] += 1
+
+    for issue in issues:
+        if issue.kind == "leader_pa_total":
+            leader = leaders_by_id[issue.subject_id]
+            leader._recalculate_pa_total()
+            changed_leaders[leader.id] = leader
+            fixed[issue.kind] += 1
+
+    return {
+        "issues": len(issues),
+        "fixed": fixed,
+        "leaders": list(changed_leaders.values()),
+        "receipts": list(changed_receipts.values()),
+    }
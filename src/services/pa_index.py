@@ -0,0 +1,64 @@
+"""
+PA assignment index for Kamp Finances application.
+Keeps a reverse index from PA items to the leaders they are assigned to.
+"""
+
+from typing import List, Dict
+
+from models.leader import Leader
+
+class PAAssignmentIndex:
+    """Reverse index from PA item IDs to assigned leaders, with cached display text."""
+
+    def __init__(self):
+        self._leaders_by_item: Dict[str, List[Leader]] = {}
+        self._assigned_text: Dict[str, str] = {}
+        # Bumped on every change so dependent caches can tell they are stale
+        self.version = 0
+
+    def rebuild(self, leaders: List[Leader]):
+        """Rebuild the whole index from the leaders' PA purchases."""
+        self._leaders_by_item = {}
+        self._assigned_text = {}
+        self.version += 1
+        for leader in leaders:
+            for item_id in leader.pa_purchases:
+                self._leaders_by_item.setdefault(item_id, []).append(leader)
+
+    def get_assigned_leaders(self, item_id: str) -> List[Leader]:
+        """Get the leaders assigned to a PA item, in leader order."""
+        return self._leaders_by_item.get(item_id, [])
+
+    def get_leader_count(self, item_id: str) -> int:
+        """Get the number of leaders sharing a PA item."""
+        return len(self._leaders_by_item.get(item_id, []))
+
+    def set_item_leaders(self, item_id: str, leaders: List[Leader]):
+        """Replace the assigned leaders of one PA item after its assignment changed."""
+        if leaders:
+            self._leaders_by_item[item_id] = list(leaders)
+        else:
+            self._leaders_by_item.pop(item_id, None)
+        self.invalidate(item_id)
+
+    def remove_item(self, item_id: str):
+        """Drop a PA item from the index."""
+        self._leaders_by_item.pop(item_id, None)
+        self.invalidate(item_id)
+
+    def invalidate(self, item_id: str):
+        """Forget the cached display text of one PA item."""
+        self._assigned_text.pop(item_id, None)
+        self.version += 1
+
+    def get_assigned_text(self, item_id: str) -> str:
+        """Get the 'Assigned To' text for a PA item, e.g. 'Jan (€1.50), Piet (€1.50)'."""
+        text = self._assigned_text.get(item_id)
+        if text is None:
+            assigned_leaders = [
+                f"{leader.name} (€{leader.get_pa_purchase_amount(item_id):.2f})"
+                for leader in self.get_assigned_leaders(item_id)
+            ]
+            text = ", ".join(assigned_leaders) if assigned_leaders else "Not assigned"
+            self._assigned_text[item_id] = text
+        return text
@@ -0,0 +1,269 @@
+"""
+Statement service for Kamp Finances application.
+Renders per-leader statements as TXT, CSV or HTML and exports them for all leaders at once.
+"""
+
+import csv
+import html
+import io
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import List, Dict, Optional, Callable, Iterable, Tuple
+
+from models.leader import Leader, POEF_DRINK_PRICE, POEF_CIGARETTE_PRICE
+from models.receipt import Receipt
+from models.expense import ExpenseCategory
+
+STATEMENT_FORMATS = ("txt", "csv", "html")
+
+# Leaders rendered per worker task; large enough to amortize pickling
+LEADERS_PER_TASK = 100
+
+# Below this many leaders a process pool costs more than it saves
+MIN_LEADERS_FOR_POOL = 200
+
+def build_snapshot(leaders: List[Leader], receipts: List[Receipt]) -> Dict:
+    """Copy everything statements need into plain data that can be sent to worker processes."""
+    pa_items = {}
+    for receipt in receipts:
+        for item in receipt.items:
+            if item.category == ExpenseCategory.PA:
+                pa_items[item.id] = {"name": item.name, "total": item.get_total_price()}
+
+    share_counts = {}
+    for leader in leaders:
+        for item_id in leader.pa_purchases:
+            share_counts[item_id] = share_counts.get(item_id, 0) + 1
+
+    leader_rows = []
+    for leader in leaders:
+        leader_rows.append({
+            "id": leader.id,
+            "name": leader.name,
+            "pa_purchases": list(leader.pa_purchases.items()),
+            "total_pa_expenses": leader.total_pa_expenses,
+            "poef_drink_count": leader.poef_drink_count,
+            "poef_cigarette_count": leader.poef_cigarette_count,
+            "poef_total": leader.get_poef_total(),
+            "total_expenses": leader.get_total_expenses(),
+            "paid_amount": leader.paid_amount,
+            "remaining": leader.get_remaining_to_pay(),
+        })
+
+    return {
+        "report_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "pa_items": pa_items,
+        "share_counts": share_counts,
+        "leaders": leader_rows,
+    }
+
+def _pa_lines(leader: Dict, pa_items: Dict, share_counts: Dict) -> Iterable[Tuple[str, float, int, float]]:
+    """Yield (item name, amount, number of leaders sharing, item total) for a leader's PA purchases."""
+    for item_id, amount in leader["pa_purchases"]:
+        item = pa_items.get(item_id)
+        name = item["name"] if item else f"Unknown Item ({item_id})"
+        total = item["total"] if item else 0.0
+        yield name, amount, share_counts.get(item_id, 1), total
+
+def render_txt(leader: Dict, pa_items: Dict, share_counts: Dict, report_date: str) -> str:
+    """Render a plain text statement, laid out like the detailed summary in the Leaders tab."""
+    lines = [f"LEADER SUMMARY - {leader['name']}", "=" * 50, f"Report Date: {report_date}", ""]
+
+    lines += ["PA EXPENSES:", "-" * 20]
+    if leader["pa_purchases"]:
+        for name, amount, shared, total in _pa_lines(leader, pa_items, share_counts):
+            if shared > 1:
+                lines.append(f"  {name}: €{amount:.2f} (shared with {shared} leaders, total: €{total:.2f})")
+            else:
+                lines.append(f"  {name}: €{amount:.2f}")
+    else:
+        lines.append("  No PA expenses")
+    lines += [f"Total PA Expenses: €{leader['total_pa_expenses']:.2f}", ""]
+
+    drinks = leader["poef_drink_count"]
+    cigarettes = leader["poef_cigarette_count"]
+    lines += [
+        "POEF EXPENSES:", "-" * 20,
+        f"  Drinks: {drinks} × €{POEF_DRINK_PRICE:.2f} = €{drinks * POEF_DRINK_PRICE:.2f}",
+        f"  Cigarettes: {cigarettes} × €{POEF_CIGARETTE_PRICE:.2f} = €{cigarettes * POEF_CIGARETTE_PRICE:.2f}",
+        f"Total POEF Expenses: €{leader['poef_total']:.2f}", "",
+    ]
+
+    lines += [
+        "OVERALL SUMMARY:", "-" * 20,
+        f"PA Expenses: €{leader['total_pa_expenses']:.2f}",
+        f"POEF Expenses: €{leader['poef_total']:.2f}",
+        f"Grand Total: €{leader['total_expenses']:.2f}", "",
+    ]
+
+    lines += [
+        "PAYMENT INFORMATION:", "-" * 20,
+        f"Amount Already Paid: €{leader['paid_amount']:.2f}",
+        f"Remaining to Pay: €{leader['remaining']:.2f}",
+    ]
+    return "\n".join(lines) + "\n"
+
+def render_csv(leader: Dict, pa_items: Dict, share_counts: Dict, report_date: str) -> str:
+    """Render a statement as CSV rows: one line per PA item followed by the totals."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Leader", leader["name"]])
+    writer.writerow(["Report Date", report_date])
+    writer.writerow([])
+    writer.writerow(["Section", "Item", "Count", "Unit Price", "Amount", "Shared With", "Item Total"])
+
+    for name, amount, shared, total in _pa_lines(leader, pa_items, share_counts):
+        writer.writerow(["PA", name, "", "", f"{amount:.2f}", shared, f"{total:.2f}"])
+
+    drinks = leader["poef_drink_count"]
+    cigarettes = leader["poef_cigarette_count"]
+    writer.writerow(["POEF", "Drinks", drinks, f"{POEF_DRINK_PRICE:.2f}", f"{drinks * POEF_DRINK_PRICE:.2f}", "", ""])
+    writer.writerow(["POEF", "Cigarettes", cigarettes, f"{POEF_CIGARETTE_PRICE:.2f}", f"{cigarettes * POEF_CIGARETTE_PRICE:.2f}", "", ""])
+
+    writer.writerow([])
+    writer.writerow(["Total", "PA Expenses", "", "", f"{leader['total_pa_expenses']:.2f}", "", ""])
+    writer.writerow(["Total", "POEF Expenses", "", "", f"{leader['poef_total']:.2f}", "", ""])
+    writer.writerow(["Total", "Grand Total", "", "", f"{leader['total_expenses']:.2f}", "", ""])
+    writer.writerow(["Payment", "Already Paid", "", "", f"{leader['paid_amount']:.2f}", "", ""])
+    writer.writerow(["Payment", "Remaining to Pay", "", "", f"{leader['remaining']:.2f}", "", ""])
+    return buffer.getvalue()
+
+def render_html(leader: Dict, pa_items: Dict, share_counts: Dict, report_date: str) -> str:
+    """Render a statement as a standalone HTML page."""
+    e = html.escape
+    rows = []
+    for name, amount, shared, total in _pa_lines(leader, pa_items, share_counts):
+        shared_text = f"{shared} leaders (total €{total:.2f})" if shared > 1 else ""
+        rows.append(f"<tr><td>{e(name)}</td><td class=\"num\">€{amount:.2f}</td><td>{e(shared_text)}</td></tr>")
+    if not rows:
+        rows.append("<tr><td colspan=\"3\">No PA expenses</td></tr>")
+
+    drinks = leader["poef_drink_count"]
+    cigarettes = leader["poef_cigarette_count"]
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+        f"<title>Statement - {e(leader['name'])}</title>"
+        "<style>body{font-family:Arial,sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:1.5em}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:left}.num{text-align:right}</style>"
+        "</head><body>\n"
+        f"<h1>Leader Summary - {e(leader['name'])}</h1>\n<p>Report Date: {e(report_date)}</p>\n"
+        "<h2>PA Expenses</h2>\n<table><tr><th>Item</th><th>Amount</th><th>Shared</th></tr>\n"
+        + "\n".join(rows) +
+        f"\n<tr><th>Total PA Expenses</th><th class=\"num\">€{leader['total_pa_expenses']:.2f}</th><th></th></tr></table>\n"
+        "<h2>POEF Expenses</h2>\n<table><tr><th>Item</th><th>Count</th><th>Price</th><th>Total</th></tr>\n"
+        f"<tr><td>Drinks</td><td class=\"num\">{drinks}</td><td class=\"num\">€{POEF_DRINK_PRICE:.2f}</td><td class=\"num\">€{drinks * POEF_DRINK_PRICE:.2f}</td></tr>\n"
+        f"<tr><td>Cigarettes</td><td class=\"num\">{cigarettes}</td><td class=\"num\">€{POEF_CIGARETTE_PRICE:.2f}</td><td class=\"num\">€{cigarettes * POEF_CIGARETTE_PRICE:.2f}</td></tr>\n"
+        f"<tr><th colspan=\"3\">Total POEF Expenses</th><th class=\"num\">€{leader['poef_total']:.2f}</th></tr></table>\n"
+        "<h2>Summary</h2>\n<table>\n"
+        f"<tr><td>Grand Total</td><td class=\"num\">€{leader['total_expenses']:.2f}</td></tr>\n"
+        f"<tr><td>Amount Already Paid</td><td class=\"num\">€{leader['paid_amount']:.2f}</td></tr>\n"
+        f"<tr><th>Remaining to Pay</th><th class=\"num\">€{leader['remaining']:.2f}</th></tr>\n"
+        "</table>\n</body></html>\n"
+    )
+
+RENDERERS = {"txt": render_txt, "csv": render_csv, "html": render_html}
+
+def statement_filename(leader: Dict, fmt: str) -> str:
+    """Get a filesystem-safe, unique file name for a leader's statement."""
+    safe_name = re.sub(r"[^\w.-]+", "_", leader["name"]).strip("_") or "leader"
+    return f"statement_{safe_name}_{leader['id']}.{fmt}"
+
+def render_statement(snapshot: Dict, leader_id: str, fmt: str) -> str:
+    """Render one leader's statement from a snapshot."""
+    for leader in snapshot["leaders"]:
+        if leader["id"] == leader_id:
+            return RENDERERS[fmt](leader, snapshot["pa_items"], snapshot["share_counts"], snapshot["report_date"])
+    raise KeyError(f"Leader {leader_id} not found")
+
+def _render_task(task: Tuple) -> List[Tuple[str, str]]:
+    """Render all statements of a chunk of leaders; runs in a worker process."""
+    leaders, pa_items, share_counts, report_date, formats = task
+    files = []
+    for leader in leaders:
+        for fmt in formats:
+            files.append((statement_filename(leader, fmt), RENDERERS[fmt](leader, pa_items, share_counts, report_date)))
+    return files
+
+def _build_tasks(snapshot: Dict, formats: Tuple[str, ...]) -> List[Tuple]:
+    """Split a snapshot into tasks that only carry the PA items their leaders need."""
+    tasks = []
+    leaders = snapshot["leaders"]
+    for start in range(0, len(leaders), LEADERS_PER_TASK):
+        chunk = leaders[start:start + LEADERS_PER_TASK]
+        item_ids = {item_id for leader in chunk for item_id, _ in leader["pa_purchases"]}
+        pa_items = {item_id: snapshot["pa_items"][item_id] for item_id in item_ids if item_id in snapshot["pa_items"]}
+        share_counts = {item_id: snapshot["share_counts"][item_id] for item_id in item_ids}
+        tasks.append((chunk, pa_items, share_counts, snapshot["report_date"], formats))
+    return tasks
+
+def export_statements(snapshot: Dict, destination: str, formats: Tuple[str, ...] = STATEMENT_FORMATS,
+                      as_zip: bool = False, workers: Optional[int] = None,
+                      progress: Optional[Callable[[int, int], None]] = None) -> str:
+    """Export statements for every leader in the snapshot and return the written path.
+
+    Statements are rendered across a process pool and written atomically: into a
+    new directory inside destination, or into the zip file destination. Nothing
+    is visible at the final path until every statement has been written.
+    """
+    for fmt in formats:
+        if fmt not in RENDERERS:
+            raise ValueError(f"Unknown statement format: {fmt}")
+
+    tasks = _build_tasks(snapshot, tuple(formats))
+    total = len(snapshot["leaders"])
+    done = 0
+
+    if as_zip:
+        target = destination
+        parent = os.path.dirname(os.path.abspath(target))
+        fd, temp_path = tempfile.mkstemp(suffix=".zip.tmp", dir=parent)
+        os.close(fd)
+        archive = zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED)
+        write_file = archive.writestr
+    else:
+        target = os.path.join(destination, f"leader_statements_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        temp_path = tempfile.mkdtemp(prefix=".statements_", dir=destination)
+        archive = None
+
+        def write_file(name, content):
+            with open(os.path.join(temp_path, name), "w", encoding="utf-8", newline="") as f:
+                f.write(content)
+
+    try:
+        if workers == 1 or total < MIN_LEADERS_FOR_POOL:
+            results = (_render_task(task) for task in tasks)
+            for files, task in zip(results, tasks):
+                for name, content in files:
+                    write_file(name, content)
+                done += len(task[0])
+                if progress:
+                    progress(done, total)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(_render_task, task): len(task[0]) for task in tasks}
+                for future in as_completed(futures):
+                    for name, content in future.result():
+                        write_file(name, content)
+                    done += futures[future]
+                    if progress:
+                        progress(done, total)
+
+        if archive is not None:
+            archive.close()
+        # Temp files are created private; give the result normal permissions
+        os.chmod(temp_path, 0o644 if as_zip else 0o755)
+        os.replace(temp_path, target)
+        return target
+    except BaseException:
+        if archive is not None:
+            archive.close()
+        if os.path.isdir(temp_path):
+            shutil.rmtree(temp_path, ignore_errors=True)
+        elif os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -0,0 +1,691 @@
+"""
+Sync service for Kamp Finances application.
+Exchanges changesets between copies of the database that are never online together,
+e.g. two treasurers' laptops and a USB stick.
+
+Triggers note every inserted, updated or deleted row in sync_dirty, with a mask of the
+columns that changed. Before an export or import those rows get a new version: every
+row carries a version vector {site: counter} plus the site and Lamport counter of its
+latest change, and every column the version vector of its latest change. A changeset
+holds the rows a peer has not seen yet, so exporting and merging cost time
+proportional to the changes, not to the database.
+
+Merging is deterministic, every site resolves a row the same way:
+- an incoming version the local row already includes is skipped
+- concurrent versions of a row are merged per column: a column changed on one side
+  only takes that side's value, so one laptop's payment and another's POEF counts
+  both survive
+- a column changed on both sides to different values is a conflict: the local value
+  stays and the conflict is recorded in sync_conflicts until the user picks a value
+- totals calculated from other columns are recalculated instead of conflicting
+- an edit beats a concurrent delete
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from utils.lazy_import import lazy_import
+
+# Only needed when exporting or importing; DataService imports this module at startup for the schema
+gzip = lazy_import("gzip")
+hashlib = lazy_import("hashlib")
+json = lazy_import("json")
+
+CHANGESET_FORMAT = "kamp-changeset"
+CHANGESET_VERSION = 2
+# Version 1 changesets have no column versions; their columns count as changed with the row
+READABLE_CHANGESET_VERSIONS = (1, 2)
+CHANGESET_EXTENSION = ".kampsync"
+
+# Bumped when the sync tables or triggers change; older databases are upgraded on open
+SYNC_SCHEMA_VERSION = 2
+
+# Synced tables: columns in storage order, the columns forming the row key, and the
+# columns calculated from other data, which are recalculated after a merge
+SYNC_TABLES = {
+    "leaders": {
+        "columns": ("id", "name", "total_pa_expenses", "poef_drink_count", "poef_cigarette_count", "pa_purchases", "paid_amount"),
+        "key": ("id",),
+        "derived": ("total_pa_expenses",),
+    },
+    "receipts": {
+        "columns": ("id", "date", "store_name", "total_amount", "groepskas_total", "poef_total", "pa_total"),
+        "key": ("id",),
+        "derived": ("total_amount", "groepskas_total", "poef_total", "pa_total"),
+    },
+    "receipt_items": {
+        "columns": ("id", "name", "price", "quantity", "category", "date", "receipt_id"),
+        "key": ("receipt_id", "id"),
+        "derived": (),
+    },
+}
+
+# Separates the parts of a composite row key; IDs never contain it
+KEY_SEPARATOR = "/"
+
+# Changed-column mask of a row whose columns are unknown, e.g. dirty before the masks existed
+ALL_COLUMNS = -1
+
+def _key_expression(table: str, prefix: str) -> str:
+    """SQL expression building the row key of a table from NEW or OLD."""
+    return f" || '{KEY_SEPARATOR}' || ".join(f"{prefix}.{column}" for column in SYNC_TABLES[table]["key"])
+
+def ensure_sync_tables(c: sqlite3.Cursor):
+    """Create the sync bookkeeping tables and the triggers recording changed rows."""
+    c.execute("CREATE TABLE IF NOT EXISTS sync_meta (key TEXT PRIMARY KEY, value TEXT)")
+    # columns holds the version vectors of the columns that differ from the row's version
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS sync_rows (
+            table_name TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            hash TEXT,
+            version TEXT NOT NULL,
+            modified_by TEXT NOT NULL,
+            modified_at INTEGER NOT NULL,
+            columns TEXT,
+            PRIMARY KEY (table_name, row_key)
+        ) WITHOUT ROWID
+    ''')
+    # Exports look up the changes made after a counter per site
+    c.execute('CREATE INDEX IF NOT EXISTS idx_sync_rows_change ON sync_rows (modified_by, modified_at)')
+    # columns is a bit mask of the changed columns, in SYNC_TABLES order
+    c.execute(f'''
+        CREATE TABLE IF NOT EXISTS sync_dirty (
+            table_name TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            columns INTEGER NOT NULL DEFAULT {ALL_COLUMNS},
+            PRIMARY KEY (table_name, row_key)
+        ) WITHOUT ROWID
+    ''')
+    # Highest counter seen per site, and what each peer said it had seen
+    c.execute("CREATE TABLE IF NOT EXISTS sync_knowledge (site_id TEXT PRIMARY KEY, counter INTEGER NOT NULL)")
+    c.execute("CREATE TABLE IF NOT EXISTS sync_peers (site_id TEXT PRIMARY KEY, knowledge TEXT NOT NULL, last_sync TEXT)")
+    # Columns both laptops changed to different values; the local value stays until the user picks one
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS sync_conflicts (
+            id INTEGER PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            local_value,
+            incoming_value,
+            incoming_site TEXT NOT NULL,
+            detected_at TEXT NOT NULL,
+            UNIQUE (table_name, row_key, column_name)
+        )
+    ''')
+
+    row = c.execute("SELECT value FROM sync_meta WHERE key = 'schema'").fetchone()
+    if row is None or int(row[0]) < SYNC_SCHEMA_VERSION:
+        _upgrade_sync_tables(c)
+
+def _upgrade_sync_tables(c: sqlite3.Cursor):
+    """Add the columns and (re)create the triggers of the current sync schema."""
+    for table, column, definition in (("sync_rows", "columns", "TEXT"),
+                                      ("sync_dirty", "columns", f"INTEGER NOT NULL DEFAULT {ALL_COLUMNS}")):
+        if column not in {info[1] for info in c.execute(f"PRAGMA table_info({table})")}:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    # An update can change the key itself; the old key then counts as deleted and the new one as inserted
+    for table, spec in SYNC_TABLES.items():
+        every_column = (1 << len(spec["columns"])) - 1
+        changed_columns = " | ".join(f"((OLD.{column} IS NOT NEW.{column}) << {bit})"
+                                     for bit, column in enumerate(spec["columns"]))
+        key_changed = f"({_key_expression(table, 'OLD')}) IS NOT ({_key_expression(table, 'NEW')})"
+        for event, statements in (
+            ("INSERT", _dirty_insert(table, "NEW", str(every_column))),
+            ("UPDATE", _dirty_insert(table, "NEW", changed_columns)
+                       + _dirty_insert(table, "OLD", f"CASE WHEN {key_changed} THEN {every_column} ELSE 0 END")),
+            ("DELETE", _dirty_insert(table, "OLD", str(every_column))),
+        ):
+            c.execute(f"DROP TRIGGER IF EXISTS sync_{table}_{event.lower()}")
+            c.execute(f'''
+                CREATE TRIGGER sync_{table}_{event.lower()} AFTER {event} ON {table}
+                BEGIN{statements}
+                END
+            ''')
+    c.execute("INSERT OR REPLACE INTO sync_meta (key, value) VALUES ('schema', ?)", (str(SYNC_SCHEMA_VERSION),))
+
+def _dirty_insert(table: str, prefix: str, changed: str) -> str:
+    """Trigger statement adding the changed columns of the row NEW or OLD to its dirty mask."""
+    return f'''
+                    INSERT INTO sync_dirty (table_name, row_key, columns)
+                    SELECT '{table}', {_key_expression(table, prefix)}, mask FROM (SELECT {changed} AS mask) WHERE mask != 0
+                    ON CONFLICT (table_name, row_key) DO UPDATE SET columns = columns | excluded.columns;'''
+
+def row_hash(values) -> Optional[str]:
+    """Fingerprint of a row's values, None for a deleted row."""
+    if values is None:
+        return None
+    return hashlib.blake2b(repr(tuple(values)).encode("utf-8"), digest_size=12).hexdigest()
+
+def dominates(a: Dict[str, int], b: Dict[str, int]) -> bool:
+    """Check whether version vector a includes every change of b."""
+    return all(a.get(site, 0) >= counter for site, counter in b.items())
+
+def merge_vectors(a: Dict[str, int], b: Dict[str, int]) -> Dict[str, int]:
+    """Element-wise maximum of two version vectors."""
+    merged = dict(a)
+    for site, counter in b.items():
+        merged[site] = max(merged.get(site, 0), counter)
+    return merged
+
+def column_versions(table: str, version: Dict[str, int], stored: Optional[Dict]) -> Dict[str, Dict[str, int]]:
+    """Version vector of every column; columns without their own changed with the row."""
+    stored = stored or {}
+    return {column: stored.get(column, version) for column in SYNC_TABLES[table]["columns"]}
+
+def pa_purchases_total(pa_purchases: Optional[str]) -> float:
+    """Sum of the amounts in a stored pa_purchases string ("id:amount|id:amount")."""
+    total = 0.0
+    for purchase in (pa_purchases or "").split("|"):
+        _, separator, amount = purchase.partition(":")
+        try:
+            total += float(amount) if separator else 0.0
+        except ValueError:
+            pass  # Legacy entries without an amount count as 0, as when loading
+    return total
+
+def incoming_wins(local: Dict, incoming: Dict) -> bool:
+    """Resolve concurrent versions of a row; both sides of a sync pick the same winner."""
+    local_deleted = local["hash"] is None
+    incoming_deleted = incoming["values"] is None
+    if local_deleted != incoming_deleted:
+        return local_deleted
+    return (incoming["modified_at"], incoming["modified_by"]) > (local["modified_at"], local["modified_by"])
+
+class SyncService:
+    """Records local changes and exports and imports changesets for one database."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        ensure_sync_tables(c)
+        conn.commit()
+        return conn
+
+    def _get_meta(self, conn: sqlite3.Connection, key: str) -> Optional[str]:
+        row = conn.execute("SELECT value FROM sync_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, conn: sqlite3.Connection, key: str, value: str):
+        conn.execute("INSERT OR REPLACE INTO sync_meta (key, value) VALUES (?, ?)", (key, value))
+
+    def get_site_id(self, conn: Optional[sqlite3.Connection] = None) -> str:
+        """Get the random id of this copy of the database, creating it on first use."""
+        own_conn = conn is None
+        conn = conn or self._connect()
+        try:
+            site_id = self._get_meta(conn, "site_id")
+            if site_id is None:
+                site_id = os.urandom(8).hex()
+                self._set_meta(conn, "site_id", site_id)
+                self._set_meta(conn, "clock", "0")
+                # Rows written before syncing was set up get their first version too
+                for table in SYNC_TABLES:
+                    conn.execute(f'''
+                        INSERT OR IGNORE INTO sync_dirty (table_name, row_key)
+                        SELECT '{table}', {_key_expression(table, table)} FROM {table}
+                    ''')
+                conn.commit()
+            return site_id
+        finally:
+            if own_conn:
+                conn.close()
+
+    def new_site(self) -> str:
+        """Give this database a new site id; needed once on a copy of another laptop's database."""
+        conn = self._connect()
+        try:
+            self.record_local_changes(conn)
+            site_id = os.urandom(8).hex()
+            self._set_meta(conn, "site_id", site_id)
+            conn.commit()
+            return site_id
+        finally:
+            conn.close()
+
+    def _fetch_row(self, conn: sqlite3.Connection, table: str, row_key: str) -> Optional[tuple]:
+        """Get the current values of a row, or None if it was deleted."""
+        spec = SYNC_TABLES[table]
+        where = " AND ".join(f"{column} = ?" for column in spec["key"])
+        return conn.execute(
+            f"SELECT {', '.join(spec['columns'])} FROM {table} WHERE {where}", row_key.split(KEY_SEPARATOR)
+        ).fetchone()
+
+    def _get_state(self, conn: sqlite3.Connection, table: str, row_key: str) -> Optional[Dict]:
+        row = conn.execute(
+            "SELECT hash, version, modified_by, modified_at, columns FROM sync_rows WHERE table_name = ? AND row_key = ?",
+            (table, row_key)
+        ).fetchone()
+        if row is None:
+            return None
+        version = json.loads(row[1])
+        return {"hash": row[0], "version": version, "modified_by": row[2], "modified_at": row[3],
+                "columns": column_versions(table, version, json.loads(row[4]) if row[4] else None)}
+
+    def _set_state(self, conn: sqlite3.Connection, table: str, row_key: str, hash_value: Optional[str],
+                   version: Dict[str, int], modified_by: str, modified_at: int,
+                   columns: Optional[Dict[str, Dict[str, int]]] = None):
+        """Store a row's version; only the column versions that differ from it are kept."""
+        own_columns = {column: vector for column, vector in (columns or {}).items() if vector != version}
+        conn.execute('''
+            INSERT OR REPLACE INTO sync_rows (table_name, row_key, hash, version, modified_by, modified_at, columns)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (table, row_key, hash_value, json.dumps(version, sort_keys=True), modified_by, modified_at,
+              json.dumps(own_columns, sort_keys=True) if own_columns else None))
+
+    def _raise_knowledge(self, conn: sqlite3.Connection, site_id: str, counter: int):
+        conn.execute('''
+            INSERT INTO sync_knowledge (site_id, counter) VALUES (?, ?)
+            ON CONFLICT(site_id) DO UPDATE SET counter = MAX(counter, excluded.counter)
+        ''', (site_id, counter))
+
+    def _record_change(self, conn: sqlite3.Connection, table: str, row_key: str, values: Optional[tuple],
+                       state: Optional[Dict], changed_columns: int, site_id: str, clock: int):
+        """Give a row the local version clock; the columns in the changed_columns mask get it too.
+
+        Editing a column settles its recorded conflict, the edit has seen both values.
+        """
+        version = dict(state["version"]) if state else {}
+        version[site_id] = clock
+        if values is None or state is None or state["hash"] is None or changed_columns == ALL_COLUMNS:
+            columns = {}
+            conn.execute("DELETE FROM sync_conflicts WHERE table_name = ? AND row_key = ?", (table, row_key))
+        else:
+            columns = state["columns"]
+            for bit, column in enumerate(SYNC_TABLES[table]["columns"]):
+                if changed_columns >> bit & 1:
+                    columns[column] = version
+                    conn.execute("DELETE FROM sync_conflicts WHERE table_name = ? AND row_key = ? AND column_name = ?",
+                                 (table, row_key, column))
+        self._set_state(conn, table, row_key, row_hash(values), version, site_id, clock, columns)
+
+    def record_local_changes(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        """Give every row changed since the last sync a new version; return how many changed.
+
+        Rows rewritten with the same values (the app saves whole tables) keep their version.
+        """
+        own_conn = conn is None
+        conn = conn or self._connect()
+        try:
+            site_id = self.get_site_id(conn)
+            clock = int(self._get_meta(conn, "clock") or 0)
+            changed = 0
+            for table, row_key, changed_columns in conn.execute("SELECT table_name, row_key, columns FROM sync_dirty").fetchall():
+                if table not in SYNC_TABLES:
+                    continue
+                values = self._fetch_row(conn, table, row_key)
+                hash_value = row_hash(values)
+                state = self._get_state(conn, table, row_key)
+                if state is None and hash_value is None:
+                    continue  # Inserted and deleted again between syncs
+                if state is not None and state["hash"] == hash_value:
+                    continue
+                clock += 1
+                self._record_change(conn, table, row_key, values, state, changed_columns, site_id, clock)
+                changed += 1
+
+            conn.execute("DELETE FROM sync_dirty")
+            self._set_meta(conn, "clock", str(clock))
+            self._raise_knowledge(conn, site_id, clock)
+            conn.commit()
+            return changed
+        finally:
+            if own_conn:
+                conn.close()
+
+    def get_knowledge(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        """Highest counter this copy has seen per site."""
+        return dict(conn.execute("SELECT site_id, counter FROM sync_knowledge").fetchall())
+
+    def get_peers(self) -> List[Tuple[str, Dict[str, int], str]]:
+        """List the known peers as (site id, what they had seen, last sync time)."""
+        conn = self._connect()
+        try:
+            return [(site, json.loads(knowledge), last_sync)
+                    for site, knowledge, last_sync in conn.execute("SELECT site_id, knowledge, last_sync FROM sync_peers")]
+        finally:
+            conn.close()
+
+    def _export_baseline(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        """What every known peer has seen: the element-wise minimum of their knowledge."""
+        peers = [json.loads(row[0]) for row in conn.execute("SELECT knowledge FROM sync_peers")]
+        if not peers:
+            return {}
+        sites = set().union(*peers)
+        return {site: min(peer.get(site, 0) for peer in peers) for site in sites}
+
+    def export_changeset(self, file_path: str, full: bool = False) -> Dict:
+        """Write the changes the known peers have not seen (everything with full=True) to a changeset file.
+
+        Returns the header with the number of rows written.
+        """
+        conn = self._connect()
+        try:
+            self.record_local_changes(conn)
+            site_id = self.get_site_id(conn)
+            knowledge = self.get_knowledge(conn)
+            since = {} if full else self._export_baseline(conn)
+
+            temp_path = file_path + ".tmp"
+            count = 0
+            with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+                header = {
+                    "format": CHANGESET_FORMAT,
+                    "version": CHANGESET_VERSION,
+                    "site": site_id,
+                    "knowledge": knowledge,
+                    "since": since,
+                    "created": datetime.now().isoformat(timespec="seconds"),
+                }
+                f.write(json.dumps(header) + "\n")
+                for origin in knowledge:
+                    rows = conn.execute('''
+                        SELECT table_name, row_key, version, modified_by, modified_at, columns
+                        FROM sync_rows WHERE modified_by = ? AND modified_at > ?
+                    ''', (origin, since.get(origin, 0)))
+                    for table, row_key, version, modified_by, modified_at, columns in rows.fetchall():
+                        values = self._fetch_row(conn, table, row_key)
+                        f.write(json.dumps({
+                            "table": table,
+                            "key": row_key,
+                            "version": json.loads(version),
+                            "columns": json.loads(columns) if columns else {},
+                            "modified_by": modified_by,
+                            "modified_at": modified_at,
+                            "values": list(values) if values is not None else None,
+                        }) + "\n")
+                        count += 1
+            os.replace(temp_path, file_path)
+            header["rows"] = count
+            return header
+        finally:
+            conn.close()
+
+    def _apply_row(self, conn: sqlite3.Connection, table: str, row_key: str, values: Optional[list]):
+        """Write incoming values to a table, keeping the rowid (and so the load order) of existing rows."""
+        spec = SYNC_TABLES[table]
+        if values is None:
+            where = " AND ".join(f"{column} = ?" for column in spec["key"])
+            conn.execute(f"DELETE FROM {table} WHERE {where}", row_key.split(KEY_SEPARATOR))
+            return
+        columns = spec["columns"]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column not in spec["key"])
+        conn.execute(f'''
+            INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})
+            ON CONFLICT({', '.join(spec['key'])}) DO UPDATE SET {updates}
+        ''', values)
+
+    def _update_receipt_totals(self, conn: sqlite3.Connection, receipt_ids: set):
+        """Recalculate the stored totals of receipts whose items were merged, if they are off by a cent or more."""
+        for receipt_id in receipt_ids:
+            stored = conn.execute(
+                "SELECT total_amount, groepskas_total, poef_total, pa_total FROM receipts WHERE id = ?", (receipt_id,)
+            ).fetchone()
+            if stored is None:
+                continue
+            totals = conn.execute('''
+                SELECT COALESCE(SUM(price * quantity), 0),
+                       COALESCE(SUM(CASE WHEN category = 'Groepskas' THEN price * quantity END), 0),
+                       COALESCE(SUM(CASE WHEN category = 'POEF' THEN price * quantity END), 0),
+                       COALESCE(SUM(CASE WHEN category = 'PA' THEN price * quantity END), 0)
+                FROM receipt_items WHERE receipt_id = ?
+            ''', (receipt_id,)).fetchone()
+            if any(round(old, 2) != round(new, 2) for old, new in zip(stored, totals)):
+                conn.execute(
+                    "UPDATE receipts SET total_amount = ?, groepskas_total = ?, poef_total = ?, pa_total = ? WHERE id = ?",
+                    (*totals, receipt_id)
+                )
+
+    def _update_leader_totals(self, conn: sqlite3.Connection, leader_ids: set):
+        """Recalculate the PA totals of merged leaders from their PA purchases, if they are off by a cent or more."""
+        for leader_id in leader_ids:
+            row = conn.execute("SELECT total_pa_expenses, pa_purchases FROM leaders WHERE id = ?", (leader_id,)).fetchone()
+            if row is None:
+                continue
+            total = pa_purchases_total(row[1])
+            if round(row[0], 2) != round(total, 2):
+                conn.execute("UPDATE leaders SET total_pa_expenses = ? WHERE id = ?", (total, leader_id))
+
+    def _record_conflict(self, conn: sqlite3.Connection, table: str, row_key: str, column: str,
+                         local_value, incoming_value, incoming_site: str):
+        conn.execute('''
+            INSERT INTO sync_conflicts (table_name, row_key, column_name, local_value, incoming_value, incoming_site, detected_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(table_name, row_key, column_name) DO UPDATE SET
+                local_value = excluded.local_value,
+                incoming_value = excluded.incoming_value,
+                incoming_site = excluded.incoming_site,
+                detected_at = excluded.detected_at
+        ''', (table, row_key, column, local_value, incoming_value, incoming_site,
+              datetime.now().isoformat(timespec="seconds")))
+
+    def _merge_columns(self, conn: sqlite3.Connection, table: str, row_key: str, local: Dict, incoming: Dict,
+                       incoming_site: str) -> Tuple[tuple, list, Dict[str, Dict[str, int]], int]:
+        """Merge concurrent versions of a row column by column.
+
+        Returns the local and merged values, the merged column versions and the number of conflicts.
+        """
+        spec = SYNC_TABLES[table]
+        local_values = self._fetch_row(conn, table, row_key)
+        incoming_columns = column_versions(table, incoming["version"], incoming.get("columns"))
+        merged = list(local_values)
+        columns = {}
+        conflicts = 0
+        for index, column in enumerate(spec["columns"]):
+            mine, theirs = local["columns"][column], incoming_columns[column]
+            value = incoming["values"][index]
+            if dominates(mine, theirs):
+                columns[column] = mine
+            elif dominates(theirs, mine):
+                columns[column] = theirs
+                merged[index] = value
+                conn.execute("DELETE FROM sync_conflicts WHERE table_name = ? AND row_key = ? AND column_name = ?",
+                             (table, row_key, column))
+            elif value == local_values[index] or column in spec["derived"]:
+                # Same value on both sides, or a total that is recalculated after the merge
+                columns[column] = merge_vectors(mine, theirs)
+            else:
+                # Both sides changed the column: keep the local value and its version, so the
+                # other laptop sees the conflict too, and let the user pick
+                columns[column] = mine
+                self._record_conflict(conn, table, row_key, column, local_values[index], value, incoming_site)
+                conflicts += 1
+        return local_values, merged, columns, conflicts
+
+    def import_changeset(self, file_path: str) -> Dict[str, int]:
+        """Merge a changeset into this database in one transaction and return what happened.
+
+        conflicts counts the columns both laptops changed; list_conflicts() shows them.
+        """
+        conn = self._connect()
+        try:
+            # Local edits need their versions before they can be compared
+            self.record_local_changes(conn)
+            site_id = self.get_site_id(conn)
+            result = {"applied": 0, "merged": 0, "skipped": 0, "conflicts": 0}
+
+            with gzip.open(file_path, "rt", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                if header.get("format") != CHANGESET_FORMAT or header.get("version") not in READABLE_CHANGESET_VERSIONS:
+                    raise ValueError("Not a Kamp Finances changeset")
+                if header["site"] == site_id:
+                    raise ValueError("This changeset was exported from this database. If this database is a copy of "
+                                     "the other laptop's, run 'run.py sync new-site' on one of them first")
+                knowledge = self.get_knowledge(conn)
+                if any(counter > knowledge.get(site, 0) for site, counter in header["since"].items()):
+                    raise ValueError("This changeset leaves out changes this database has not seen yet; "
+                                     "export a full changeset on the other laptop")
+
+                clock = int(self._get_meta(conn, "clock") or 0)
+                merged_receipts = set()
+                merged_leaders = set()
+                for line in f:
+                    incoming = json.loads(line)
+                    table, row_key = incoming["table"], incoming["key"]
+                    if table not in SYNC_TABLES:
+                        continue
+                    clock = max(clock, incoming["modified_at"])
+                    local = self._get_state(conn, table, row_key)
+
+                    if local is not None and dominates(local["version"], incoming["version"]):
+                        result["skipped"] += 1
+                        continue
+                    version = merge_vectors(local["version"], incoming["version"]) if local else incoming["version"]
+                    if table == "receipt_items":
+                        merged_receipts.add(row_key.split(KEY_SEPARATOR)[0])
+
+                    if local is None or local["hash"] is None or incoming["values"] is None:
+                        if local is not None and not dominates(incoming["version"], local["version"]) \
+                                and not incoming_wins(local, incoming):
+                            # The local edit beats the concurrent delete; remember we have seen the delete
+                            self._set_state(conn, table, row_key, local["hash"], version,
+                                            local["modified_by"], local["modified_at"], local["columns"])
+                            result["merged"] += 1
+                            continue
+                        self._apply_row(conn, table, row_key, incoming["values"])
+                        conn.execute("DELETE FROM sync_conflicts WHERE table_name = ? AND row_key = ?", (table, row_key))
+                        self._set_state(conn, table, row_key, row_hash(incoming["values"]), version,
+                                        incoming["modified_by"], incoming["modified_at"],
+                                        column_versions(table, incoming["version"], incoming.get("columns")))
+                        result["applied"] += 1
+                        continue
+
+                    local_values, merged, columns, conflicts = self._merge_columns(
+                        conn, table, row_key, local, incoming, header["site"])
+                    result["conflicts"] += conflicts
+                    if merged == incoming["values"]:
+                        modified_by, modified_at = incoming["modified_by"], incoming["modified_at"]
+                        result["applied"] += 1
+                    elif merged == list(local_values):
+                        modified_by, modified_at = local["modified_by"], local["modified_at"]
+                        result["merged"] += 1
+                    else:
+                        # A mix of both sides is a new version, so peers that saw either side get it too
+                        clock += 1
+                        version[site_id] = clock
+                        modified_by, modified_at = site_id, clock
+                        result["merged"] += 1
+                    if merged != list(local_values):
+                        self._apply_row(conn, table, row_key, merged)
+                    self._set_state(conn, table, row_key, row_hash(merged), version, modified_by, modified_at, columns)
+                    if table == "leaders":
+                        merged_leaders.add(row_key)
+                    elif table == "receipts":
+                        merged_receipts.add(row_key)
+
+            # Everything dirty now was written by this import, which already set the versions;
+            # recalculated totals are dirty again afterwards and become a local change if they differ
+            conn.execute("DELETE FROM sync_dirty")
+            self._update_receipt_totals(conn, merged_receipts)
+            self._update_leader_totals(conn, merged_leaders)
+            self._set_meta(conn, "clock", str(clock))
+            for site, counter in header["knowledge"].items():
+                self._raise_knowledge(conn, site, counter)
+            self._raise_knowledge(conn, site_id, clock)
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_peers (site_id, knowledge, last_sync) VALUES (?, ?, ?)",
+                (header["site"], json.dumps(header["knowledge"]), datetime.now().isoformat(timespec="seconds"))
+            )
+            conn.commit()
+            self.record_local_changes(conn)
+            return result
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _conflict_label(self, conn: sqlite3.Connection, table: str, row_key: str) -> str:
+        """Describe the row of a conflict for the user."""
+        if table == "leaders":
+            row = conn.execute("SELECT name FROM leaders WHERE id = ?", (row_key,)).fetchone()
+            return f"Leader {row[0]}" if row else f"Leader {row_key}"
+        receipt_id = row_key.split(KEY_SEPARATOR)[0]
+        receipt = conn.execute("SELECT store_name, date FROM receipts WHERE id = ?", (receipt_id,)).fetchone()
+        receipt_label = f"receipt {receipt[0]} {receipt[1]}" if receipt else f"receipt {receipt_id}"
+        if table == "receipts":
+            return receipt_label.capitalize()
+        item = self._fetch_row(conn, table, row_key)
+        return f"Item {item[1]} on {receipt_label}" if item else f"Item on {receipt_label}"
+
+    def list_conflicts(self) -> List[Dict]:
+        """List the columns both laptops changed, with the value kept here and the other laptop's value."""
+        conn = self._connect()
+        try:
+            conflicts = []
+            for conflict_id, table, row_key, column, incoming_value, incoming_site, detected_at in conn.execute('''
+                SELECT id, table_name, row_key, column_name, incoming_value, incoming_site, detected_at
+                FROM sync_conflicts ORDER BY id
+            ''').fetchall():
+                values = self._fetch_row(conn, table, row_key)
+                conflicts.append({
+                    "id": conflict_id,
+                    "table": table,
+                    "key": row_key,
+                    "column": column,
+                    "label": self._conflict_label(conn, table, row_key),
+                    "field": column.replace("_", " "),
+                    "local_value": values[SYNC_TABLES[table]["columns"].index(column)] if values else None,
+                    "incoming_value": incoming_value,
+                    "incoming_site": incoming_site,
+                    "detected_at": detected_at,
+                })
+            return conflicts
+        finally:
+            conn.close()
+
+    def resolve_conflict(self, conflict_id: int, use_incoming: bool) -> bool:
+        """Settle a conflict with the other laptop's value or the local one; return False if it is gone.
+
+        The chosen value gets a new local version, so it wins on the other laptop at the next sync.
+        """
+        conn = self._connect()
+        try:
+            self.record_local_changes(conn)
+            row = conn.execute(
+                "SELECT table_name, row_key, column_name, incoming_value FROM sync_conflicts WHERE id = ?", (conflict_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            table, row_key, column, incoming_value = row
+            spec = SYNC_TABLES[table]
+            changed_columns = 1 << spec["columns"].index(column)
+            if use_incoming:
+                where = " AND ".join(f"{key_column} = ?" for key_column in spec["key"])
+                conn.execute(f"UPDATE {table} SET {column} = ? WHERE {where}", (incoming_value, *row_key.split(KEY_SEPARATOR)))
+                if table == "leaders":
+                    self._update_leader_totals(conn, {row_key})
+                else:
+                    self._update_receipt_totals(conn, {row_key.split(KEY_SEPARATOR)[0]})
+                # The recalculated totals of this row are part of the same change
+                dirty = conn.execute("SELECT columns FROM sync_dirty WHERE table_name = ? AND row_key = ?",
+                                     (table, row_key)).fetchone()
+                if dirty:
+                    changed_columns |= dirty[0]
+                    conn.execute("DELETE FROM sync_dirty WHERE table_name = ? AND row_key = ?", (table, row_key))
+
+            values = self._fetch_row(conn, table, row_key)
+            state = self._get_state(conn, table, row_key)
+            if values is not None and state is not None:
+                site_id = self.get_site_id(conn)
+                clock = int(self._get_meta(conn, "clock") or 0) + 1
+                self._record_change(conn, table, row_key, values, state, changed_columns, site_id, clock)
+                self._set_meta(conn, "clock", str(clock))
+                self._raise_knowledge(conn, site_id, clock)
+            conn.execute("DELETE FROM sync_conflicts WHERE id = ?", (conflict_id,))
+            conn.commit()
+            # Receipt totals changed by an item are a change of the receipt row
+            self.record_local_changes(conn)
+            return True
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
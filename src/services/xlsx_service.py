@@ -0,0 +1,289 @@
+"""
+XLSX export service for Kamp Finances application.
+Streams an Excel workbook from database cursors using only zipfile and hand-written XML.
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+import zipfile
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable, Tuple
+
+from models.leader import POEF_DRINK_PRICE, POEF_CIGARETTE_PRICE
+from models.expense import ExpenseCategory
+from services.export_service import EXPORT_TABLES, EXPORT_CHUNK_SIZE
+from utils.paths import DEFAULT_DATA_DIR
+
+# Cell styles, indexes into cellXfs in styles.xml
+STYLE_DEFAULT = 0
+STYLE_EURO = 1
+STYLE_HEADER = 2
+
+# Characters XML 1.0 does not allow, even escaped
+_ILLEGAL_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+ITEMS_BY_CATEGORY_SQL = '''
+    SELECT i.id, i.receipt_id, r.date, r.store_name, i.name,
+           i.price, i.quantity, i.price * i.quantity
+    FROM receipt_items i
+    LEFT JOIN receipts r ON r.id = i.receipt_id
+    WHERE i.category = :category
+    ORDER BY r.rowid, i.rowid
+'''
+
+POEF_SQL = '''
+    SELECT name, poef_drink_count, poef_drink_count * :drink_price,
+           poef_cigarette_count, poef_cigarette_count * :cigarette_price,
+           poef_drink_count * :drink_price + poef_cigarette_count * :cigarette_price
+    FROM leaders
+    ORDER BY rowid
+'''
+
+def get_workbook_sheets() -> List[Dict]:
+    """Get the sheets of the workbook: name, header, query, parameters and euro columns."""
+    sheets = [
+        {"name": "Leaders", "header": EXPORT_TABLES["leaders"]["header"], "sql": EXPORT_TABLES["leaders"]["sql"],
+         "params": {}, "money": EXPORT_TABLES["leaders"]["money"]},
+        {"name": "Receipts", "header": EXPORT_TABLES["receipts"]["header"], "sql": EXPORT_TABLES["receipts"]["sql"],
+         "params": {}, "money": EXPORT_TABLES["receipts"]["money"]},
+    ]
+    for category in ExpenseCategory:
+        sheets.append({
+            "name": f"{category.value} Items",
+            "header": ["ID", "Receipt ID", "Receipt Date", "Store", "Name", "Price", "Quantity", "Total Price"],
+            "sql": ITEMS_BY_CATEGORY_SQL,
+            "params": {"category": category.value},
+            "money": {5, 7},
+        })
+    sheets.append({
+        "name": "POEF",
+        "header": ["Leader", "Drinks", "Drinks Total", "Cigarettes", "Cigarettes Total", "POEF Total"],
+        "sql": POEF_SQL,
+        "params": {},
+        "money": {2, 4, 5},
+    })
+    return sheets
+
+def escape(text: str) -> str:
+    """Escape text for use in XML content and double-quoted attributes."""
+    # xml.sax.saxutils.escape would pull in urllib and http at import time
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+def column_letter(index: int) -> str:
+    """Convert a 0-based column index to Excel letters (0 -> A, 26 -> AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def _cell(ref: str, value, money: bool) -> str:
+    """Render one cell as XML; empty values produce no cell at all."""
+    value_type = type(value)
+    if value_type is str:
+        if not value:
+            return ""
+        # Most values need no escaping, skip the replace calls for them
+        if not value.isprintable():
+            value = _ILLEGAL_XML_CHARS.sub("", value)
+        if "&" in value or "<" in value or ">" in value:
+            value = escape(value)
+        return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{value}</t></is></c>'
+    if value is None:
+        return ""
+    if value_type is float or value_type is int:
+        if money:
+            return f'<c r="{ref}" s="{STYLE_EURO}"><v>{value!r}</v></c>'
+        return f'<c r="{ref}"><v>{value!r}</v></c>'
+    return _cell(ref, str(value), money)
+
+class XLSXWriter:
+    """Minimal streaming XLSX writer.
+
+    Each worksheet is written straight into the zip archive while rows are
+    produced, so only the current chunk of rows is ever held in memory.
+    Strings are stored inline instead of in a shared strings table, which
+    would otherwise have to be kept in memory until the end.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.sheet_names: List[str] = []
+        self.archive = zipfile.ZipFile(file_path, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def add_sheet(self, name: str, header: List[str], rows: Iterable[Tuple], money_columns=()) -> int:
+        """Write a worksheet with a bold, frozen header row and return the number of data rows."""
+        # Excel limits sheet names to 31 characters and forbids a few characters
+        name = re.sub(r"[\[\]:*?/\\]", "_", name)[:31]
+        self.sheet_names.append(name)
+        sheet_path = f"xl/worksheets/sheet{len(self.sheet_names)}.xml"
+
+        letters = [column_letter(i) for i in range(len(header))]
+        money = [i in money_columns for i in range(len(header))]
+        count = 0
+
+        with self.archive.open(sheet_path, "w", force_zip64=True) as f:
+            cols = "".join(
+                f'<col min="{i + 1}" max="{i + 1}" width="{max(len(title) + 2, 12)}" customWidth="1"/>'
+                for i, title in enumerate(header)
+            )
+            header_cells = "".join(
+                f'<c r="{letters[i]}1" s="{STYLE_HEADER}" t="inlineStr"><is><t>{escape(title)}</t></is></c>'
+                for i, title in enumerate(header)
+            )
+            f.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                '<sheetViews><sheetView workbookViewId="0">'
+                '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+                '</sheetView></sheetViews>'
+                f'<cols>{cols}</cols><sheetData><row r="1">{header_cells}</row>'
+            ).encode("utf-8"))
+
+            buffer = []
+            for row in rows:
+                count += 1
+                row_number = count + 1
+                cells = "".join(
+                    _cell(f"{letters[i]}{row_number}", value, money[i])
+                    for i, value in enumerate(row)
+                )
+                buffer.append(f'<row r="{row_number}">{cells}</row>')
+                if len(buffer) >= EXPORT_CHUNK_SIZE:
+                    f.write("".join(buffer).encode("utf-8"))
+                    buffer = []
+            if buffer:
+                f.write("".join(buffer).encode("utf-8"))
+
+            f.write(b'</sheetData></worksheet>')
+        return count
+
+    def close(self):
+        """Write the workbook parts that list the sheets and close the archive."""
+        sheets = "".join(
+            f'<sheet name="{escape(name)}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, name in enumerate(self.sheet_names, start=1)
+        )
+        sheet_rels = "".join(
+            f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(self.sheet_names) + 1)
+        )
+        styles_id = len(self.sheet_names) + 1
+        sheet_types = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, len(self.sheet_names) + 1)
+        )
+
+        self.archive.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f'{sheet_types}</Types>'
+        ))
+        self.archive.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ))
+        self.archive.writestr("xl/workbook.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets></workbook>'
+        ))
+        self.archive.writestr("xl/_rels/workbook.xml.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{sheet_rels}'
+            f'<Relationship Id="rId{styles_id}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ))
+        # cellXfs order must match the STYLE_* constants
+        self.archive.writestr("xl/styles.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<numFmts count="1"><numFmt numFmtId="164" formatCode="&quot;€&quot;\\ #,##0.00"/></numFmts>'
+            '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+            '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+            '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+            '<fill><patternFill patternType="gray125"/></fill></fills>'
+            '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            '<cellXfs count="3">'
+            '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+            '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+            '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+            '</cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+            '</styleSheet>'
+        ))
+        self.archive.close()
+
+class XLSXExporter:
+    """Exports the camp database to an XLSX workbook, one sheet per table and item category."""
+
+    def __init__(self, db_path: str, chunk_size: int = EXPORT_CHUNK_SIZE):
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+
+    def iter_rows(self, conn: sqlite3.Connection, sql: str, params: Dict) -> Iterable[Tuple]:
+        """Yield rows of a query, fetched in chunks."""
+        params = dict(params, drink_price=POEF_DRINK_PRICE, cigarette_price=POEF_CIGARETTE_PRICE)
+        cursor = conn.execute(sql, params)
+        while True:
+            chunk = cursor.fetchmany(self.chunk_size)
+            if not chunk:
+                break
+            yield from chunk
+
+    def export(self, file_path: str) -> Dict[str, int]:
+        """Write the workbook to file_path and return {sheet name: row count}."""
+        # Write next to the target and rename, so a failed export never leaves a broken workbook
+        directory = os.path.dirname(os.path.abspath(file_path))
+        fd, temp_path = tempfile.mkstemp(suffix=".xlsx.tmp", dir=directory)
+        os.close(fd)
+
+        counts = {}
+        conn = sqlite3.connect(self.db_path)
+        try:
+            writer = XLSXWriter(temp_path)
+            try:
+                for sheet in get_workbook_sheets():
+                    rows = self.iter_rows(conn, sheet["sql"], sheet["params"])
+                    counts[sheet["name"]] = writer.add_sheet(sheet["name"], sheet["header"], rows, sheet["money"])
+            finally:
+                writer.close()
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        finally:
+            conn.close()
+        return counts
+
+def main(argv: Optional[List[str]] = None):
+    """Headless entry point: python -m services.xlsx_service [--db PATH] OUTPUT.xlsx (run from src)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the camp database to an Excel workbook.")
+    parser.add_argument("output", help="Path of the .xlsx file to write")
+    parser.add_argument("--db", default=os.path.join(DEFAULT_DATA_DIR, "kamp_finances.db"), help="Path of the SQLite database")
+    args = parser.parse_args(argv)
+
+    start = datetime.now()
+    counts = XLSXExporter(args.db).export(args.output)
+    for name, count in counts.items():
+        print(f"  {name}: {count} rows")
+    print(f"✅ Workbook written to {args.output} in {(datetime.now() - start).total_seconds():.1f} s")
+
+if __name__ == "__main__":
+    main()
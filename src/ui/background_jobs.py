@@ -0,0 +1,95 @@
+"""
+Background jobs for Kamp Finances application.
+Runs slow work like backups and database maintenance on a worker thread, on request
+or on a timer of the Tk event loop, and tracks how long the user has been idle.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+class IdleTracker:
+    """Remembers when the app last had keyboard or mouse input."""
+
+    def __init__(self, widget):
+        self._last_input = time.monotonic()
+        widget.bind_all("<Any-KeyPress>", self._on_input, add="+")
+        widget.bind_all("<Any-ButtonPress>", self._on_input, add="+")
+
+    def _on_input(self, event=None):
+        self._last_input = time.monotonic()
+
+    def idle_seconds(self) -> float:
+        """Seconds since the last key press or mouse click."""
+        return time.monotonic() - self._last_input
+
+class BackgroundJobScheduler:
+    """Runs a job on a worker thread, on request or every interval, one run at a time.
+
+    should_run() is asked before each scheduled run, so a run can be skipped when there
+    is nothing to do; on_done(result or None, error or None) is called on the Tk thread.
+    """
+
+    POLL_INTERVAL_MS = 200
+
+    def __init__(self, widget, job: Callable, interval_ms: int,
+                 should_run: Optional[Callable[[], bool]] = None, on_done: Optional[Callable] = None):
+        self.widget = widget
+        self.job = job
+        self.interval_ms = interval_ms
+        self.should_run = should_run
+        self.on_done = on_done
+        self.last_started = None
+        self._timer = None
+        self._thread = None
+        self._result = None
+
+    def start(self):
+        """Schedule the first run."""
+        self.stop()
+        self._timer = self.widget.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        """Cancel the next scheduled run; a running job finishes."""
+        if self._timer is not None:
+            self.widget.after_cancel(self._timer)
+            self._timer = None
+
+    def is_running(self) -> bool:
+        """Check whether the job is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self):
+        """Block until a running job has finished."""
+        if self._thread is not None:
+            self._thread.join()
+
+    def run_now(self, *args, **kwargs) -> bool:
+        """Start the job on a worker thread unless it is running; return whether it started."""
+        if self.is_running():
+            return False
+        self.last_started = time.monotonic()
+        self._thread = threading.Thread(target=self._worker, args=(self.job, args, kwargs), daemon=True)
+        self._thread.start()
+        self.widget.after(self.POLL_INTERVAL_MS, self._poll)
+        return True
+
+    def _tick(self):
+        """Run the job if it should run, and schedule the next check."""
+        self._timer = self.widget.after(self.interval_ms, self._tick)
+        if self.should_run is None or self.should_run():
+            self.run_now()
+
+    def _worker(self, job: Callable, args: tuple, kwargs: dict):
+        try:
+            self._result = (job(*args, **kwargs), None)
+        except Exception as e:
+            self._result = (None, e)
+
+    def _poll(self):
+        """Report the result once the worker has finished."""
+        if self.is_running():
+            self.widget.after(self.POLL_INTERVAL_MS, self._poll)
+            return
+        if self.on_done:
+            self.on_done(*self._result)
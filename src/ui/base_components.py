@@ -4,8 +4,15 @@ Base UI components for Kamp Finances application.
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import Callable, Optional, List, Dict
+from typing import Callable, Optional, List, Dict, Iterable, Any
 from datetime import datetime
+import functools
+import time
+
+from utils import mem_profile, perf
+
+# Longest time a single rendering slice may hold the event loop (about one frame)
+FRAME_BUDGET_MS = 12
 
 class BaseTab(ttk.Frame):
     """Base class for all tabs with common functionality."""
@@ -15,6 +22,24 @@ class BaseTab(ttk.Frame):
         self.main_window = main_window
         self.create_widgets()
     
+    def __init_subclass__(cls, **kwargs):
+        """Time the refresh_data of every tab under its own name and take a memory checkpoint after it."""
+        super().__init_subclass__(**kwargs)
+        if "refresh_data" in cls.__dict__:
+            refresh_data = perf.timed(f"{cls.__name__}.refresh_data")(cls.refresh_data)
+            cls.refresh_data = BaseTab._with_memory_checkpoint(refresh_data, f"refresh {cls.__name__}")
+    
+    @staticmethod
+    def _with_memory_checkpoint(refresh_data: Callable, label: str) -> Callable:
+        """Wrap refresh_data to take a memory checkpoint when profiling memory."""
+        @functools.wraps(refresh_data)
+        def wrapper(self, *args, **kwargs):
+            result = refresh_data(self, *args, **kwargs)
+            if mem_profile.is_enabled():
+                mem_profile.checkpoint(label, self.main_window)
+            return result
+        return wrapper
+    
     def create_widgets(self):
         """Override this method to create tab-specific widgets."""
         pass
@@ -23,6 +48,10 @@ class BaseTab(ttk.Frame):
         """Override this method to refresh tab data."""
         pass
     
+    def flush_pending_changes(self):
+        """Override this method to persist edits the tab is still holding back."""
+        pass
+    
     def show_error(self, message: str):
         """Show error message."""
         messagebox.showerror("Error", message)
@@ -35,6 +64,56 @@ class BaseTab(ttk.Frame):
         """Show confirmation dialog."""
         return messagebox.askyesno("Confirm", message)
 
+class ChunkedRenderer:
+    """Runs per-item work in time-sliced batches scheduled on the Tk event loop.
+    
+    Each slice processes items until the frame budget is used up and then yields
+    back to the event loop, so clicks and typing stay responsive. Starting a new
+    render cancels the one still in progress.
+    """
+    
+    def __init__(self, widget, budget_ms: float = FRAME_BUDGET_MS):
+        self.widget = widget
+        self.budget = budget_ms / 1000.0
+        self._job = None
+        self._items = None
+    
+    def start(self, items: Iterable, handle: Callable[[Any], None], on_complete: Optional[Callable] = None):
+        """Process items with handle() in slices, calling on_complete() when done."""
+        self.cancel()
+        self._items = iter(items)
+        self._handle = handle
+        self._on_complete = on_complete
+        # Render the first slice right away so the table never flashes empty
+        self._run_slice()
+    
+    def cancel(self):
+        """Stop the render in progress, if any."""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self._items = None
+    
+    def is_running(self) -> bool:
+        """Check whether a render is still in progress."""
+        return self._items is not None
+    
+    def _run_slice(self):
+        """Process items until the frame budget runs out, then reschedule."""
+        self._job = None
+        items = self._items
+        deadline = time.perf_counter() + self.budget
+        
+        for item in items:
+            self._handle(item)
+            if time.perf_counter() >= deadline:
+                self._job = self.widget.after(1, self._run_slice)
+                return
+        
+        self._items = None
+        if self._on_complete:
+            self._on_complete()
+
 class DataTable(ttk.Frame):
     """Reusable data table component with sorting and filtering."""
     
@@ -44,6 +123,7 @@ class DataTable(ttk.Frame):
         self.height = height
         self.tree = None
         self.create_widgets()
+        self.renderer = ChunkedRenderer(self)
     
     def create_widgets(self):
         """Create the table widgets."""
@@ -66,16 +146,49 @@ class DataTable(ttk.Frame):
     
     def clear_data(self):
         """Clear all data from the table."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # Stop any render still filling the table
+        if self.renderer.is_running():
+            self.renderer.cancel()
+        
+        self.tree.delete(*self.tree.get_children())
     
-    def add_row(self, values: List, tags: Optional[List] = None):
-        """Add a row to the table."""
+    def add_row(self, values: List, tags: Optional[List] = None) -> str:
+        """Add a row to the table and return its item ID."""
         if tags is None:
             tags = []
         # Ensure all tags are strings to prevent Tkinter from converting them
         string_tags = [str(tag) for tag in tags]
-        self.tree.insert("", tk.END, values=values, tags=string_tags)
+        return self.tree.insert("", tk.END, values=values, tags=string_tags)
+    
+    def stream_rows(self, rows: Iterable, on_complete: Optional[Callable] = None):
+        """Replace the table contents, inserting rows in time-sliced batches.
+        
+        Rows are (values, tags) tuples and may come from a generator, so formatting
+        is spread over the batches too. A newer call cancels a stream still in progress.
+        """
+        self.clear_data()
+        if perf.is_enabled():
+            on_complete = self._timed_completion(on_complete)
+        self.renderer.start(rows, lambda row: self.add_row(row[0], tags=row[1]), on_complete)
+    
+    def _timed_completion(self, on_complete: Optional[Callable]) -> Callable:
+        """Wrap on_complete to record how long the whole stream took to fill the table."""
+        start = time.perf_counter()
+        
+        def complete():
+            perf.record("DataTable.stream_rows", time.perf_counter() - start)
+            if on_complete:
+                on_complete()
+        return complete
+    
+    def select_by_tag(self, tag: str) -> bool:
+        """Select the first row carrying the given tag."""
+        matches = self.tree.tag_has(str(tag))
+        if matches:
+            self.tree.selection_set(matches[0])
+            self.tree.see(matches[0])
+            return True
+        return False
     
     def get_selected_item(self):
         """Get the currently selected item."""
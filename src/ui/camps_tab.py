@@ -0,0 +1,183 @@
+"""
+Camps tab for Kamp Finances application.
+Lists every camp in the registry with its totals and reports leaders across camps.
+"""
+
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+from utils.lazy_import import lazy_import
+from .base_components import BaseTab, DataTable
+
+# Only needed when archiving
+archive_service = lazy_import("services.archive_service")
+
+# How often the tab checks whether the cross-camp report or an archive job has finished
+REPORT_POLL_INTERVAL_MS = 50
+
+class CampsTab(BaseTab):
+    """Tab with the totals of all camps and the leaders across them."""
+
+    def __init__(self, parent, main_window):
+        self._job_thread = None
+        self._job_result = None
+        super().__init__(parent, main_window)
+
+    def create_widgets(self):
+        """Create the camps tab widgets."""
+        # Title
+        title_label = ttk.Label(self, text="All Camps", style="Title.TLabel")
+        title_label.pack(pady=10)
+
+        # Buttons frame
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        ttk.Button(button_frame, text="Open Camp", command=self.open_selected_camp).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="New Camp...", command=self.main_window.new_camp).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(button_frame, text="Archive Camp", command=self.archive_selected_camp).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(button_frame, text="Unarchive Camp", command=self.unarchive_selected_camp).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(button_frame, text="Refresh", command=self.refresh_data).pack(side=tk.LEFT, padx=(10, 0))
+
+        # Camps table
+        camp_columns = [
+            {"name": "id", "display": "Camp", "width": 140},
+            {"name": "name", "display": "Name", "width": 180},
+            {"name": "dates", "display": "Dates", "width": 160},
+            {"name": "status", "display": "Status", "width": 80},
+            {"name": "leaders", "display": "Leaders", "width": 70, "anchor": tk.E},
+            {"name": "receipts", "display": "Receipts", "width": 70, "anchor": tk.E},
+            {"name": "spent", "display": "Spent (€)", "width": 100, "anchor": tk.E},
+            {"name": "outstanding", "display": "Remaining (€)", "width": 100, "anchor": tk.E}
+        ]
+
+        self.camps_table = DataTable(self, camp_columns, height=8)
+        self.camps_table.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        # Leaders across camps
+        ttk.Label(self, text="Leaders across camps", style="Header.TLabel").pack(anchor=tk.W, padx=10, pady=(10, 0))
+        leader_columns = [
+            {"name": "name", "display": "Leader", "width": 220},
+            {"name": "camps", "display": "Camps", "width": 70, "anchor": tk.E},
+            {"name": "charged", "display": "Charged (€)", "width": 100, "anchor": tk.E},
+            {"name": "paid", "display": "Paid (€)", "width": 100, "anchor": tk.E},
+            {"name": "outstanding", "display": "Remaining (€)", "width": 100, "anchor": tk.E}
+        ]
+
+        self.leaders_table = DataTable(self, leader_columns, height=12)
+        self.leaders_table.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+    def refresh_data(self):
+        """Run the cross-camp report on a worker thread and show it when done."""
+        registry = self.main_window.camp_registry
+        self._start_job(lambda: (registry.list_camps(), registry.camp_totals(), registry.leader_totals()),
+                        self._show_report, "report on the camps")
+
+    def _start_job(self, work, on_done, description: str) -> bool:
+        """Run work off the Tk thread and pass its result to on_done; one job at a time."""
+        if self._job_thread is not None and self._job_thread.is_alive():
+            return False
+        self._job_result = None
+
+        def worker():
+            try:
+                self._job_result = (work(), None)
+            except Exception as e:
+                self._job_result = (None, e)
+
+        self._job_thread = threading.Thread(target=worker, daemon=True)
+        self._job_thread.start()
+        self.after(REPORT_POLL_INTERVAL_MS, lambda: self._poll_job(on_done, description))
+        return True
+
+    def _poll_job(self, on_done, description: str):
+        """Hand the result of the job to on_done once it has finished."""
+        if self._job_thread.is_alive():
+            self.after(REPORT_POLL_INTERVAL_MS, lambda: self._poll_job(on_done, description))
+            return
+        result, error = self._job_result
+        if error is not None:
+            self.show_error(f"Failed to {description}: {str(error)}")
+            self.main_window.status_label.config(text=f"Failed to {description}")
+            return
+        on_done(result)
+
+    def _show_report(self, result):
+        """Fill the tables with the cross-camp report."""
+        camps, camp_totals, leader_totals = result
+
+        totals = {row["camp_id"]: row for row in camp_totals}
+        self.camps_table.clear_data()
+        for camp in camps:
+            row = totals.get(camp.id)
+            dates = f"{camp.start_date} - {camp.end_date}" if camp.start_date else ""
+            values = [camp.id, camp.name, dates, camp.status]
+            if row is None:
+                values += [0, 0, "0.00", "0.00"]
+            else:
+                spent = row["groepskas"] + row["poef"] + row["pa"]
+                values += [row["leaders"], row["receipts"], f"{spent:.2f}", f"{row['outstanding']:.2f}"]
+            self.camps_table.add_row(values, tags=[camp.id])
+
+        self.leaders_table.clear_data()
+        for row in leader_totals:
+            self.leaders_table.add_row([
+                row["name"],
+                row["camps"],
+                f"{row['charged']:.2f}",
+                f"{row['paid']:.2f}",
+                f"{row['outstanding']:.2f}"
+            ])
+
+    def get_selected_camp_id(self):
+        """Get the id of the selected camp, telling the user if none is selected."""
+        selection = self.camps_table.get_selected_item()
+        if not selection:
+            self.show_error("Please select a camp")
+            return None
+        return str(selection["tags"][0])
+
+    def open_selected_camp(self):
+        """Switch the app to the selected camp."""
+        camp_id = self.get_selected_camp_id()
+        if camp_id:
+            self.main_window.switch_camp(camp_id)
+
+    def archive_selected_camp(self):
+        """Freeze the selected camp into a compressed read-only snapshot."""
+        camp_id = self.get_selected_camp_id()
+        if not camp_id:
+            return
+        if camp_id == self.main_window.camp.id:
+            self.show_error("The open camp cannot be archived; open another camp first")
+            return
+        if not self.show_confirm(f"Archive camp {camp_id}?\n\nIts reports stay available; "
+                                 "it has to be unarchived before it can be edited again."):
+            return
+
+        service = archive_service.ArchiveService(self.main_window.camp_registry)
+        if self._start_job(lambda: service.archive_camp(camp_id), self._on_archived, f"archive {camp_id}"):
+            self.main_window.status_label.config(text=f"Archiving {camp_id}...")
+
+    def _on_archived(self, sizes):
+        """Report the space saved by archiving and show the new status."""
+        self.main_window.status_label.config(
+            text=f"Camp archived: {sizes['live_bytes'] / 1024:.0f} KB -> "
+                 f"{(sizes['snapshot_bytes'] + sizes['summary_bytes']) / 1024:.0f} KB"
+        )
+        self.refresh_data()
+
+    def unarchive_selected_camp(self):
+        """Restore the selected archived camp so it can be edited."""
+        camp_id = self.get_selected_camp_id()
+        if not camp_id:
+            return
+        service = archive_service.ArchiveService(self.main_window.camp_registry)
+        if self._start_job(lambda: service.restore_camp(camp_id), self._on_unarchived, f"unarchive {camp_id}"):
+            self.main_window.status_label.config(text=f"Unarchiving {camp_id}...")
+
+    def _on_unarchived(self, camp):
+        """Show that the camp can be edited again."""
+        self.main_window.status_label.config(text=f"{camp.name} can be edited again")
+        self.refresh_data()
@@ -0,0 +1,125 @@
+"""
+Leader summary view model for Kamp Finances application.
+Builds the detailed summary text of a leader section by section and caches each section.
+"""
+
+from typing import List, Dict, Tuple
+from datetime import datetime
+
+from models.leader import Leader, POEF_DRINK_PRICE, POEF_CIGARETTE_PRICE
+from utils.perf import timed
+
+class LeaderSummaryCache:
+    """Per-leader cache of detailed summary sections.
+
+    Every section is stored with the key it was built from. The key holds the
+    leader values the section shows plus, for the PA lines, the receipts version
+    and the PA index version. A section is only rebuilt when its key changes,
+    so a POEF click never regenerates hundreds of PA lines.
+    """
+
+    SECTIONS = ("header", "pa", "poef", "overall", "payment")
+
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self._sections: Dict[str, Dict[str, Tuple]] = {}
+
+    @timed()
+    def get_sections(self, leader: Leader) -> List[Tuple[str, str]]:
+        """Get the (name, text) sections of a leader's summary, rebuilding only stale ones."""
+        cached = self._sections.setdefault(leader.id, {})
+        poef_total = leader.get_poef_total()
+
+        keys = {
+            # The report date changes every time, the header is a single cheap line
+            "header": (leader.name, datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+            "pa": (
+                self.main_window.receipts_version,
+                self.main_window.pa_index.version,
+                len(leader.pa_purchases),
+                leader.total_pa_expenses
+            ),
+            "poef": (leader.poef_drink_count, leader.poef_cigarette_count),
+            "overall": (leader.total_pa_expenses, poef_total),
+            "payment": (leader.paid_amount, leader.get_remaining_to_pay()),
+        }
+
+        sections = []
+        for name in self.SECTIONS:
+            entry = cached.get(name)
+            if entry is None or entry[0] != keys[name]:
+                entry = (keys[name], getattr(self, f"_build_{name}")(leader))
+                cached[name] = entry
+            sections.append((name, entry[1]))
+        return sections
+
+    def forget(self, leader_id: str):
+        """Drop the cached sections of a leader."""
+        self._sections.pop(leader_id, None)
+
+    def _build_header(self, leader: Leader) -> str:
+        """Build the title and report date."""
+        lines = [
+            f"LEADER SUMMARY - {leader.name}",
+            "=" * 50,
+            f"Report Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            "",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _build_pa(self, leader: Leader) -> str:
+        """Build the PA expense lines, using the PA item lookup and index instead of scans."""
+        items = self.main_window.get_pa_item_lookup()
+        pa_index = self.main_window.pa_index
+
+        lines = ["PA EXPENSES:", "-" * 20]
+        if leader.pa_purchases:
+            for purchase_id, amount in leader.pa_purchases.items():
+                item = items.get(purchase_id)
+                item_name = item.name if item else f"Unknown Item ({purchase_id})"
+                total_item_price = item.get_total_price() if item else 0.0
+                num_leaders = pa_index.get_leader_count(purchase_id)
+
+                if num_leaders > 1:
+                    lines.append(f"  {item_name}: €{amount:.2f} (shared with {num_leaders} leaders, total: €{total_item_price:.2f})")
+                else:
+                    lines.append(f"  {item_name}: €{amount:.2f}")
+        else:
+            lines.append("  No PA expenses")
+        lines.append(f"Total PA Expenses: €{leader.total_pa_expenses:.2f}")
+        lines.append("")
+        return "\n".join(lines) + "\n"
+
+    def _build_poef(self, leader: Leader) -> str:
+        """Build the POEF expense lines."""
+        lines = [
+            "POEF EXPENSES:",
+            "-" * 20,
+            f"  Drinks: {leader.poef_drink_count} × €{POEF_DRINK_PRICE:.2f} = €{leader.poef_drink_count * POEF_DRINK_PRICE:.2f}",
+            f"  Cigarettes: {leader.poef_cigarette_count} × €{POEF_CIGARETTE_PRICE:.2f} = €{leader.poef_cigarette_count * POEF_CIGARETTE_PRICE:.2f}",
+            f"Total POEF Expenses: €{leader.get_poef_total():.2f}",
+            "",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _build_overall(self, leader: Leader) -> str:
+        """Build the overall totals."""
+        lines = [
+            "OVERALL SUMMARY:",
+            "-" * 20,
+            f"PA Expenses: €{leader.total_pa_expenses:.2f}",
+            f"POEF Expenses: €{leader.get_poef_total():.2f}",
+            f"Grand Total: €{leader.get_total_expenses():.2f}",
+            "",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _build_payment(self, leader: Leader) -> str:
+        """Build the payment information."""
+        lines = [
+            "PAYMENT INFORMATION:",
+            "-" * 20,
+            f"Amount Already Paid: €{leader.paid_amount:.2f}",
+            f"Remaining to Pay: €{leader.get_remaining_to_pay():.2f}",
+        ]
+        return "\n".join(lines)
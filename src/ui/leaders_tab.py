@@ -2,14 +2,30 @@
 Leaders tab for Kamp Finances application.
 """
 
+import queue
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox
 from typing import List, Dict, Optional
 from datetime import datetime
 
 from models.leader import Leader, POEF_DRINK_PRICE, POEF_CIGARETTE_PRICE
-from models.expense import ExpenseCategory
 from .base_components import BaseTab, DataTable, FormDialog, ActionButton
+from .leader_summary import LeaderSummaryCache
+from utils import mem_profile
+from utils.lazy_import import lazy_import
+from utils.perf import timed
+
+# Only needed when exporting
+filedialog = lazy_import("tkinter.filedialog")
+statement_service = lazy_import("services.statement_service")
+
+# Idle time after the last tally click before changes are saved in one batch
+TALLY_COMMIT_DELAY_MS = 800
+
+# How often the batch statement export reports progress to the status bar
+EXPORT_POLL_INTERVAL_MS = 100
 
 class LeaderFormDialog(FormDialog):
     """Dialog for adding/editing leaders."""
@@ -37,6 +53,13 @@ class LeadersTab(BaseTab):
     
     def __init__(self, parent, main_window):
         self.selected_leader = None
+        self.pending_tally_changes = 0
+        self._tally_commit_job = None
+        self.summary_cache = LeaderSummaryCache(main_window)
+        self._summary_leader_id = None
+        self._summary_sections = {}
+        self._export_thread = None
+        self._export_queue = None
         super().__init__(parent, main_window)
     
     def create_widgets(self):
@@ -222,6 +245,17 @@ class LeadersTab(BaseTab):
         self.cigarettes_total_label = ttk.Label(poef_controls_frame, text="€0.00")
         self.cigarettes_total_label.grid(row=2, column=3, sticky=tk.W, pady=5)
         
+        # Tally mode: clicks are saved in one batch once clicking stops
+        tally_frame = ttk.Frame(poef_frame)
+        tally_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        self.tally_mode_var = tk.BooleanVar(value=False)
+        tally_check = ttk.Checkbutton(tally_frame, text="Tally mode (save after clicking stops)", variable=self.tally_mode_var, command=self.on_tally_mode_toggled)
+        tally_check.pack(side=tk.LEFT)
+        
+        self.pending_changes_label = ttk.Label(tally_frame, text="", foreground="orange")
+        self.pending_changes_label.pack(side=tk.RIGHT)
+        
         # Detailed Summary section
         detailed_summary_frame = ttk.LabelFrame(self.leader_info_frame, text="Detailed Summary")
         detailed_summary_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
@@ -246,57 +280,34 @@ class LeadersTab(BaseTab):
         export_txt_button.pack(side=tk.LEFT, padx=(0, 5))
         
         export_csv_button = ttk.Button(export_frame, text="Export to CSV", command=self.export_leader_summary_csv)
-        export_csv_button.pack(side=tk.LEFT)
+        export_csv_button.pack(side=tk.LEFT, padx=(0, 5))
+        
+        export_all_button = ttk.Button(export_frame, text="Export All Statements", command=self.export_all_statements)
+        export_all_button.pack(side=tk.LEFT)
     
     def refresh_data(self):
         """Refresh the leaders data display."""
-        leaders = self.main_window.get_leaders()
-        
-        # Clear table
-        self.leaders_table.clear_data()
-        
-        # Add leaders to table
-        for leader in leaders:
-            pa_expenses = leader.total_pa_expenses
-            poef_total = leader.get_poef_total()
-            total = leader.get_total_expenses()
-            
-            self.leaders_table.add_row([
-                leader.name,
-                f"€{total:.2f}"
-            ], tags=[str(leader.id)])
+        self.leaders_table.stream_rows(self.iter_leader_rows())
+    
+    def iter_leader_rows(self):
+        """Yield table rows for all leaders."""
+        for leader in self.main_window.get_leaders():
+            yield ([leader.name, f"€{leader.get_total_expenses():.2f}"], [str(leader.id)])
     
     def refresh_data_preserve_selection(self, leader_id_to_select=None):
         """Refresh the leaders data display while preserving selection."""
-        leaders = self.main_window.get_leaders()
-        
-        # Clear table
-        self.leaders_table.clear_data()
+        def restore_selection():
+            # Select the row of the specified leader once all rows are rendered
+            if leader_id_to_select and self.leaders_table.select_by_tag(leader_id_to_select):
+                self.selected_leader = self.main_window.get_leader_by_id(leader_id_to_select)
         
-        # Add leaders to table
-        for leader in leaders:
-            pa_expenses = leader.total_pa_expenses
-            poef_total = leader.get_poef_total()
-            total = leader.get_total_expenses()
-            
-            self.leaders_table.add_row([
-                leader.name,
-                f"€{total:.2f}"
-            ], tags=[str(leader.id)])
-        
-        # Restore selection if specified
-        if leader_id_to_select:
-            # Find the row with the specified leader ID and select it
-            for i, leader in enumerate(leaders):
-                if leader.id == leader_id_to_select:
-                    # Select the corresponding row in the table
-                    self.leaders_table.tree.selection_set(self.leaders_table.tree.get_children()[i])
-                    # Update the selected leader
-                    self.selected_leader = leader
-                    break
+        self.leaders_table.stream_rows(self.iter_leader_rows(), on_complete=restore_selection)
     
     def on_leader_selected(self, event):
         """Handle leader selection."""
+        # Save tally clicks for the previous leader before switching
+        self.flush_pending_changes()
+        
         item = self.leaders_table.get_selected_item()
         if item:
             # Get leader ID from tags
@@ -338,6 +349,13 @@ class LeadersTab(BaseTab):
         self.drinks_entry.bind('<Return>', self.on_poef_entry_change)
         self.cigarettes_entry.bind('<Return>', self.on_poef_entry_change)
         
+        self.update_summary_labels()
+        
+        # Populate detailed summary
+        self.populate_detailed_summary()
+    
+    def update_summary_labels(self):
+        """Update the summary, payment and POEF total labels of the selected leader."""
         self.leader_name_label.config(text=f"Name: {self.selected_leader.name}")
         self.pa_expenses_label.config(text=f"PA Expenses: €{self.selected_leader.total_pa_expenses:.2f}")
         self.poef_total_label.config(text=f"POEF Total: €{self.selected_leader.get_poef_total():.2f}")
@@ -351,9 +369,6 @@ class LeadersTab(BaseTab):
         # Update POEF totals
         self.drinks_total_label.config(text=f"€{self.selected_leader.poef_drink_count * POEF_DRINK_PRICE:.2f}")
         self.cigarettes_total_label.config(text=f"€{self.selected_leader.poef_cigarette_count * POEF_CIGARETTE_PRICE:.2f}")
-        
-        # Populate detailed summary
-        self.populate_detailed_summary()
     
     def on_poef_entry_change(self, event):
         """Handle POEF entry field changes for auto-save."""
@@ -394,97 +409,55 @@ class LeadersTab(BaseTab):
             self.drinks_var.set(str(self.selected_leader.poef_drink_count))
             self.cigarettes_var.set(str(self.selected_leader.poef_cigarette_count))
     
+    @timed()
     def populate_detailed_summary(self):
-        """Populate the detailed summary text widget."""
+        """Populate the detailed summary text widget, replacing only the sections that changed."""
         if not self.selected_leader:
             return
         
+        sections = self.summary_cache.get_sections(self.selected_leader)
+        
         # Enable text widget for editing
         self.summary_text.config(state=tk.NORMAL)
-        self.summary_text.delete("1.0", tk.END)
-        
-        # Generate detailed summary
-        summary_lines = []
-        summary_lines.append(f"LEADER SUMMARY - {self.selected_leader.name}")
-        summary_lines.append("=" * 50)
-        summary_lines.append(f"Report Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        summary_lines.append("")
-        
-        # PA Expenses
-        summary_lines.append("PA EXPENSES:")
-        summary_lines.append("-" * 20)
-        if self.selected_leader.pa_purchases:
-            for purchase_id, amount in self.selected_leader.pa_purchases.items():
-                # Try to find the item name
-                item_name = self.get_pa_item_name(purchase_id)
-                # Get the total price of the item to show sharing info
-                total_item_price = self.get_pa_item_total_price(purchase_id)
-                num_leaders = self.get_pa_item_leader_count(purchase_id)
-                
-                if num_leaders > 1:
-                    summary_lines.append(f"  {item_name}: €{amount:.2f} (shared with {num_leaders} leaders, total: €{total_item_price:.2f})")
-                else:
-                    summary_lines.append(f"  {item_name}: €{amount:.2f}")
-        else:
-            summary_lines.append("  No PA expenses")
-        summary_lines.append(f"Total PA Expenses: €{self.selected_leader.total_pa_expenses:.2f}")
-        summary_lines.append("")
-        
-        # POEF Expenses
-        summary_lines.append("POEF EXPENSES:")
-        summary_lines.append("-" * 20)
-        summary_lines.append(f"  Drinks: {self.selected_leader.poef_drink_count} × €{POEF_DRINK_PRICE:.2f} = €{self.selected_leader.poef_drink_count * POEF_DRINK_PRICE:.2f}")
-        summary_lines.append(f"  Cigarettes: {self.selected_leader.poef_cigarette_count} × €{POEF_CIGARETTE_PRICE:.2f} = €{self.selected_leader.poef_cigarette_count * POEF_CIGARETTE_PRICE:.2f}")
-        summary_lines.append(f"Total POEF Expenses: €{self.selected_leader.get_poef_total():.2f}")
-        summary_lines.append("")
-        
-        # Overall Summary
-        summary_lines.append("OVERALL SUMMARY:")
-        summary_lines.append("-" * 20)
-        summary_lines.append(f"PA Expenses: €{self.selected_leader.total_pa_expenses:.2f}")
-        summary_lines.append(f"POEF Expenses: €{self.selected_leader.get_poef_total():.2f}")
-        summary_lines.append(f"Grand Total: €{self.selected_leader.get_total_expenses():.2f}")
-        summary_lines.append("")
-        
-        # Payment Information
-        summary_lines.append("PAYMENT INFORMATION:")
-        summary_lines.append("-" * 20)
-        summary_lines.append(f"Amount Already Paid: €{self.selected_leader.paid_amount:.2f}")
-        remaining = self.selected_leader.get_remaining_to_pay()
-        summary_lines.append(f"Remaining to Pay: €{remaining:.2f}")
         
-        # Insert the summary text
-        self.summary_text.insert("1.0", "\n".join(summary_lines))
+        if self._summary_leader_id == self.selected_leader.id:
+            # Same leader: swap only the sections whose text changed
+            for name, text in sections:
+                if self._summary_sections.get(name) is text:
+                    continue
+                tag = f"section_{name}"
+                ranges = self.summary_text.tag_ranges(tag)
+                if not ranges:
+                    self._summary_leader_id = None
+                    break
+                self.summary_text.delete(ranges[0], ranges[1])
+                self.summary_text.insert(ranges[0], text, tag)
+        
+        if self._summary_leader_id != self.selected_leader.id:
+            # Different leader: write all sections, each under its own tag
+            self.summary_text.delete("1.0", tk.END)
+            for name, text in sections:
+                self.summary_text.insert(tk.END, text, f"section_{name}")
+        
+        self._summary_leader_id = self.selected_leader.id
+        self._summary_sections = dict(sections)
         
         # Disable text widget for read-only
         self.summary_text.config(state=tk.DISABLED)
     
     def get_pa_item_name(self, item_id: str) -> str:
         """Get the name of a PA item by its ID."""
-        receipts = self.main_window.get_receipts()
-        for receipt in receipts:
-            for item in receipt.items:
-                if item.id == item_id and item.category == ExpenseCategory.PA:
-                    return item.name
-        return f"Unknown Item ({item_id})"
+        item = self.main_window.get_pa_item_lookup().get(item_id)
+        return item.name if item else f"Unknown Item ({item_id})"
     
     def get_pa_item_total_price(self, item_id: str) -> float:
         """Get the total price of a PA item by its ID."""
-        receipts = self.main_window.get_receipts()
-        for receipt in receipts:
-            for item in receipt.items:
-                if item.id == item_id and item.category == ExpenseCategory.PA:
-                    return item.get_total_price()
-        return 0.0
+        item = self.main_window.get_pa_item_lookup().get(item_id)
+        return item.get_total_price() if item else 0.0
     
     def get_pa_item_leader_count(self, item_id: str) -> int:
         """Get the number of leaders sharing a PA item by its ID."""
-        leaders = self.main_window.get_leaders()
-        count = 0
-        for leader in leaders:
-            if leader.has_pa_purchase(item_id):
-                count += 1
-        return count
+        return self.main_window.pa_index.get_leader_count(item_id)
     
     def show_no_selection(self):
         """Show no selection message."""
@@ -515,6 +488,8 @@ class LeadersTab(BaseTab):
             data = dialog.result
             self.selected_leader.name = data["name"]
             
+            # Leader names appear in the cached PA assignment texts
+            self.main_window.rebuild_pa_index()
             self.main_window.save_data()
             self.refresh_data()
     
@@ -528,6 +503,7 @@ class LeadersTab(BaseTab):
         if not self.show_confirm(f"Are you sure you want to remove leader '{leader_name}'?\n\nThis will also remove all their PA expenses and POEF counts."):
             return
         
+        self.summary_cache.forget(self.selected_leader.id)
         self.main_window.remove_leader(self.selected_leader.id)
         self.selected_leader = None
         
@@ -563,92 +539,84 @@ class LeadersTab(BaseTab):
     
     def increment_poef_count(self, count_type):
         """Increment POEF count for the specified type."""
-        if not self.selected_leader:
-            return
-        
-        # Store current selection
-        selected_leader_id = self.selected_leader.id
-        
-        try:
-            if count_type == "drinks":
-                current_value = int(self.drinks_var.get())
-                new_value = current_value + 1
-                self.drinks_var.set(str(new_value))
-                self.drinks_total_label.config(text=f"€{new_value * POEF_DRINK_PRICE:.2f}")
-                self.selected_leader.poef_drink_count = new_value
-            elif count_type == "cigarettes":
-                current_value = int(self.cigarettes_var.get())
-                new_value = current_value + 1
-                self.cigarettes_var.set(str(new_value))
-                self.cigarettes_total_label.config(text=f"€{new_value * POEF_CIGARETTE_PRICE:.2f}")
-                self.selected_leader.poef_cigarette_count = new_value
-            
-            # Auto-save the changes
-            self.main_window.save_data()
-            self.refresh_data_preserve_selection(selected_leader_id)
-            self.populate_detailed_summary()
-            
-        except ValueError:
-            # If the current value is not a valid number, set it to 1
-            if count_type == "drinks":
-                self.drinks_var.set("1")
-                self.drinks_total_label.config(text=f"€{POEF_DRINK_PRICE:.2f}")
-                self.selected_leader.poef_drink_count = 1
-            elif count_type == "cigarettes":
-                self.cigarettes_var.set("1")
-                self.cigarettes_total_label.config(text=f"€{POEF_CIGARETTE_PRICE:.2f}")
-                self.selected_leader.poef_cigarette_count = 1
-            
-            # Auto-save the changes
-            self.main_window.save_data()
-            self.refresh_data_preserve_selection(selected_leader_id)
-            self.populate_detailed_summary()
+        self.change_poef_count(count_type, 1)
     
     def decrement_poef_count(self, count_type):
         """Decrement POEF count for the specified type."""
+        self.change_poef_count(count_type, -1)
+    
+    def change_poef_count(self, count_type, delta: int):
+        """Add delta to the drinks or cigarettes count of the selected leader."""
         if not self.selected_leader:
             return
         
-        # Store current selection
-        selected_leader_id = self.selected_leader.id
+        if count_type == "drinks":
+            count_var, total_label, price = self.drinks_var, self.drinks_total_label, POEF_DRINK_PRICE
+        elif count_type == "cigarettes":
+            count_var, total_label, price = self.cigarettes_var, self.cigarettes_total_label, POEF_CIGARETTE_PRICE
+        else:
+            return
         
         try:
-            if count_type == "drinks":
-                current_value = int(self.drinks_var.get())
-                if current_value > 0:
-                    new_value = current_value - 1
-                    self.drinks_var.set(str(new_value))
-                    self.drinks_total_label.config(text=f"€{new_value * POEF_DRINK_PRICE:.2f}")
-                    self.selected_leader.poef_drink_count = new_value
-            elif count_type == "cigarettes":
-                current_value = int(self.cigarettes_var.get())
-                if current_value > 0:
-                    new_value = current_value - 1
-                    self.cigarettes_var.set(str(new_value))
-                    self.cigarettes_total_label.config(text=f"€{new_value * POEF_CIGARETTE_PRICE:.2f}")
-                    self.selected_leader.poef_cigarette_count = new_value
-            
-            # Auto-save the changes
-            self.main_window.save_data()
-            self.refresh_data_preserve_selection(selected_leader_id)
-            self.populate_detailed_summary()
-            
+            new_value = max(int(count_var.get()) + delta, 0)
         except ValueError:
-            # If the current value is not a valid number, set it to 0
-            if count_type == "drinks":
-                self.drinks_var.set("0")
-                self.drinks_total_label.config(text="€0.00")
-                self.selected_leader.poef_drink_count = 0
-            elif count_type == "cigarettes":
-                self.cigarettes_var.set("0")
-                self.cigarettes_total_label.config(text="€0.00")
-                self.selected_leader.poef_cigarette_count = 0
-            
+            # If the current value is not a valid number, start over from the click
+            new_value = max(delta, 0)
+        
+        count_var.set(str(new_value))
+        total_label.config(text=f"€{new_value * price:.2f}")
+        if count_type == "drinks":
+            self.selected_leader.poef_drink_count = new_value
+        else:
+            self.selected_leader.poef_cigarette_count = new_value
+        
+        if self.tally_mode_var.get():
+            self.record_tally_change()
+        else:
             # Auto-save the changes
             self.main_window.save_data()
-            self.refresh_data_preserve_selection(selected_leader_id)
+            self.refresh_data_preserve_selection(self.selected_leader.id)
             self.populate_detailed_summary()
     
+    def record_tally_change(self):
+        """Show a tally click immediately and postpone saving until clicking stops."""
+        leader = self.selected_leader
+        
+        # Update the visible row and totals only
+        for row_id in self.leaders_table.tree.tag_has(str(leader.id)):
+            self.leaders_table.tree.item(row_id, values=[leader.name, f"€{leader.get_total_expenses():.2f}"])
+        self.update_summary_labels()
+        
+        self.pending_tally_changes += 1
+        self.pending_changes_label.config(text=f"● {self.pending_tally_changes} unsaved change(s)")
+        
+        # Restart the idle timer
+        if self._tally_commit_job is not None:
+            self.after_cancel(self._tally_commit_job)
+        self._tally_commit_job = self.after(TALLY_COMMIT_DELAY_MS, self.commit_tally_changes)
+    
+    def commit_tally_changes(self):
+        """Save all pending tally clicks in one batch and regenerate the summary."""
+        self._tally_commit_job = None
+        if not self.pending_tally_changes:
+            return
+        
+        self.pending_tally_changes = 0
+        self.pending_changes_label.config(text="")
+        self.main_window.save_data_async()
+        self.populate_detailed_summary()
+    
+    def flush_pending_changes(self):
+        """Commit pending tally clicks right away."""
+        if self._tally_commit_job is not None:
+            self.after_cancel(self._tally_commit_job)
+        self.commit_tally_changes()
+    
+    def on_tally_mode_toggled(self):
+        """Save pending clicks when tally mode is switched off."""
+        if not self.tally_mode_var.get():
+            self.flush_pending_changes()
+    
     def generate_leader_report(self):
         """Generate a detailed report for the selected leader."""
         if not self.selected_leader:
@@ -745,51 +713,102 @@ class LeadersTab(BaseTab):
 
     def export_leader_summary_txt(self):
         """Export the leader summary to a TXT file."""
+        self.export_leader_statement("txt", "Text files")
+
+    def export_leader_summary_csv(self):
+        """Export the leader summary to a CSV file."""
+        self.export_leader_statement("csv", "CSV files")
+
+    def export_leader_statement(self, fmt: str, file_type: str):
+        """Export the selected leader's statement in the given format."""
         if not self.selected_leader:
             self.show_error("Please select a leader first")
             return
         
-        filename = f"leader_summary_{self.selected_leader.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        filename = f"leader_summary_{self.selected_leader.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
         filepath = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text files", "*.txt")],
-            initialname=filename
+            defaultextension=f".{fmt}",
+            filetypes=[(file_type, f"*.{fmt}")],
+            initialfile=filename
         )
         
         if filepath:
             try:
-                summary_text = self.summary_text.get("1.0", tk.END)
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(summary_text)
+                snapshot = statement_service.build_snapshot(self.main_window.get_leaders(), self.main_window.get_receipts())
+                content = statement_service.render_statement(snapshot, self.selected_leader.id, fmt)
+                with open(filepath, 'w', encoding='utf-8', newline='') as f:
+                    f.write(content)
                 
                 self.show_info(f"Leader summary exported to {filepath}")
                 
             except Exception as e:
                 self.show_error(f"Error exporting summary: {str(e)}")
 
-    def export_leader_summary_csv(self):
-        """Export the leader summary to a CSV file."""
-        if not self.selected_leader:
-            self.show_error("Please select a leader first")
+    def export_all_statements(self):
+        """Export TXT, CSV and HTML statements for every leader in the background."""
+        if self._export_thread and self._export_thread.is_alive():
+            self.show_error("An export is already running")
+            return
+        if not self.main_window.get_leaders():
+            self.show_error("No leaders to export")
             return
         
-        filename = f"leader_summary_{self.selected_leader.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        filepath = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv")],
-            initialname=filename
-        )
+        as_zip = messagebox.askyesno("Export All Statements", "Bundle all statements in a single zip file?\n\nChoose 'No' to write them into a new folder.")
+        if as_zip:
+            destination = filedialog.asksaveasfilename(
+                defaultextension=".zip",
+                filetypes=[("Zip files", "*.zip")],
+                initialfile=f"leader_statements_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+            )
+        else:
+            destination = filedialog.askdirectory(title="Select folder for the statements")
+        if not destination:
+            return
         
-        if filepath:
-            try:
-                summary_text = self.summary_text.get("1.0", tk.END)
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(summary_text)
-                
-                self.show_info(f"Leader summary exported to {filepath}")
-                
-            except Exception as e:
-                self.show_error(f"Error exporting summary: {str(e)}")
+        # Snapshot on the main thread so the export never sees half-edited data
+        snapshot = statement_service.build_snapshot(self.main_window.get_leaders(), self.main_window.get_receipts())
+        self._export_queue = queue.Queue()
+        self._export_thread = threading.Thread(
+            target=self._export_statements_worker,
+            args=(snapshot, destination, as_zip),
+            daemon=True
+        )
+        self._export_thread.start()
+        self.main_window.status_label.config(text=f"Exporting statements: 0/{len(snapshot['leaders'])}")
+        self.after(EXPORT_POLL_INTERVAL_MS, self._poll_export_queue)
+
+    def _export_statements_worker(self, snapshot, destination: str, as_zip: bool):
+        """Run the batch export off the main thread and report through the queue."""
+        try:
+            start = time.perf_counter()
+            path = statement_service.export_statements(
+                snapshot, destination, as_zip=as_zip,
+                progress=lambda done, total: self._export_queue.put(("progress", (done, total)))
+            )
+            self._export_queue.put(("done", (path, time.perf_counter() - start)))
+        except Exception as e:
+            self._export_queue.put(("error", str(e)))
+
+    def _poll_export_queue(self):
+        """Show export progress in the status bar until the export finishes."""
+        try:
+            while True:
+                kind, payload = self._export_queue.get_nowait()
+                if kind == "progress":
+                    self.main_window.status_label.config(text=f"Exporting statements: {payload[0]}/{payload[1]}")
+                elif kind == "done":
+                    path, elapsed = payload
+                    self.main_window.status_label.config(text=f"Statements exported ({elapsed:.1f} s)")
+                    mem_profile.checkpoint("export statements", self.main_window)
+                    self.show_info(f"Statements exported to {path}")
+                    return
+                elif kind == "error":
+                    self.main_window.status_label.config(text="Failed to export statements")
+                    self.show_error(f"Error exporting statements: {payload}")
+                    return
+        except queue.Empty:
+            pass
+        self.after(EXPORT_POLL_INTERVAL_MS, self._poll_export_queue)
 
     def on_paid_amount_change(self, event):
         """Handle paid amount entry changes for auto-save."""
@@ -3,49 +3,176 @@ New main window for Kamp Finances application with modular tab system.
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox
 from typing import List, Optional
+from datetime import datetime
+import importlib
 import os
+import queue
+import threading
+import time
 
 from models.leader import Leader
 from models.receipt import Receipt
-from services.data_service import DataService
+from models.expense import ExpenseCategory
+from services.camp_registry import CampRegistry
+from services.data_service import (
+    DataService, ChangeMonitor, SHUTDOWN_MAINTENANCE_BUDGET_SECONDS, format_maintenance_report
+)
 from services.finance_service import FinanceService
-from .leaders_tab import LeadersTab
-from .receipts_tab import ReceiptsTab
-from .pa_tab import PAItemsTab
-from .poef_tab import POEFTab
+from services.pa_index import PAAssignmentIndex
+from utils import mem_profile, perf
+from utils.lazy_import import lazy_import
+from .background_jobs import BackgroundJobScheduler, IdleTracker
+from .base_components import FormDialog
+
+# Only needed when exporting
+filedialog = lazy_import("tkinter.filedialog")
+export_service = lazy_import("services.export_service")
+xlsx_service = lazy_import("services.xlsx_service")
+backup_service = lazy_import("services.backup_service")
+sync_service = lazy_import("services.sync_service")
+archive_service = lazy_import("services.archive_service")
+integrity_service = lazy_import("services.integrity_service")
+
+# How often the Tk thread checks the background loader for results
+LOAD_POLL_INTERVAL_MS = 50
+
+# How often the database is checked for changes made by other programs
+DATA_VERSION_POLL_MS = 2000
+
+# Delay between building tabs in the background when prewarming
+PREWARM_DELAY_MS = 200
+
+# How often the status bar shows the slowest timings while instrumentation is on
+PERF_STATUS_INTERVAL_MS = 2000
+
+# Maintenance runs after this long without keyboard or mouse input, at most once per interval
+MAINTENANCE_IDLE_MINUTES = 5
+MAINTENANCE_INTERVAL_HOURS = 6
+MAINTENANCE_CHECK_INTERVAL_MS = 60 * 1000
+
+# Problems listed by name in the Check Data dialog, the rest are counted
+INTEGRITY_ISSUES_SHOWN = 10
+
+# CSV export options: label shown in the dialog -> value
+CSV_DELIMITERS = {"Comma (,)": ",", "Semicolon (;)": ";", "Tab": "\t"}
+CSV_DECIMALS = {"Point (1.50)": False, "Comma (1,50)": True}
+
+class ExportOptionsDialog(FormDialog):
+    """Dialog for choosing the CSV delimiter and decimal separator."""
+    
+    def __init__(self, parent):
+        fields = [
+            {"name": "delimiter", "label": "Delimiter:", "type": "combobox", "values": list(CSV_DELIMITERS)},
+            {"name": "decimal", "label": "Decimal separator:", "type": "combobox", "values": list(CSV_DECIMALS)},
+        ]
+        
+        super().__init__(parent, "Export CSV", fields)
+        
+        # Belgian Excel expects semicolons and decimal commas
+        self.field_widgets["delimiter"].set("Semicolon (;)")
+        self.field_widgets["decimal"].set("Comma (1,50)")
+    
+    def validate_form(self) -> bool:
+        """Validate the form data."""
+        if self.get_field_value("delimiter") == "Comma (,)" and CSV_DECIMALS.get(self.get_field_value("decimal")):
+            messagebox.showerror("Error", "A decimal comma needs a semicolon or tab delimiter")
+            return False
+        return True
+
+class NewCampDialog(FormDialog):
+    """Dialog for registering a new camp."""
+    
+    def __init__(self, parent):
+        fields = [
+            {"name": "name", "label": "Camp Name:", "type": "entry"},
+            {"name": "start_date", "label": "First Day (YYYY-MM-DD):", "type": "entry"},
+            {"name": "end_date", "label": "Last Day (YYYY-MM-DD):", "type": "entry"},
+        ]
+        
+        super().__init__(parent, "New Camp", fields)
+    
+    def validate_form(self) -> bool:
+        """Validate the form data."""
+        if not self.get_field_value("name").strip():
+            messagebox.showerror("Error", "Camp name is required")
+            return False
+        for field in ("start_date", "end_date"):
+            value = self.get_field_value(field).strip()
+            if value:
+                try:
+                    datetime.strptime(value, "%Y-%m-%d")
+                except ValueError:
+                    messagebox.showerror("Error", f"Invalid date: {value}")
+                    return False
+        return True
 
 class MainWindow(tk.Tk):
     """Main application window with modular tab system."""
     
-    def __init__(self):
+    def __init__(self, import_time: float = 0.0, prewarm: bool = False):
+        self._startup_start = time.perf_counter()
         super().__init__()
         
-        # Initialize services
-        self.data_service = DataService()
+        # Startup time breakdown in seconds: import, widget build, DB load, first paint
+        self.startup_timings = {"import": import_time}
+        self.data_loaded = False
+        self.prewarm = prewarm
+        self._load_queue = None
+        self._save_thread = None
+        self._save_requested = False
+        self._save_error = None
+        self._export_thread = None
+        self._export_result = None
+        self.backup_scheduler = None
+        self.maintenance_scheduler = None
+        self.idle_tracker = IdleTracker(self)
+        self.change_monitor = None
+        
+        # Initialize services for the camp that was open last
+        self.camp_registry = CampRegistry()
+        self.camp = self.camp_registry.get_active()
+        self.data_service = DataService(self.camp.data_dir)
         self.finance_service = FinanceService(self.data_service)
+        self.pa_index = PAAssignmentIndex()
+        
+        # Bumped whenever receipts or their items change, see mark_receipts_changed()
+        self.receipts_version = 0
+        self._pa_item_lookup = {}
+        self._pa_item_lookup_version = -1
         
         # Setup window
         self.setup_window()
         self.create_widgets()
         self.apply_styles()
+        self.startup_timings["widget_build"] = time.perf_counter() - self._startup_start
         
-        # Load data after UI is created
-        self.load_data()
+        # Flush pending edits and background saves before closing
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         
-        # Refresh all tabs
-        self.refresh_all_tabs()
+        # Hidden performance panel
+        self.bind("<Control-Shift-P>", self.show_performance_tab)
+        self._perf_status_job = None
+        self.update_perf_status()
+        
+        # Show the window right away and load data on a worker thread
+        self._first_paint_binding = self.bind("<Expose>", self._on_first_paint, add="+")
+        self.load_data_async()
     
     def setup_window(self):
         """Setup the main window properties."""
-        self.title("Kamp Finances - New UI")
+        self.update_title()
         self.geometry("1200x800")
         self.minsize(800, 600)
         
         # Center window
         self.center_window()
     
+    def update_title(self):
+        """Show the open camp in the window title."""
+        self.title(f"Kamp Finances - {self.camp.name}")
+    
     def center_window(self):
         """Center the window on the screen."""
         self.update_idletasks()
@@ -55,6 +182,9 @@ class MainWindow(tk.Tk):
     
     def create_widgets(self):
         """Create the main window widgets."""
+        # Menu bar
+        self.create_menu()
+        
         # Main container
         main_container = ttk.Frame(self)
         main_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -73,27 +203,193 @@ class MainWindow(tk.Tk):
         # Status bar
         self.create_status_bar(main_container)
     
-    def create_tabs(self):
-        """Create all the application tabs."""
-        # Leaders tab
-        self.leaders_tab = LeadersTab(self.notebook, self)
-        self.notebook.add(self.leaders_tab, text="Leaders")
+    def create_menu(self):
+        """Create the menu bar."""
+        menubar = tk.Menu(self)
         
-        # Receipts tab
-        self.receipts_tab = ReceiptsTab(self.notebook, self)
-        self.notebook.add(self.receipts_tab, text="Receipts")
+        self.file_menu = tk.Menu(menubar, tearoff=0)
+        self.file_menu.add_command(label="Export CSV...", command=self.export_summary)
+        self.file_menu.add_command(label="Export Excel...", command=self.export_workbook)
+        self.file_menu.add_separator()
+        self.file_menu.add_command(label="Back Up Now", command=self.backup_now)
+        self.file_menu.add_command(label="Restore Backup...", command=self.restore_backup)
+        self.file_menu.add_command(label="Optimize Database", command=self.run_maintenance_now)
+        self.file_menu.add_command(label="Check Data...", command=self.check_data_integrity)
+        self.file_menu.add_separator()
+        self.file_menu.add_command(label="Export Changes...", command=self.export_changeset)
+        self.file_menu.add_command(label="Import Changes...", command=self.import_changeset)
+        self.file_menu.add_command(label="Sync Conflicts...", command=self.resolve_sync_conflicts)
+        self.file_menu.add_separator()
+        self.file_menu.add_command(label="Exit", command=self.on_close)
+        menubar.add_cascade(label="File", menu=self.file_menu)
         
-        # PA Items tab
-        self.pa_items_tab = PAItemsTab(self.notebook, self)
-        self.notebook.add(self.pa_items_tab, text="PA Items")
+        # Rebuilt every time it opens, so new camps show up
+        self.camp_menu = tk.Menu(menubar, tearoff=0, postcommand=self.build_camp_menu)
+        self.camp_var = tk.StringVar(value=self.camp.id)
+        menubar.add_cascade(label="Camp", menu=self.camp_menu)
         
-        # POEF tab
-        self.poef_tab = POEFTab(self.notebook, self)
-        self.notebook.add(self.poef_tab, text="POEF")
+        self.config(menu=menubar)
+    
+    def build_camp_menu(self):
+        """List the camps to switch between, with the camp-wide actions below."""
+        self.camp_menu.delete(0, tk.END)
+        for camp in self.camp_registry.list_camps():
+            label = f"{camp.name} (archived)" if camp.status == "archived" else camp.name
+            self.camp_menu.add_radiobutton(label=label, value=camp.id, variable=self.camp_var,
+                                           command=lambda camp_id=camp.id: self.switch_camp(camp_id))
+        self.camp_menu.add_separator()
+        self.camp_menu.add_command(label="New Camp...", command=self.new_camp)
+        self.camp_menu.add_command(label="All Camps", command=self.show_camps_tab)
+    
+    def create_tabs(self):
+        """Register all tabs as placeholders; each tab is built when first selected."""
+        # (attribute name, tab label, "module.Class" in this package) in notebook order;
+        # a tab module is only imported when its tab is built
+        self.tab_specs = [
+            ("leaders_tab", "Leaders", "leaders_tab.LeadersTab"),
+            ("receipts_tab", "Receipts", "receipts_tab.ReceiptsTab"),
+            ("pa_items_tab", "PA Items", "pa_tab.PAItemsTab"),
+            ("poef_tab", "POEF", "poef_tab.POEFTab"),
+        ]
+        self._tab_placeholders = {}
+        
+        for attr, label, tab_class_path in self.tab_specs:
+            setattr(self, attr, None)
+            placeholder = ttk.Frame(self.notebook)
+            self.notebook.add(placeholder, text=label)
+            self._tab_placeholders[str(placeholder)] = (attr, tab_class_path, placeholder)
+        
+        # Only the first tab is paid for at startup
+        self.ensure_tab(self.tab_specs[0][0])
         
         # Bind tab change event
         self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
     
+    def ensure_tab(self, attr: str):
+        """Build and populate a tab if it has not been built yet, and return it."""
+        tab = getattr(self, attr, None)
+        if tab is not None:
+            return tab
+        
+        for placeholder_attr, tab_class_path, placeholder in self._tab_placeholders.values():
+            if placeholder_attr == attr:
+                module_name, class_name = tab_class_path.rsplit(".", 1)
+                tab_class = getattr(importlib.import_module(f".{module_name}", __package__), class_name)
+                tab = tab_class(placeholder, self)
+                tab.pack(fill=tk.BOTH, expand=True)
+                setattr(self, attr, tab)
+                tab.refresh_data()
+                return tab
+        return None
+    
+    def add_tab(self, attr: str, label: str, tab_class_path: str):
+        """Register an extra tab after startup and select it."""
+        if getattr(self, attr, None) is None and attr not in [spec[0] for spec in self.tab_specs]:
+            self.tab_specs.append((attr, label, tab_class_path))
+            setattr(self, attr, None)
+            placeholder = ttk.Frame(self.notebook)
+            self.notebook.add(placeholder, text=label)
+            self._tab_placeholders[str(placeholder)] = (attr, tab_class_path, placeholder)
+        
+        for placeholder_attr, _, placeholder in self._tab_placeholders.values():
+            if placeholder_attr == attr:
+                self.notebook.select(placeholder)
+    
+    def show_performance_tab(self, event=None):
+        """Turn on timing instrumentation and show the performance tab."""
+        perf.enable(True)
+        self.add_tab("performance_tab", "Performance", "performance_tab.PerformanceTab")
+        self.update_perf_status()
+    
+    def show_camps_tab(self):
+        """Show the tab with the totals of all camps."""
+        self.add_tab("camps_tab", "All Camps", "camps_tab.CampsTab")
+    
+    def new_camp(self):
+        """Register a new camp and switch to it."""
+        dialog = NewCampDialog(self)
+        self.wait_window(dialog)
+        if not dialog.result:
+            return
+        try:
+            camp = self.camp_registry.create_camp(
+                dialog.result["name"], dialog.result["start_date"].strip(), dialog.result["end_date"].strip()
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to create camp: {str(e)}")
+            return
+        self.switch_camp(camp.id)
+    
+    def switch_camp(self, camp_id: str):
+        """Save the open camp and load another one."""
+        self.camp_var.set(self.camp.id)
+        if camp_id == self.camp.id:
+            return
+        if not self.data_loaded:
+            self.status_label.config(text="Data is still loading, try again in a moment")
+            return
+        
+        try:
+            camp = self.camp_registry.get_camp(camp_id)
+            if camp.status == "archived":
+                if not messagebox.askyesno("Archived Camp", f"{camp.name} is archived.\n\n"
+                                                            "Unarchive it so it can be opened and edited?"):
+                    return
+                self.status_label.config(text=f"Unarchiving {camp.name}...")
+                self.update_idletasks()
+                archive_service.ArchiveService(self.camp_registry).restore_camp(camp_id)
+            camp = self.camp_registry.set_active(camp_id)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open camp: {str(e)}")
+            return
+        
+        # Everything of the current camp is written before its services are replaced
+        for tab in self.get_built_tabs():
+            tab.flush_pending_changes()
+        self.wait_for_background_save()
+        if self.backup_scheduler is not None:
+            self.backup_scheduler.stop()
+            self.backup_scheduler.wait()
+            self.backup_scheduler = None
+        if self.maintenance_scheduler is not None:
+            self.maintenance_scheduler.stop()
+            self.maintenance_scheduler.wait()
+        
+        self.camp = camp
+        self.camp_var.set(self.camp.id)
+        self.data_service = DataService(self.camp.data_dir)
+        self.finance_service = FinanceService(self.data_service)
+        if self.change_monitor is not None:
+            self.change_monitor.close()
+            self.change_monitor = ChangeMonitor(self.data_service.db_path)
+            self.data_service.change_monitor = self.change_monitor
+        self.update_title()
+        self.load_data_async()
+    
+    def get_built_tabs(self) -> List:
+        """Get the tabs whose widgets have been built, in notebook order."""
+        tabs = []
+        for attr, _, _ in self.tab_specs:
+            tab = getattr(self, attr)
+            if tab is not None:
+                tabs.append(tab)
+        return tabs
+    
+    def prewarm_tabs(self):
+        """Build the remaining tabs one at a time while the event loop is idle."""
+        for attr, _, _ in self.tab_specs:
+            if getattr(self, attr) is None:
+                self.after(PREWARM_DELAY_MS, lambda: self.after_idle(self._prewarm_next))
+                return
+    
+    def _prewarm_next(self):
+        """Build the next unbuilt tab and schedule the one after it."""
+        for attr, _, _ in self.tab_specs:
+            if getattr(self, attr) is None:
+                self.ensure_tab(attr)
+                self.prewarm_tabs()
+                return
+    
     def create_status_bar(self, parent):
         """Create the status bar."""
         status_frame = ttk.Frame(parent)
@@ -106,6 +402,10 @@ class MainWindow(tk.Tk):
         # Data info
         self.data_info_label = ttk.Label(status_frame, text="", style="Status.TLabel")
         self.data_info_label.pack(side=tk.RIGHT)
+        
+        # Slowest timings, only shown while instrumentation is on
+        self.perf_label = ttk.Label(status_frame, text="", style="Status.TLabel")
+        self.perf_label.pack(side=tk.RIGHT, padx=(0, 20))
     
     def apply_styles(self):
         """Apply custom styles to the application."""
@@ -129,12 +429,117 @@ class MainWindow(tk.Tk):
             self.data_service.receipts = receipts
             
             self.status_label.config(text="Data loaded successfully")
+            mem_profile.checkpoint("load_data", self)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load data: {str(e)}")
             self.status_label.config(text="Failed to load data")
     
+    def load_data_async(self):
+        """Load leaders and receipts on a worker thread without blocking the UI."""
+        self.data_loaded = False
+        self.set_tabs_busy(True)
+        self.status_label.config(text="Loading data...")
+        self._load_queue = queue.Queue()
+        
+        worker = threading.Thread(target=self._load_data_worker, args=(self._load_queue,), daemon=True)
+        worker.start()
+        self.after(LOAD_POLL_INTERVAL_MS, self._poll_load_queue)
+    
+    def _load_data_worker(self, results: queue.Queue):
+        """Load data from the database and post the results to the Tk thread."""
+        start = time.perf_counter()
+        try:
+            results.put(("progress", "Loading leaders..."))
+            leaders = self.data_service.load_leaders()
+            results.put(("leaders", leaders))
+            
+            results.put(("progress", f"Loaded {len(leaders)} leaders, loading receipts..."))
+            receipts = self.data_service.load_receipts()
+            results.put(("receipts", receipts))
+            
+            results.put(("done", time.perf_counter() - start))
+        except Exception as e:
+            results.put(("error", e))
+    
+    def _poll_load_queue(self):
+        """Apply results posted by the background loader."""
+        while True:
+            try:
+                kind, payload = self._load_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            if kind == "progress":
+                self.status_label.config(text=payload)
+            elif kind == "leaders":
+                self.data_service.leaders = payload
+                self.rebuild_pa_index()
+                if self.leaders_tab is not None:
+                    self.leaders_tab.refresh_data()
+            elif kind == "receipts":
+                self.data_service.receipts = payload
+                self.mark_receipts_changed()
+                for tab in self.get_built_tabs():
+                    if tab is not self.leaders_tab:
+                        tab.refresh_data()
+            elif kind == "done":
+                self.data_loaded = True
+                self.set_tabs_busy(False)
+                self.start_change_monitor()
+                self.start_backup_scheduler()
+                self.start_maintenance_scheduler()
+                if self.prewarm:
+                    self.prewarm_tabs()
+                self.startup_timings["db_load"] = payload
+                self.update_data_info()
+                self.status_label.config(text=f"Data loaded successfully ({payload * 1000:.0f} ms)")
+                print(f"⏱️  Startup: {self.format_startup_timings()}")
+                mem_profile.checkpoint("load_data", self)
+                return
+            elif kind == "error":
+                # The tabs stay busy: edits could not be saved over data that failed to load
+                messagebox.showerror("Error", f"Failed to load data: {str(payload)}")
+                self.status_label.config(text="Failed to load data")
+                return
+        
+        self.after(LOAD_POLL_INTERVAL_MS, self._poll_load_queue)
+    
+    def set_tabs_busy(self, busy: bool):
+        """Block input to the tab contents, e.g. while loading would replace any edits made in them."""
+        # Tab headers stay clickable so the tabs can still be built and looked at
+        for _, _, placeholder in self._tab_placeholders.values():
+            if busy:
+                self.tk.call("tk", "busy", "hold", placeholder)
+            elif self.tk.getboolean(self.tk.call("tk", "busy", "status", placeholder)):
+                self.tk.call("tk", "busy", "forget", placeholder)
+        if busy:
+            # Busy windows only block the mouse; keep key presses away from the entry fields too
+            self.focus_set()
+    
+    def _on_first_paint(self, event):
+        """Record the time until the window was first drawn, on its first Expose event."""
+        self.unbind("<Expose>", self._first_paint_binding)
+        self.startup_timings["first_paint"] = time.perf_counter() - self._startup_start
+    
+    def format_startup_timings(self) -> str:
+        """Format the startup time breakdown for display."""
+        labels = [("import", "Import"), ("widget_build", "Widgets"), ("db_load", "DB load"), ("first_paint", "First paint")]
+        parts = []
+        for key, label in labels:
+            if key in self.startup_timings:
+                parts.append(f"{label}: {self.startup_timings[key] * 1000:.0f} ms")
+        return " | ".join(parts)
+    
     def save_data(self):
         """Save data to files."""
+        # Never write while the initial load is running, it would clobber the database
+        if not self.data_loaded:
+            self.status_label.config(text="Data is still loading, changes not saved yet")
+            return
+        
+        # Let a background save finish first so it cannot overwrite newer data
+        self.wait_for_background_save()
+        
         try:
             leaders = self.get_leaders()
             receipts = self.get_receipts()
@@ -144,14 +549,371 @@ class MainWindow(tk.Tk):
             messagebox.showerror("Error", f"Failed to save data: {str(e)}")
             self.status_label.config(text="Failed to save data")
     
+    def save_data_async(self):
+        """Save data on a background thread; saves requested meanwhile are coalesced."""
+        if not self.data_loaded:
+            self.status_label.config(text="Data is still loading, changes not saved yet")
+            return
+        
+        if self._save_thread is not None and self._save_thread.is_alive():
+            # Save again once the running save finishes
+            self._save_requested = True
+            return
+        
+        self._start_background_save()
+    
+    def _start_background_save(self):
+        """Start a background save of the current leaders and receipts."""
+        self._save_requested = False
+        self._save_error = None
+        leaders = list(self.get_leaders())
+        receipts = list(self.get_receipts())
+        
+        self._save_thread = threading.Thread(target=self._background_save_worker, args=(leaders, receipts), daemon=True)
+        self._save_thread.start()
+        self.status_label.config(text="Saving...")
+        self.after(LOAD_POLL_INTERVAL_MS, self._poll_background_save)
+    
+    def _background_save_worker(self, leaders: List[Leader], receipts: List[Receipt]):
+        """Write data to the database from the worker thread."""
+        try:
+            self.data_service.save_all_data(leaders, receipts)
+        except Exception as e:
+            self._save_error = e
+    
+    def _poll_background_save(self):
+        """Report the result of a background save once it has finished."""
+        if self._save_thread is None:
+            return
+        if self._save_thread.is_alive():
+            self.after(LOAD_POLL_INTERVAL_MS, self._poll_background_save)
+            return
+        
+        self._save_thread = None
+        if isinstance(self._save_error, RuntimeError):
+            # A model changed while it was being written, simply save again
+            self._save_requested = True
+        elif self._save_error is not None:
+            messagebox.showerror("Error", f"Failed to save data: {str(self._save_error)}")
+            self.status_label.config(text="Failed to save data")
+        else:
+            self.status_label.config(text="Data saved successfully")
+        
+        if self._save_requested:
+            self._start_background_save()
+    
+    def wait_for_background_save(self):
+        """Block until a running background save has finished."""
+        if self._save_thread is not None:
+            self._save_thread.join()
+            self._poll_background_save()
+            self.wait_for_background_save()
+    
+    def on_close(self):
+        """Flush pending changes in all tabs and close the window."""
+        for tab in self.get_built_tabs():
+            tab.flush_pending_changes()
+        self.wait_for_background_save()
+        if self.backup_scheduler is not None:
+            self.backup_scheduler.stop()
+            self.backup_scheduler.wait()
+        if self.maintenance_scheduler is not None:
+            self.maintenance_scheduler.stop()
+            self.maintenance_scheduler.wait()
+            # A short pass while nothing else uses the database
+            try:
+                report = self.data_service.run_maintenance(budget_seconds=SHUTDOWN_MAINTENANCE_BUDGET_SECONDS)
+                print(f"🧹 {format_maintenance_report(report)}")
+            except Exception as e:
+                print(f"⚠️  Maintenance on close failed: {e}")
+        if self.change_monitor is not None:
+            self.change_monitor.close()
+        self.destroy()
+    
+    def start_change_monitor(self):
+        """Start watching the database for commits by other programs, or reset after a reload."""
+        if self.change_monitor is None:
+            self.change_monitor = ChangeMonitor(self.data_service.db_path)
+            # Saves report their commits to it, so only other programs' commits trigger a reload
+            self.data_service.change_monitor = self.change_monitor
+            self.after(DATA_VERSION_POLL_MS, self._poll_data_version)
+        else:
+            # The data was just loaded, so earlier changes are included
+            self.change_monitor.has_changed()
+    
+    def _poll_data_version(self):
+        """Reload when another program or app instance changed the database."""
+        self.after(DATA_VERSION_POLL_MS, self._poll_data_version)
+        if not self.data_loaded or self._save_thread is not None:
+            return
+        if self.maintenance_scheduler is not None and self.maintenance_scheduler.is_running():
+            # Its commits are accepted as local once it has finished
+            return
+        
+        # This window's own commits are recorded by the monitor and do not count
+        if not self.change_monitor.has_changed():
+            return
+        
+        # Write our pending edits (only the changed rows) before picking up the other changes
+        for tab in self.get_built_tabs():
+            tab.flush_pending_changes()
+        self.wait_for_background_save()
+        self.load_data_async()
+        self.status_label.config(text="Data changed by another program, reloading...")
+    
+    def start_backup_scheduler(self):
+        """Start automatic compressed backups while the app is open, skipped while nothing changed."""
+        if self.backup_scheduler is None:
+            service = backup_service.BackupService(self.data_service.db_path)
+            self.backup_scheduler = BackgroundJobScheduler(
+                self, service.create_automatic_backup,
+                interval_ms=int(backup_service.AUTO_BACKUP_INTERVAL_MINUTES * 60 * 1000),
+                should_run=service.changed_since_backup,
+                on_done=self._on_backup_done
+            )
+        self.backup_scheduler.start()
+    
+    def start_maintenance_scheduler(self):
+        """Start database maintenance at idle times, or point it at the newly loaded camp."""
+        if self.maintenance_scheduler is None:
+            self.maintenance_scheduler = BackgroundJobScheduler(
+                self, self.data_service.run_maintenance,
+                interval_ms=MAINTENANCE_CHECK_INTERVAL_MS,
+                should_run=self._maintenance_due,
+                on_done=self._on_maintenance_done
+            )
+        self.maintenance_scheduler.job = self.data_service.run_maintenance
+        self.maintenance_scheduler.start()
+    
+    def _maintenance_due(self) -> bool:
+        """Maintenance runs when the user has been idle a while, at most once per interval, never during a load or save."""
+        if self.idle_tracker.idle_seconds() < MAINTENANCE_IDLE_MINUTES * 60:
+            return False
+        last_started = self.maintenance_scheduler.last_started
+        if last_started is not None and time.monotonic() - last_started < MAINTENANCE_INTERVAL_HOURS * 3600:
+            return False
+        return self.data_loaded and self._save_thread is None
+    
+    def run_maintenance_now(self):
+        """Run database maintenance on a worker thread, including the checks that ran recently."""
+        if self.maintenance_scheduler is None or not self.data_loaded:
+            self.status_label.config(text="Data is still loading, try again in a moment")
+            return
+        self.wait_for_background_save()
+        if self.maintenance_scheduler.run_now(force=True):
+            self.status_label.config(text="Optimizing database...")
+    
+    def _on_maintenance_done(self, report: Optional[dict], error: Optional[Exception]):
+        """Report the result of maintenance in the status bar."""
+        if error is not None:
+            self.status_label.config(text=f"Maintenance failed: {error}")
+        else:
+            self.status_label.config(text=format_maintenance_report(report))
+    
+    def check_data_integrity(self):
+        """Look for orphaned PA assignments and stale totals, and offer to repair them."""
+        if not self.data_loaded:
+            self.status_label.config(text="Data is still loading, try again in a moment")
+            return
+        for tab in self.get_built_tabs():
+            tab.flush_pending_changes()
+        self.wait_for_background_save()
+        
+        start = time.perf_counter()
+        issues = integrity_service.check_integrity(self.get_leaders(), self.get_receipts())
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if not issues:
+            self.status_label.config(text=f"Data checked in {elapsed_ms:.0f} ms, no problems found")
+            messagebox.showinfo("Check Data", "No problems found.")
+            return
+        
+        counts = {}
+        for issue in issues:
+            counts[issue.kind] = counts.get(issue.kind, 0) + 1
+        lines = [f"{count} x {integrity_service.ISSUE_KINDS[kind]}" for kind, count in counts.items()]
+        lines.append("")
+        lines += [issue.detail for issue in issues[:INTEGRITY_ISSUES_SHOWN]]
+        if len(issues) > INTEGRITY_ISSUES_SHOWN:
+            lines.append(f"... and {len(issues) - INTEGRITY_ISSUES_SHOWN} more")
+        self.status_label.config(text=f"Data checked in {elapsed_ms:.0f} ms, {len(issues)} problems found")
+        if not messagebox.askyesno("Check Data", "\n".join(lines) + "\n\nRepair these problems?"):
+            return
+        
+        try:
+            result = integrity_service.repair_integrity(self.get_leaders(), self.get_receipts())
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to repair data: {str(e)}")
+            return
+        self.mark_receipts_changed()
+        self.save_data()
+        self.refresh_all_tabs()
+        self.status_label.config(text=f"Repaired {sum(result['fixed'].values())} problems")
+    
+    def backup_now(self):
+        """Write a backup on a worker thread."""
+        if self.backup_scheduler is None:
+            self.status_label.config(text="Data is still loading, try again in a moment")
+            return
+        self.wait_for_background_save()
+        if self.backup_scheduler.run_now():
+            self.status_label.config(text="Backing up...")
+    
+    def _on_backup_done(self, path: Optional[str], error: Optional[Exception]):
+        """Report the result of a backup in the status bar."""
+        if error is not None:
+            self.status_label.config(text=f"Backup failed: {error}")
+        else:
+            self.status_label.config(text=f"Backup written to {os.path.basename(path)}")
+    
+    def restore_backup(self):
+        """Replace all data with a backup chosen by the user, then reload."""
+        if not self.data_loaded:
+            self.status_label.config(text="Data is still loading, try again in a moment")
+            return
+        service = backup_service.BackupService(self.data_service.db_path)
+        if self.backup_scheduler is not None and self.backup_scheduler.is_running():
+            messagebox.showinfo("Restore", "A backup is being written, try again in a moment")
+            return
+        
+        backup_path = filedialog.askopenfilename(
+            initialdir=service.backup_dir,
+            filetypes=[("Backups", "*.db *.db.gz"), ("All files", "*.*")]
+        )
+        if not backup_path:
+            return
+        if not messagebox.askyesno("Confirm", f"Replace all current data with {os.path.basename(backup_path)}?\n\n"
+                                              "The current data is backed up first."):
+            return
+        
+        # Nothing may still be writing the old data
+        for tab in self.get_built_tabs():
+            tab.flush_pending_changes()
+        self.wait_for_background_save()
+        try:
+            safety_path = service.restore(backup_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to restore backup: {str(e)}")
+            return
+        
+        self.status_label.config(text=f"Backup restored, previous data saved as {os.path.basename(safety_path)}")
+        self.load_data_async()
+    
+    def export_changeset(self):
+        """Write the changes other laptops have not seen yet to a changeset file."""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=sync_service.CHANGESET_EXTENSION,
+            filetypes=[("Kamp changesets", f"*{sync_service.CHANGESET_EXTENSION}"), ("All files", "*.*")],
+            initialfile=f"kamp_changes_{self.get_timestamp()}{sync_service.CHANGESET_EXTENSION}"
+        )
+        if not file_path:
+            return
+        
+        for tab in self.get_built_tabs():
+            tab.flush_pending_changes()
+        self.wait_for_background_save()
+        try:
+            header = sync_service.SyncService(self.data_service.db_path).export_changeset(file_path)
+            self.status_label.config(text=f"Exported {header['rows']} changed rows")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export changes: {str(e)}")
+    
+    def import_changeset(self):
+        """Merge a changeset from another laptop and reload."""
+        if not self.data_loaded:
+            self.status_label.config(text="Data is still loading, try again in a moment")
+            return
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Kamp changesets", f"*{sync_service.CHANGESET_EXTENSION}"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        for tab in self.get_built_tabs():
+            tab.flush_pending_changes()
+        self.wait_for_background_save()
+        try:
+            result = sync_service.SyncService(self.data_service.db_path).import_changeset(file_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import changes: {str(e)}")
+            return
+        
+        message = (f"Applied {result['applied']} changed rows, merged {result['merged']} rows "
+                   f"changed on both laptops.")
+        if result["conflicts"]:
+            message += (f"\n\n{result['conflicts']} fields were changed on both laptops. "
+                        f"This laptop's values are kept until you pick one.")
+        messagebox.showinfo("Import Changes", message)
+        if result["conflicts"]:
+            self.resolve_sync_conflicts(reload=False)
+        self.load_data_async()
+    
+    def resolve_sync_conflicts(self, reload: bool = True):
+        """Ask for every field both laptops changed which value to keep."""
+        if not self.data_loaded:
+            self.status_label.config(text="Data is still loading, try again in a moment")
+            return
+        for tab in self.get_built_tabs():
+            tab.flush_pending_changes()
+        self.wait_for_background_save()
+        service = sync_service.SyncService(self.data_service.db_path)
+        try:
+            conflicts = service.list_conflicts()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read sync conflicts: {str(e)}")
+            return
+        if not conflicts:
+            messagebox.showinfo("Sync Conflicts", "No sync conflicts.")
+            return
+        
+        resolved = 0
+        for number, conflict in enumerate(conflicts, 1):
+            answer = messagebox.askyesnocancel(
+                f"Sync Conflict {number} of {len(conflicts)}",
+                f"{conflict['label']}: {conflict['field']} was changed on both laptops.\n\n"
+                f"This laptop: {conflict['local_value']}\n"
+                f"Other laptop: {conflict['incoming_value']}\n\n"
+                f"Yes: use the other laptop's value, No: keep this laptop's, Cancel: decide later"
+            )
+            if answer is None:
+                break
+            try:
+                service.resolve_conflict(conflict["id"], use_incoming=answer)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to resolve conflict: {str(e)}")
+                break
+            resolved += 1
+        
+        self.status_label.config(text=f"Resolved {resolved} of {len(conflicts)} sync conflicts")
+        if resolved and reload:
+            self.load_data_async()
+    
     def refresh_all_tabs(self):
-        """Refresh all tabs."""
-        self.leaders_tab.refresh_data()
-        self.receipts_tab.refresh_data()
-        self.pa_items_tab.refresh_data()
-        self.poef_tab.refresh_data()
+        """Refresh all tabs that have been built."""
+        self.rebuild_pa_index()
+        for tab in self.get_built_tabs():
+            tab.refresh_data()
         self.update_data_info()
     
+    def rebuild_pa_index(self):
+        """Rebuild the PA item to leaders index after leaders or receipts changed."""
+        self.pa_index.rebuild(self.get_leaders())
+    
+    def mark_receipts_changed(self):
+        """Invalidate caches that depend on receipts and their items."""
+        self.receipts_version += 1
+    
+    def get_pa_item_lookup(self) -> dict:
+        """Get all PA items by ID, rebuilt only after receipts changed."""
+        if self._pa_item_lookup_version != self.receipts_version:
+            self._pa_item_lookup = {
+                item.id: item
+                for receipt in self.get_receipts()
+                for item in receipt.items
+                if item.category == ExpenseCategory.PA
+            }
+            self._pa_item_lookup_version = self.receipts_version
+        return self._pa_item_lookup
+    
     def update_data_info(self):
         """Update the data info in the status bar."""
         leaders = self.get_leaders()
@@ -160,15 +922,31 @@ class MainWindow(tk.Tk):
         info_text = f"Leaders: {len(leaders)} | Receipts: {len(receipts)}"
         self.data_info_label.config(text=info_text)
     
+    def update_perf_status(self):
+        """Show the slowest operations in the status bar while instrumentation is on."""
+        if self._perf_status_job is not None:
+            self.after_cancel(self._perf_status_job)
+            self._perf_status_job = None
+        
+        if not perf.is_enabled():
+            self.perf_label.config(text="")
+            return
+        self.perf_label.config(text=perf.format_top())
+        self._perf_status_job = self.after(PERF_STATUS_INTERVAL_MS, self.update_perf_status)
+    
     def on_tab_changed(self, event):
         """Handle tab change events."""
         current_tab = self.notebook.select()
-        tab_widget = self.nametowidget(current_tab)
         tab_name = self.notebook.tab(current_tab, "text")
         self.status_label.config(text=f"Current tab: {tab_name}")
-        # Refresh data for the selected tab if possible
-        if hasattr(tab_widget, 'refresh_data'):
-            tab_widget.refresh_data()
+        
+        attr = self._tab_placeholders[str(current_tab)][0]
+        if getattr(self, attr) is None:
+            # First visit builds and populates the tab
+            self.ensure_tab(attr)
+        else:
+            # Refresh data for the selected tab
+            getattr(self, attr).refresh_data()
     
     # Data access methods for tabs
     def get_leaders(self) -> List[Leader]:
@@ -216,6 +994,7 @@ class MainWindow(tk.Tk):
         receipts = self.get_receipts()
         receipts.append(receipt)
         self.data_service.receipts = receipts
+        self.mark_receipts_changed()
         self.save_data()
         self.refresh_all_tabs()
     
@@ -233,43 +1012,111 @@ class MainWindow(tk.Tk):
         if not receipt_to_remove:
             return
         
-        # Clean up PA expenses from leaders
-        leaders = self.get_leaders()
-        for leader in leaders:
-            # Remove all PA expenses from this receipt
-            expenses_to_remove = []
-            for expense_id, amount in leader.pa_purchases.items():
-                # Check if this expense belongs to the receipt being removed
-                for expense in receipt_to_remove.items:
-                    if expense.id == expense_id and expense.category.value == "PA":
-                        expenses_to_remove.append(expense_id)
-                        break
-            
-            # Remove the expenses
-            for expense_id in expenses_to_remove:
-                leader.remove_pa_purchase(expense_id, 0)
+        # Clean up PA assignments to the receipt's items with one set lookup per leader
+        item_ids = {item.id for item in receipt_to_remove.items}
+        for leader in self.get_leaders():
+            for item_id in item_ids.intersection(leader.pa_purchases):
+                leader.remove_pa_purchase(item_id, 0)
         
         # Remove the receipt from the list
         receipts = [r for r in receipts if r.id != receipt_id]
         self.data_service.receipts = receipts
-        
-        # Delete the receipt's items CSV file
-        try:
-            import os
-            items_file = os.path.join(self.data_service.data_dir, f"receipt_items_{receipt_id}.csv")
-            if os.path.exists(items_file):
-                os.remove(items_file)
-        except Exception as e:
-            print(f"Warning: Could not delete receipt items file: {e}")
+        self.mark_receipts_changed()
         
         # Save the updated data
         self.save_data()
         self.refresh_all_tabs()
     
     def export_summary(self):
-        """Export a global summary report."""
-        # Implementation placeholder
-        pass
+        """Export leaders, receipts, items and PA assignments as CSV files."""
+        if not self.can_start_export():
+            return
+        
+        dialog = ExportOptionsDialog(self)
+        self.wait_window(dialog)
+        if not dialog.result:
+            return
+        
+        directory = filedialog.askdirectory(title="Select folder for the CSV export")
+        if not directory:
+            return
+        
+        exporter = export_service.CSVExporter(
+            self.data_service.db_path,
+            delimiter=CSV_DELIMITERS[dialog.result["delimiter"]],
+            decimal_comma=CSV_DECIMALS[dialog.result["decimal"]]
+        )
+        self.start_export("CSV", lambda: list(exporter.export_all(directory).values()))
+    
+    def export_workbook(self):
+        """Export all data as an Excel workbook."""
+        if not self.can_start_export():
+            return
+        
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel workbooks", "*.xlsx")],
+            initialfile=f"kamp_finances_{self.get_timestamp()}.xlsx"
+        )
+        if not filepath:
+            return
+        
+        exporter = xlsx_service.XLSXExporter(self.data_service.db_path)
+        
+        def export():
+            exporter.export(filepath)
+            return [filepath]
+        
+        self.start_export("Excel", export)
+    
+    def can_start_export(self) -> bool:
+        """Check that an export may start now, telling the user why not."""
+        if not self.data_loaded:
+            messagebox.showerror("Error", "Data is still loading")
+            return False
+        if self._export_thread is not None and self._export_thread.is_alive():
+            messagebox.showerror("Error", "An export is already running")
+            return False
+        return True
+    
+    def start_export(self, description: str, export):
+        """Run an export callable returning the written paths on a worker thread."""
+        # The export reads the database, so write pending changes first
+        for tab in self.get_built_tabs():
+            tab.flush_pending_changes()
+        self.wait_for_background_save()
+        
+        self._export_result = None
+        self._export_thread = threading.Thread(target=self._export_worker, args=(export,), daemon=True)
+        self._export_thread.start()
+        self.status_label.config(text=f"Exporting {description}...")
+        self.after(LOAD_POLL_INTERVAL_MS, lambda: self._poll_export(description))
+    
+    def _export_worker(self, export):
+        """Run an export off the main thread."""
+        try:
+            start = time.perf_counter()
+            paths = export()
+            self._export_result = ("done", (paths, time.perf_counter() - start))
+        except Exception as e:
+            self._export_result = ("error", e)
+    
+    def _poll_export(self, description: str):
+        """Report the result of an export once it has finished."""
+        if self._export_thread.is_alive():
+            self.after(LOAD_POLL_INTERVAL_MS, lambda: self._poll_export(description))
+            return
+        
+        kind, payload = self._export_result
+        if kind == "error":
+            messagebox.showerror("Error", f"Failed to export {description}: {str(payload)}")
+            self.status_label.config(text=f"Failed to export {description}")
+            return
+        
+        paths, elapsed = payload
+        self.status_label.config(text=f"{description} export finished ({elapsed:.1f} s)")
+        mem_profile.checkpoint(f"export {description}", self)
+        messagebox.showinfo("Export", "Exported:\n" + "\n".join(paths))
     
     def export_leader_details(self, leader: Leader):
         """Export details for a specific leader."""
@@ -39,10 +39,12 @@ class LeaderAssignmentDialog(FormDialog):
     
     def get_assignments(self) -> Dict[str, bool]:
         """Get the leader assignments."""
+        # The form values are captured in result before the dialog is destroyed
+        values = self.result or {}
         assignments = {}
         for leader in self.leaders:
             field_name = f"leader_{leader.id}"
-            value = self.get_field_value(field_name)
+            value = values.get(field_name, self.get_field_value(field_name))
             assignments[leader.id] = (value == "Assigned")
         return assignments
 
@@ -177,45 +179,37 @@ class PAItemsTab(BaseTab):
     
     def refresh_data(self):
         """Refresh the PA items data display."""
-        receipts = self.main_window.get_receipts()
-        leaders = self.main_window.get_leaders()
-        
-        # Get all PA items from receipts
+        self.pa_items_table.stream_rows(self.iter_pa_item_rows())
+    
+    def get_pa_items(self) -> List[Expense]:
+        """Get all PA items from receipts."""
         pa_items = []
-        for receipt in receipts:
+        for receipt in self.main_window.get_receipts():
             for item in receipt.items:
                 if item.category == ExpenseCategory.PA:
                     pa_items.append(item)
-        
-        # Clear table
-        self.pa_items_table.clear_data()
-        
-        # Add PA items to table
-        for item in pa_items:
-            # Get names and amounts of leaders who have this item assigned
-            assigned_leaders = []
-            for leader in leaders:
-                if leader.has_pa_purchase(item.id):
-                    amount = leader.get_pa_purchase_amount(item.id)
-                    assigned_leaders.append(f"{leader.name} (€{amount:.2f})")
-            
-            # Format the assigned leaders string
-            if assigned_leaders:
-                if len(assigned_leaders) == 1:
-                    assigned_text = assigned_leaders[0]
-                else:
-                    assigned_text = ", ".join(assigned_leaders)
-            else:
-                assigned_text = "Not assigned"
-            
-            self.pa_items_table.add_row([
-                item.name,
-                f"€{item.price:.2f}",
-                str(item.quantity),
-                f"€{item.get_total_price():.2f}",
-                item.date,
-                assigned_text
-            ], tags=[str(item.id)])
+        return pa_items
+    
+    def iter_pa_item_rows(self):
+        """Yield table rows for all PA items, formatting each one lazily."""
+        for item in self.get_pa_items():
+            yield (self.format_pa_item_values(item), [str(item.id)])
+    
+    def format_pa_item_values(self, item: Expense) -> List[str]:
+        """Format the table values of one PA item."""
+        return [
+            item.name,
+            f"€{item.price:.2f}",
+            str(item.quantity),
+            f"€{item.get_total_price():.2f}",
+            item.date,
+            self.main_window.pa_index.get_assigned_text(item.id)
+        ]
+    
+    def update_item_row(self, item: Expense):
+        """Re-render the table row of a single PA item."""
+        for row_id in self.pa_items_table.tree.tag_has(str(item.id)):
+            self.pa_items_table.tree.item(row_id, values=self.format_pa_item_values(item))
     
     def on_pa_item_selected(self, event):
         """Handle PA item selection."""
@@ -261,14 +255,8 @@ class PAItemsTab(BaseTab):
         for widget in self.leader_entries_frame.winfo_children():
             widget.destroy()
         
-        leaders = self.main_window.get_leaders()
-        leader_names = [leader.name for leader in leaders]
-        
         # Get current assignments
-        assigned_leaders = []
-        for leader in leaders:
-            if leader.has_pa_purchase(self.selected_pa_item.id):
-                assigned_leaders.append(leader.name)
+        assigned_leaders = [leader.name for leader in self.main_window.pa_index.get_assigned_leaders(self.selected_pa_item.id)]
         
         # If no assignments, create one empty entry
         if not assigned_leaders:
@@ -318,113 +306,62 @@ class PAItemsTab(BaseTab):
         if not self.selected_pa_item:
             return
         
-        # Store current selection
-        current_item_id = self.selected_pa_item.id
-        
         # Get all leader entries
-        leader_entries = []
+        leader_entries = set()
         for entry_frame in self.leader_entries_frame.winfo_children():
             leader_name = entry_frame.leader_var.get()
             if leader_name:  # Only include non-empty selections
-                leader_entries.append(leader_name)
-        
-        # Remove duplicates
-        leader_entries = list(set(leader_entries))
+                leader_entries.add(leader_name)
         
-        # Get all leaders
+        # Keep the assigned leaders in leader order, without duplicates
         leaders = self.main_window.get_leaders()
+        assigned_leaders = [leader for leader in leaders if leader.name in leader_entries]
         
-        # Clear all current assignments for this item
-        for leader in leaders:
-            if leader.has_pa_purchase(self.selected_pa_item.id):
-                leader.remove_pa_purchase(self.selected_pa_item.id, 0)  # Amount doesn't matter for removal
-        
-        # Calculate the amount each leader should pay
-        total_price = self.selected_pa_item.get_total_price()
-        if leader_entries:
-            amount_per_leader = total_price / len(leader_entries)
-        else:
-            amount_per_leader = 0
-        
-        # Add new assignments with split amounts
-        for leader_name in leader_entries:
-            for leader in leaders:
-                if leader.name == leader_name:
-                    leader.add_pa_purchase(self.selected_pa_item.id, amount_per_leader)
-                    break
+        self.apply_assignments(assigned_leaders)
+    
+    def apply_assignments(self, assigned_leaders: List[Leader]):
+        """Replace the assignments of the selected PA item and split its cost."""
+        item = self.selected_pa_item
+        
+        # Reassign the item and save only the affected leaders
+        self.main_window.wait_for_background_save()
+        try:
+            self.main_window.finance_service.assign_pa_items(
+                self.main_window.get_leaders(),
+                self.main_window.get_receipts(),
+                {item.id: [leader.id for leader in assigned_leaders]}
+            )
+        except Exception as e:
+            self.show_error(f"Failed to save assignments: {str(e)}")
+            return
         
-        self.main_window.save_data()
+        self.main_window.pa_index.set_item_leaders(item.id, assigned_leaders)
+        self.main_window.status_label.config(text="Assignments saved")
         
-        # Update displays without losing selection
+        # Update displays without losing selection, re-rendering only this item's row
         self.update_assignment_status()
         self.refresh_assignments()
-        
-        # Refresh data but preserve selection
-        self.refresh_data_preserve_selection(current_item_id)
+        self.update_item_row(item)
     
     def refresh_data_preserve_selection(self, item_id_to_select=None):
         """Refresh the PA items data display while preserving selection."""
-        receipts = self.main_window.get_receipts()
-        leaders = self.main_window.get_leaders()
-        
-        # Get all PA items from receipts
-        pa_items = []
-        for receipt in receipts:
-            for item in receipt.items:
-                if item.category == ExpenseCategory.PA:
-                    pa_items.append(item)
+        def restore_selection():
+            # Select the row of the specified item once all rows are rendered
+            if item_id_to_select and self.pa_items_table.select_by_tag(item_id_to_select):
+                self.selected_pa_item = self.get_pa_item_by_id(item_id_to_select)
         
-        # Clear table
-        self.pa_items_table.clear_data()
-        
-        # Add PA items to table
-        for item in pa_items:
-            # Get names and amounts of leaders who have this item assigned
-            assigned_leaders = []
-            for leader in leaders:
-                if leader.has_pa_purchase(item.id):
-                    amount = leader.get_pa_purchase_amount(item.id)
-                    assigned_leaders.append(f"{leader.name} (€{amount:.2f})")
-            
-            # Format the assigned leaders string
-            if assigned_leaders:
-                if len(assigned_leaders) == 1:
-                    assigned_text = assigned_leaders[0]
-                else:
-                    assigned_text = ", ".join(assigned_leaders)
-            else:
-                assigned_text = "Not assigned"
-            
-            self.pa_items_table.add_row([
-                item.name,
-                f"€{item.price:.2f}",
-                str(item.quantity),
-                f"€{item.get_total_price():.2f}",
-                item.date,
-                assigned_text
-            ], tags=[str(item.id)])
-        
-        # Restore selection if specified
-        if item_id_to_select:
-            # Find the row with the specified item ID and select it
-            for i, item in enumerate(pa_items):
-                if item.id == item_id_to_select:
-                    # Select the corresponding row in the table
-                    self.pa_items_table.tree.selection_set(self.pa_items_table.tree.get_children()[i])
-                    # Update the selected item
-                    self.selected_pa_item = item
-                    break
+        self.pa_items_table.stream_rows(self.iter_pa_item_rows(), on_complete=restore_selection)
     
     def update_assignment_status(self):
         """Update the assignment status label."""
-        leaders = self.main_window.get_leaders()
-        assigned_leaders = [leader.name for leader in leaders if leader.has_pa_purchase(self.selected_pa_item.id)]
+        assigned_leaders = self.main_window.pa_index.get_assigned_leaders(self.selected_pa_item.id)
         
         if not assigned_leaders:
             self.assignment_status_label.config(text="Status: Not assigned", foreground="red")
         elif len(assigned_leaders) == 1:
-            amount = next(leader.get_pa_purchase_amount(self.selected_pa_item.id) for leader in leaders if leader.has_pa_purchase(self.selected_pa_item.id))
-            self.assignment_status_label.config(text=f"Status: Assigned to {assigned_leaders[0]} (€{amount:.2f})", foreground="green")
+            leader = assigned_leaders[0]
+            amount = leader.get_pa_purchase_amount(self.selected_pa_item.id)
+            self.assignment_status_label.config(text=f"Status: Assigned to {leader.name} (€{amount:.2f})", foreground="green")
         else:
             total_price = self.selected_pa_item.get_total_price()
             amount_per_leader = total_price / len(assigned_leaders)
@@ -486,25 +423,8 @@ class PAItemsTab(BaseTab):
         
         if dialog.result:
             assignments = dialog.get_assignments()
-            
-            # Clear all current assignments for this item
-            for leader in leaders:
-                if leader.has_pa_purchase(self.selected_pa_item.id):
-                    leader.remove_pa_purchase(self.selected_pa_item.id, 0)
-            
-            # Calculate the amount each leader should pay
             assigned_leaders = [leader for leader in leaders if assignments.get(leader.id, False)]
-            total_price = self.selected_pa_item.get_total_price()
-            
-            if assigned_leaders:
-                amount_per_leader = total_price / len(assigned_leaders)
-            else:
-                amount_per_leader = 0
-            
-            # Add new assignments with split amounts
-            for leader in assigned_leaders:
-                leader.add_pa_purchase(self.selected_pa_item.id, amount_per_leader)
             
-            self.main_window.save_data()
-            self.refresh_assignments()
+            self.apply_assignments(assigned_leaders)
+            self.populate_leader_entries()
             self.show_info("Leader assignments updated successfully")
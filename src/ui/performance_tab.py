@@ -0,0 +1,101 @@
+"""
+Performance tab for Kamp Finances application.
+Hidden tab (Ctrl+Shift+P) showing the hot-path timings collected by utils.perf.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from datetime import datetime
+
+from utils import perf
+from utils.lazy_import import lazy_import
+from .base_components import BaseTab, DataTable
+
+# Only needed when dumping
+filedialog = lazy_import("tkinter.filedialog")
+
+# How often the table refreshes while the tab is shown
+PERF_REFRESH_INTERVAL_MS = 1000
+
+class PerformanceTab(BaseTab):
+    """Tab listing timing histograms per instrumented operation."""
+
+    def __init__(self, parent, main_window):
+        self._refresh_job = None
+        super().__init__(parent, main_window)
+
+    def create_widgets(self):
+        """Create the performance tab widgets."""
+        # Title
+        title_label = ttk.Label(self, text="Performance", style="Title.TLabel")
+        title_label.pack(pady=10)
+
+        # Buttons frame
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        self.enabled_var = tk.BooleanVar(value=perf.is_enabled())
+        ttk.Checkbutton(button_frame, text="Collect timings", variable=self.enabled_var,
+                        command=self.toggle_collecting).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Reset", command=self.reset_timings).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Button(button_frame, text="Dump JSON...", command=self.dump_timings).pack(side=tk.LEFT, padx=(10, 0))
+
+        # Timings table
+        columns = [
+            {"name": "name", "display": "Operation", "width": 320},
+            {"name": "count", "display": "Calls", "width": 70, "anchor": tk.E},
+            {"name": "total", "display": "Total (ms)", "width": 100, "anchor": tk.E},
+            {"name": "p50", "display": "p50 (ms)", "width": 90, "anchor": tk.E},
+            {"name": "p95", "display": "p95 (ms)", "width": 90, "anchor": tk.E},
+            {"name": "max", "display": "Max (ms)", "width": 90, "anchor": tk.E}
+        ]
+
+        self.timings_table = DataTable(self, columns, height=20)
+        self.timings_table.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+    def refresh_data(self):
+        """Show the current timings and keep refreshing while the tab is visible."""
+        self.timings_table.clear_data()
+        for name, stats in perf.get_stats().items():
+            self.timings_table.add_row([
+                name,
+                stats["count"],
+                f"{stats['total_ms']:.1f}",
+                f"{stats['p50_ms']:.2f}",
+                f"{stats['p95_ms']:.2f}",
+                f"{stats['max_ms']:.2f}"
+            ])
+
+        if self._refresh_job is None:
+            self._refresh_job = self.after(PERF_REFRESH_INTERVAL_MS, self._auto_refresh)
+
+    def _auto_refresh(self):
+        """Refresh again while this tab is the selected one."""
+        self._refresh_job = None
+        if self.main_window.notebook.select() == str(self.master):
+            self.refresh_data()
+
+    def toggle_collecting(self):
+        """Start or stop collecting timings."""
+        perf.enable(self.enabled_var.get())
+        self.main_window.update_perf_status()
+
+    def reset_timings(self):
+        """Forget the collected timings."""
+        perf.reset()
+        self.refresh_data()
+
+    def dump_timings(self):
+        """Write the collected timings to a JSON file."""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            initialfile=f"kamp_perf_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        if not file_path:
+            return
+        try:
+            perf.dump_json(file_path)
+            self.show_info(f"Timings written to {file_path}")
+        except Exception as e:
+            self.show_error(f"Failed to write timings: {str(e)}")
@@ -9,66 +9,239 @@ from datetime import datetime
 
 from models.expense import Expense, ExpenseCategory
 from models.leader import Leader, POEF_DRINK_PRICE, POEF_CIGARETTE_PRICE
-from .base_components import BaseTab, DataTable, FormDialog
+from .base_components import BaseTab, DataTable
 
-class POEFCountDialog(FormDialog):
-    """Dialog for updating POEF counts for leaders."""
+class POEFCountDialog(tk.Toplevel):
+    """Spreadsheet-style grid for entering drink and cigarette counts for all leaders.
+    
+    Only a fixed pool of row widgets is built and rebound to leaders while
+    scrolling, so the dialog opens instantly for hundreds of leaders. Tab and
+    Shift-Tab move between cells, Enter and the arrow keys move down and up.
+    """
+    
+    VISIBLE_ROWS = 20
+    COLUMNS = ("drinks", "cigarettes")
+    INVALID_BACKGROUND = "#ffd6d6"
     
     def __init__(self, parent, leaders: List[Leader]):
+        super().__init__(parent)
+        self.title("Update POEF Counts")
         self.leaders = leaders
+        self.result = None
         
-        # Create fields for each leader
-        fields = []
-        for leader in leaders:
-            fields.append({
-                "name": f"drinks_{leader.id}",
-                "label": f"{leader.name} - Drinks:",
-                "type": "spinbox",
-                "from_": 0,
-                "to": 1000
-            })
-            fields.append({
-                "name": f"cigarettes_{leader.id}",
-                "label": f"{leader.name} - Cigarettes:",
-                "type": "spinbox",
-                "from_": 0,
-                "to": 1000
-            })
+        # Edited cell values as text, per leader index and column
+        self.values = [
+            {"drinks": str(leader.poef_drink_count), "cigarettes": str(leader.poef_cigarette_count)}
+            for leader in leaders
+        ]
+        self.invalid_cells = set()
+        self.top_index = 0
+        self.row_widgets = []
+        self._rebinding = False
+        
+        self.transient(self.master)
+        self.grab_set()
+        self.create_widgets()
+        self.render_rows()
+        self.center_dialog()
+        if self.leaders:
+            self.focus_cell(0, 0)
+    
+    def create_widgets(self):
+        """Create the grid, scrollbar and buttons."""
+        main_frame = ttk.Frame(self, padding="20")
+        main_frame.pack(fill=tk.BOTH, expand=True)
         
-        super().__init__(parent, "Update POEF Counts", fields)
+        grid_frame = ttk.Frame(main_frame)
+        grid_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Set current values
-        for leader in leaders:
-            drinks_field = f"drinks_{leader.id}"
-            cigarettes_field = f"cigarettes_{leader.id}"
-            self.set_field_value(drinks_field, str(leader.poef_drink_count))
-            self.set_field_value(cigarettes_field, str(leader.poef_cigarette_count))
+        # Headers
+        ttk.Label(grid_frame, text="Leader", font=("TkDefaultFont", 9, "bold"), width=25).grid(row=0, column=0, sticky=tk.W)
+        ttk.Label(grid_frame, text="Drinks", font=("TkDefaultFont", 9, "bold")).grid(row=0, column=1, sticky=tk.W, padx=5)
+        ttk.Label(grid_frame, text="Cigarettes", font=("TkDefaultFont", 9, "bold")).grid(row=0, column=2, sticky=tk.W, padx=5)
+        
+        # Build only as many rows as fit in the window
+        for pool_index in range(min(self.VISIBLE_ROWS, len(self.leaders))):
+            self.row_widgets.append(self.create_row(grid_frame, pool_index))
+        
+        self.scrollbar = ttk.Scrollbar(grid_frame, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.grid(row=1, column=3, rowspan=max(len(self.row_widgets), 1), sticky=(tk.N, tk.S))
+        
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.bind(sequence, self.on_mouse_wheel)
+        
+        # Status and buttons
+        self.status_label = ttk.Label(main_frame, text="")
+        self.status_label.pack(anchor=tk.W, pady=(10, 0))
+        
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(pady=(10, 0))
+        
+        ttk.Button(button_frame, text="OK", command=self.on_ok).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="Cancel", command=self.on_cancel).pack(side=tk.LEFT)
+        
+        self.bind("<Escape>", lambda event: self.on_cancel())
     
-    def get_counts(self) -> Dict[str, Dict[str, int]]:
-        """Get the POEF counts for each leader."""
-        counts = {}
-        for leader in self.leaders:
-            drinks_field = f"drinks_{leader.id}"
-            cigarettes_field = f"cigarettes_{leader.id}"
+    def create_row(self, parent, pool_index: int) -> Dict:
+        """Create the widgets of one reusable grid row."""
+        name_label = ttk.Label(parent, text="", width=25)
+        name_label.grid(row=pool_index + 1, column=0, sticky=tk.W, pady=1)
+        
+        row = {"name": name_label, "entries": [], "vars": []}
+        for column_index, column in enumerate(self.COLUMNS):
+            var = tk.StringVar()
+            entry = tk.Entry(parent, textvariable=var, width=10, justify=tk.RIGHT)
+            entry.grid(row=pool_index + 1, column=column_index + 1, padx=5, pady=1)
             
-            # Get values with safe conversion
-            try:
-                drinks_value = self.get_field_value(drinks_field)
-                drinks_count = int(drinks_value) if drinks_value else 0
-            except (ValueError, TypeError):
-                drinks_count = 0
-                
-            try:
-                cigarettes_value = self.get_field_value(cigarettes_field)
-                cigarettes_count = int(cigarettes_value) if cigarettes_value else 0
-            except (ValueError, TypeError):
-                cigarettes_count = 0
+            var.trace_add("write", lambda *args, p=pool_index, c=column_index: self.on_cell_changed(p, c))
+            entry.bind("<Tab>", lambda event, p=pool_index, c=column_index: self.move_focus(p, c, 0, 1))
+            entry.bind("<Shift-Tab>", lambda event, p=pool_index, c=column_index: self.move_focus(p, c, 0, -1))
+            entry.bind("<ISO_Left_Tab>", lambda event, p=pool_index, c=column_index: self.move_focus(p, c, 0, -1))
+            entry.bind("<Return>", lambda event, p=pool_index, c=column_index: self.move_focus(p, c, 1, 0))
+            entry.bind("<Down>", lambda event, p=pool_index, c=column_index: self.move_focus(p, c, 1, 0))
+            entry.bind("<Up>", lambda event, p=pool_index, c=column_index: self.move_focus(p, c, -1, 0))
             
-            counts[leader.id] = {
-                "drinks": drinks_count,
-                "cigarettes": cigarettes_count
-            }
+            row["entries"].append(entry)
+            row["vars"].append(var)
+        return row
+    
+    def render_rows(self):
+        """Bind the row widgets to the leaders currently scrolled into view."""
+        self._rebinding = True
+        for pool_index, row in enumerate(self.row_widgets):
+            leader_index = self.top_index + pool_index
+            row["name"].config(text=self.leaders[leader_index].name)
+            for column_index, column in enumerate(self.COLUMNS):
+                row["vars"][column_index].set(self.values[leader_index][column])
+                self.paint_cell(row["entries"][column_index], (leader_index, column) in self.invalid_cells)
+        self._rebinding = False
+        
+        if self.leaders:
+            first = self.top_index / len(self.leaders)
+            last = (self.top_index + len(self.row_widgets)) / len(self.leaders)
+            self.scrollbar.set(first, last)
+        self.update_status()
+    
+    def paint_cell(self, entry: tk.Entry, invalid: bool):
+        """Highlight a cell holding an invalid value."""
+        entry.config(background=self.INVALID_BACKGROUND if invalid else "white")
+    
+    def on_cell_changed(self, pool_index: int, column_index: int):
+        """Store and validate an edited cell."""
+        if self._rebinding:
+            return
+        
+        leader_index = self.top_index + pool_index
+        column = self.COLUMNS[column_index]
+        value = self.row_widgets[pool_index]["vars"][column_index].get()
+        self.values[leader_index][column] = value
+        
+        if self.parse_count(value) is None:
+            self.invalid_cells.add((leader_index, column))
+        else:
+            self.invalid_cells.discard((leader_index, column))
+        self.paint_cell(self.row_widgets[pool_index]["entries"][column_index], (leader_index, column) in self.invalid_cells)
+        self.update_status()
+    
+    @staticmethod
+    def parse_count(value: str) -> Optional[int]:
+        """Parse a cell value as a non-negative count, or return None."""
+        value = value.strip()
+        return int(value) if value.isdigit() else None
+    
+    def update_status(self):
+        """Show how many counts changed and how many cells are invalid."""
+        changed = len(self.get_changed_counts(strict=False))
+        status = f"{len(self.leaders)} leaders, {changed} changed"
+        if self.invalid_cells:
+            status += f", {len(self.invalid_cells)} invalid cell(s)"
+        self.status_label.config(text=status)
+    
+    def move_focus(self, pool_index: int, column_index: int, row_step: int, column_step: int):
+        """Move the focus to a neighbouring cell, wrapping across rows for Tab."""
+        leader_index = self.top_index + pool_index
+        column_index += column_step
+        if column_index >= len(self.COLUMNS):
+            column_index = 0
+            leader_index += 1
+        elif column_index < 0:
+            column_index = len(self.COLUMNS) - 1
+            leader_index -= 1
+        leader_index += row_step
+        
+        if 0 <= leader_index < len(self.leaders):
+            self.focus_cell(leader_index, column_index)
+        return "break"
+    
+    def focus_cell(self, leader_index: int, column_index: int):
+        """Scroll a cell into view and focus it."""
+        if leader_index < self.top_index:
+            self.scroll_to(leader_index)
+        elif leader_index >= self.top_index + len(self.row_widgets):
+            self.scroll_to(leader_index - len(self.row_widgets) + 1)
+        
+        entry = self.row_widgets[leader_index - self.top_index]["entries"][column_index]
+        entry.focus_set()
+        entry.select_range(0, tk.END)
+    
+    def scroll_to(self, top_index: int):
+        """Scroll so that the given leader is the first visible row."""
+        top_index = max(0, min(top_index, len(self.leaders) - len(self.row_widgets)))
+        if top_index != self.top_index:
+            self.top_index = top_index
+            self.render_rows()
+    
+    def on_scroll(self, action, amount, unit=None):
+        """Handle scrollbar commands."""
+        if action == tk.MOVETO:
+            self.scroll_to(int(float(amount) * len(self.leaders)))
+        elif action == tk.SCROLL:
+            step = len(self.row_widgets) if unit == tk.PAGES else 1
+            self.scroll_to(self.top_index + int(amount) * step)
+    
+    def on_mouse_wheel(self, event):
+        """Scroll the grid with the mouse wheel."""
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.top_index - 3)
+        else:
+            self.scroll_to(self.top_index + 3)
+    
+    def get_changed_counts(self, strict: bool = True) -> Dict[str, Dict[str, int]]:
+        """Get the counts of leaders whose values changed, keyed by leader ID."""
+        counts = {}
+        for leader, values in zip(self.leaders, self.values):
+            drinks = self.parse_count(values["drinks"])
+            cigarettes = self.parse_count(values["cigarettes"])
+            if drinks is None or cigarettes is None:
+                if strict:
+                    raise ValueError(f"Invalid POEF count for {leader.name}")
+                continue
+            if drinks != leader.poef_drink_count or cigarettes != leader.poef_cigarette_count:
+                counts[leader.id] = {"drinks": drinks, "cigarettes": cigarettes}
         return counts
+    
+    def center_dialog(self):
+        """Center the dialog on the parent window."""
+        self.update_idletasks()
+        x = self.master.winfo_rootx() + (self.master.winfo_width() // 2) - (self.winfo_width() // 2)
+        y = self.master.winfo_rooty() + (self.master.winfo_height() // 2) - (self.winfo_height() // 2)
+        self.geometry(f"+{x}+{y}")
+    
+    def on_ok(self):
+        """Accept the counts if every cell is valid."""
+        if self.invalid_cells:
+            leader_index, column = min(self.invalid_cells)
+            messagebox.showerror("Error", f"Please enter a valid non-negative number for {self.leaders[leader_index].name}", parent=self)
+            self.focus_cell(leader_index, self.COLUMNS.index(column))
+            return
+        
+        self.result = self.get_changed_counts()
+        self.destroy()
+    
+    def on_cancel(self):
+        """Close the dialog without changes."""
+        self.result = None
+        self.destroy()
 
 class POEFTab(BaseTab):
     """Tab for managing POEF items and tracking consumption."""
@@ -125,6 +298,10 @@ class POEFTab(BaseTab):
         top_row = ttk.Frame(consumption_frame)
         top_row.pack(fill=tk.X, padx=10, pady=5)
         
+        # Bulk entry of the paper tally sheet
+        bulk_button = ttk.Button(top_row, text="Bulk POEF Entry", command=self.update_poef_counts)
+        bulk_button.pack(side=tk.LEFT)
+        
         # Summary labels
         summary_frame = ttk.Frame(top_row)
         summary_frame.pack(side=tk.RIGHT)
@@ -161,44 +338,35 @@ class POEFTab(BaseTab):
     
     def refresh_poef_items(self):
         """Refresh the POEF items table."""
-        receipts = self.main_window.get_receipts()
-        
-        # Clear table
-        self.poef_items_table.clear_data()
-        
-        # Get all POEF items from receipts
-        poef_items = []
-        for receipt in receipts:
+        self.poef_items_table.stream_rows(self.iter_poef_item_rows())
+    
+    def iter_poef_item_rows(self):
+        """Yield table rows for all POEF items from receipts."""
+        for receipt in self.main_window.get_receipts():
             for item in receipt.items:
                 if item.category == ExpenseCategory.POEF:
-                    poef_items.append((item, receipt))
-        
-        # Add POEF items to table
-        for item, receipt in poef_items:
-            self.poef_items_table.add_row([
-                item.name,
-                f"€{item.price:.2f}",
-                str(item.quantity),
-                f"€{item.get_total_price():.2f}",
-                item.date,
-                f"{receipt.store_name} ({receipt.date})"
-            ])
+                    yield ([
+                        item.name,
+                        f"€{item.price:.2f}",
+                        str(item.quantity),
+                        f"€{item.get_total_price():.2f}",
+                        item.date,
+                        f"{receipt.store_name} ({receipt.date})"
+                    ], [])
     
     def refresh_consumption(self):
         """Refresh the leader consumption table."""
-        leaders = self.main_window.get_leaders()
-        
-        # Clear table
-        self.consumption_table.clear_data()
-        
-        # Add leader consumption to table
-        for leader in leaders:
+        self.consumption_table.stream_rows(self.iter_consumption_rows())
+    
+    def iter_consumption_rows(self):
+        """Yield table rows with the POEF consumption of every leader."""
+        for leader in self.main_window.get_leaders():
             drinks_total = leader.poef_drink_count * POEF_DRINK_PRICE
             cigarettes_total = leader.poef_cigarette_count * POEF_CIGARETTE_PRICE
             total = drinks_total + cigarettes_total
             remaining = leader.get_remaining_to_pay()
-
-            self.consumption_table.add_row([
+            
+            yield ([
                 leader.name,
                 str(leader.poef_drink_count),
                 f"€{drinks_total:.2f}",
@@ -207,7 +375,7 @@ class POEFTab(BaseTab):
                 f"€{total:.2f}",
                 f"€{leader.paid_amount:.2f}",
                 f"€{remaining:.2f}"
-            ])
+            ], [str(leader.id)])
     
     def update_summary(self):
         """Update the summary labels."""
@@ -258,15 +426,15 @@ class POEFTab(BaseTab):
         self.wait_window(dialog)
         
         if dialog.result:
-            counts = dialog.get_counts()
-            
-            # Update leader counts
-            for leader in leaders:
-                leader_counts = counts.get(leader.id, {})
-                leader.poef_drink_count = leader_counts.get("drinks", 0)
-                leader.poef_cigarette_count = leader_counts.get("cigarettes", 0)
+            # Apply all changed counts in one transaction
+            self.main_window.wait_for_background_save()
+            try:
+                summary = self.main_window.finance_service.set_poef_counts(leaders, dialog.result)
+            except Exception as e:
+                self.show_error(f"Failed to save POEF counts: {str(e)}")
+                return
             
-            self.main_window.save_data()
+            self.main_window.status_label.config(text=f"POEF counts updated for {summary['updated']} leader(s)")
             self.refresh_consumption()
             self.update_summary()
     
@@ -3,7 +3,7 @@ Receipts tab for Kamp Finances application.
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox
 from typing import List, Dict, Optional
 from datetime import datetime
 
@@ -256,16 +256,9 @@ class ReceiptsTab(BaseTab):
         """Refresh the receipts data display."""
         receipts = self.main_window.get_receipts()
         
-        # Clear table
-        self.receipts_table.clear_data()
-        
-        # Add receipts to table
-        for receipt in receipts:
-            self.receipts_table.add_row([
-                receipt.date,
-                receipt.store_name,
-                f"€{receipt.total_amount:.2f}"
-            ], tags=[str(receipt.id)])
+        # Stream receipts into the table in chunks
+        rows = [([receipt.date, receipt.store_name, f"€{receipt.total_amount:.2f}"], [str(receipt.id)]) for receipt in receipts]
+        self.receipts_table.stream_rows(rows)
     
     def on_receipt_selected(self, event):
         """Handle receipt selection."""
@@ -352,18 +345,15 @@ class ReceiptsTab(BaseTab):
         if not self.selected_receipt:
             return
         
-        # Clear table
-        self.expenses_table.clear_data()
-        
-        # Add expenses to table
-        for i, expense in enumerate(self.selected_receipt.items):
-            self.expenses_table.add_row([
-                expense.name,
-                f"€{expense.price:.2f}",
-                str(expense.quantity),
-                f"€{expense.get_total_price():.2f}",
-                expense.category.value
-            ], tags=[str(i)])
+        # Stream expenses into the table, tagged with their index in the receipt
+        rows = (([
+            expense.name,
+            f"€{expense.price:.2f}",
+            str(expense.quantity),
+            f"€{expense.get_total_price():.2f}",
+            expense.category.value
+        ], [str(i)]) for i, expense in enumerate(self.selected_receipt.items))
+        self.expenses_table.stream_rows(rows)
     
     def add_receipt(self):
         """Add a new receipt."""
@@ -393,6 +383,7 @@ class ReceiptsTab(BaseTab):
             self.selected_receipt.date = data["date"]
             self.selected_receipt.store_name = data["store_name"]
             
+            self.main_window.mark_receipts_changed()
             self.main_window.save_data()
             self.refresh_data()
             self.show_receipt_details()
@@ -438,6 +429,7 @@ class ReceiptsTab(BaseTab):
             )
             
             self.selected_receipt.add_item(expense)
+            self.main_window.mark_receipts_changed()
             self.main_window.save_data()
             self.refresh_expenses_table()
             self.show_receipt_details()  # Refresh totals
@@ -461,6 +453,7 @@ class ReceiptsTab(BaseTab):
             # Update receipt totals
             self.selected_receipt._update_totals()
             
+            self.main_window.mark_receipts_changed()
             self.main_window.save_data()
             self.refresh_expenses_table()
             self.show_receipt_details()  # Refresh totals
@@ -480,6 +473,13 @@ class ReceiptsTab(BaseTab):
         self.selected_receipt.remove_item(self.selected_expense_index)
         self.selected_expense_index = None
         
+        # Drop the assignments too, or they would keep charging leaders for a deleted item
+        for leader in self.main_window.get_leaders():
+            if expense.id in leader.pa_purchases:
+                leader.remove_pa_purchase(expense.id, 0)
+        self.main_window.pa_index.remove_item(expense.id)
+        
+        self.main_window.mark_receipts_changed()
         self.main_window.save_data()
         self.refresh_expenses_table()
         self.show_receipt_details()  # Refresh totals
@@ -0,0 +1,37 @@
+"""
+Lazy imports for Kamp Finances application.
+Defers loading rarely used modules until one of their attributes is first used.
+"""
+
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+
+def lazy_import(name: str) -> ModuleType:
+    """Return a module that is only executed when one of its attributes is first accessed.
+
+    Use it at module level for code that most sessions never reach, e.g.
+    filedialog = lazy_import("tkinter.filedialog"). Already imported modules are
+    returned as is. The first attribute access must happen on the main thread;
+    the standard LazyLoader is not thread safe before Python 3.12.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    # Make the module reachable as an attribute of its package, like a normal import
+    parent_name, _, child_name = name.rpartition(".")
+    if parent_name:
+        setattr(sys.modules[parent_name], child_name, module)
+    return module
@@ -0,0 +1,183 @@
+"""
+Memory profiling mode for Kamp Finances application.
+Snapshots memory at checkpoints (data load, tab refresh, export) and reports the bytes
+per entity, Treeview rows, cache sizes and the growth since the previous checkpoint.
+
+Enable it with KAMP_MEMPROFILE=1. Every checkpoint prints one line and appends a full
+record to memory_profile.jsonl in the data folder, so a camp session that stays open
+for days can be checked for leaks afterwards.
+"""
+
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+import types
+from typing import Dict, List, Optional
+
+# Frames kept per allocation; one is enough to group by line
+TRACE_FRAMES = 1
+
+# Lines with the largest growth kept per checkpoint
+TOP_GROWTH = 10
+
+PROFILE_LOG = "memory_profile.jsonl"
+
+# Never walked when measuring objects: code, classes and anything holding a Tk interpreter
+_SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+
+_enabled = os.environ.get("KAMP_MEMPROFILE") == "1"
+_previous_snapshot = None
+_first_checkpoint: Optional[Dict] = None
+
+if _enabled:
+    tracemalloc.start(TRACE_FRAMES)
+
+def is_enabled() -> bool:
+    """Check whether checkpoints take snapshots."""
+    return _enabled
+
+def enable(enabled: bool = True):
+    """Start or stop the memory profiling mode."""
+    global _enabled, _previous_snapshot, _first_checkpoint
+    _enabled = enabled
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start(TRACE_FRAMES)
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+        _previous_snapshot = None
+        _first_checkpoint = None
+
+def deep_sizeof(obj, seen: set) -> int:
+    """Size in bytes of obj and everything it references that is not in seen yet."""
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIPPED_TYPES) or hasattr(current, "tk"):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        else:
+            if hasattr(current, "__dict__"):
+                stack.append(vars(current))
+            for slot in getattr(type(current), "__slots__", ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return size
+
+def rss_bytes() -> Optional[int]:
+    """Resident memory of the process, including Tk's own allocations, if the OS tells us."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+def entity_sizes(leaders: List, receipts: List, seen: set) -> Dict[str, Dict]:
+    """Count and measure the model objects; every object is only counted once."""
+    expenses = [item for receipt in receipts for item in receipt.items]
+    sizes = {}
+    # Items first, so a receipt's size does not include its items
+    for name, objects in (("Expense", expenses), ("Receipt", receipts), ("Leader", leaders)):
+        total = sum(deep_sizeof(obj, seen) for obj in objects)
+        sizes[name] = {
+            "count": len(objects),
+            "bytes": total,
+            "bytes_per_entity": round(total / len(objects)) if objects else 0,
+        }
+    return sizes
+
+def treeview_rows(main_window) -> Dict[str, int]:
+    """Count the rows of every table of the built tabs (their memory lives in Tk, not Python)."""
+    rows = {}
+    for tab in main_window.get_built_tabs():
+        for attr, value in vars(tab).items():
+            tree = getattr(value, "tree", None)
+            if tree is not None and hasattr(tree, "get_children"):
+                rows[f"{type(tab).__name__}.{attr}"] = len(tree.get_children())
+    return rows
+
+def cache_sizes(main_window, seen: set) -> Dict[str, int]:
+    """Measure the caches of the main window and tabs, without the models they point to."""
+    caches = {"pa_index": main_window.pa_index, "pa_item_lookup": main_window._pa_item_lookup}
+    for tab in main_window.get_built_tabs():
+        for attr, value in vars(tab).items():
+            if attr.endswith("_cache"):
+                caches[f"{type(tab).__name__}.{attr}"] = value
+    return {name: deep_sizeof(cache, seen) for name, cache in caches.items()}
+
+def top_growth(snapshot, previous) -> List[Dict]:
+    """Get the source lines whose allocations grew the most since the previous snapshot."""
+    growth = []
+    for stat in snapshot.compare_to(previous, "lineno")[:TOP_GROWTH]:
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        growth.append({
+            "line": f"{frame.filename}:{frame.lineno}",
+            "size_diff": stat.size_diff,
+            "count_diff": stat.count_diff,
+        })
+    return growth
+
+def format_bytes(size: float) -> str:
+    """Format a byte count for the console."""
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def checkpoint(label: str, main_window) -> Optional[Dict]:
+    """Take a snapshot, print a summary line and append the full record to the profile log."""
+    global _previous_snapshot, _first_checkpoint
+    if not _enabled:
+        return None
+
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+    traced, peak = tracemalloc.get_traced_memory()
+
+    # Models first, then caches, so a cache is not charged for the leaders it points to
+    seen = set()
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "label": label,
+        "traced_bytes": traced,
+        "peak_bytes": peak,
+        "rss_bytes": rss_bytes(),
+        "entities": entity_sizes(main_window.get_leaders(), main_window.get_receipts(), seen),
+        "treeview_rows": treeview_rows(main_window),
+        "caches": cache_sizes(main_window, seen),
+        "growth": top_growth(snapshot, _previous_snapshot) if _previous_snapshot is not None else [],
+    }
+    _previous_snapshot = snapshot
+    if _first_checkpoint is None:
+        _first_checkpoint = record
+
+    entities = " | ".join(
+        f"{name} {values['count']} x {format_bytes(values['bytes_per_entity'])}"
+        for name, values in record["entities"].items()
+    )
+    since_start = traced - _first_checkpoint["traced_bytes"]
+    print(f"🧠 [{label}] traced {format_bytes(traced)} ({since_start:+,} B since start) | "
+          f"{entities} | tree rows {sum(record['treeview_rows'].values())} | "
+          f"caches {format_bytes(sum(record['caches'].values()))}")
+
+    try:
+        with open(os.path.join(main_window.data_service.data_dir, PROFILE_LOG), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"⚠️  Could not write memory profile: {e}")
+    return record
@@ -0,0 +1,17 @@
+"""
+Application paths for Kamp Finances application.
+The data folder lives in the project root, or next to the executable in a frozen
+build, so it is the same folder whichever directory the app is started from.
+"""
+
+import os
+import sys
+
+def app_root() -> str:
+    """Folder holding the app: the executable's folder when frozen, otherwise the project root."""
+    if getattr(sys, "frozen", False):
+        return os.path.dirname(os.path.abspath(sys.executable))
+    # src/utils/paths.py -> project root
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_DATA_DIR = os.path.join(app_root(), "data")
@@ -0,0 +1,148 @@
+"""
+Performance instrumentation for Kamp Finances application.
+Collects hot-path timings in per-name ring buffers; does almost nothing while disabled.
+
+Enable it with KAMP_PERF=1 or enable() at runtime (Ctrl+Shift+P in the app).
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+# Most recent timings kept per name; percentiles are computed over these
+RING_SIZE = 512
+
+_enabled = os.environ.get("KAMP_PERF") == "1"
+_histograms: Dict[str, "TimingHistogram"] = {}
+_lock = threading.Lock()
+
+class TimingHistogram:
+    """Timings of one named operation: total count and max, plus a ring buffer of recent durations."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=RING_SIZE)
+
+    def record(self, seconds: float):
+        """Add one duration in seconds."""
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Get a percentile (0.5 = median) of the recent durations, in seconds."""
+        values = sorted(self.recent)
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+    def to_dict(self) -> Dict:
+        """Summarize the histogram in milliseconds."""
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "p50_ms": round(self.percentile(0.5) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+def is_enabled() -> bool:
+    """Check whether timings are being collected."""
+    return _enabled
+
+def enable(enabled: bool = True):
+    """Start or stop collecting timings."""
+    global _enabled
+    _enabled = enabled
+
+def record(name: str, seconds: float):
+    """Record a duration for a name, if instrumentation is enabled."""
+    if not _enabled:
+        return
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _lock:
+            histogram = _histograms.setdefault(name, TimingHistogram(name))
+    histogram.record(seconds)
+
+class _Timer:
+    """Context manager that records the time spent in its block."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+class _NoTimer:
+    """Shared do-nothing context manager returned while disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NO_TIMER = _NoTimer()
+
+def timer(name: str):
+    """Time a block: with perf.timer("DataService.load_receipts"): ..."""
+    return _Timer(name) if _enabled else _NO_TIMER
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorator recording the duration of every call, under name or the function's qualified name."""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def get_stats() -> Dict[str, Dict]:
+    """Get the summary of every histogram, slowest total first."""
+    with _lock:
+        histograms = list(_histograms.values())
+    stats = {histogram.name: histogram.to_dict() for histogram in histograms}
+    return dict(sorted(stats.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+
+def reset():
+    """Forget all collected timings."""
+    with _lock:
+        _histograms.clear()
+
+def dump_json(file_path: str) -> str:
+    """Write the current statistics to a JSON file and return its path."""
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump({"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "timings": get_stats()}, f, indent=2)
+    return file_path
+
+def format_top(limit: int = 3) -> str:
+    """Format the operations with the highest p95 for a status bar."""
+    stats = sorted(get_stats().items(), key=lambda item: item[1]["p95_ms"], reverse=True)[:limit]
+    return " | ".join(f"{name} p95 {values['p95_ms']:.0f} ms" for name, values in stats)
@@ -0,0 +1,324 @@
+"""
+SQL query tracing for Kamp Finances application.
+Times every statement on a traced connection and logs the slow ones with their query plan.
+
+Enable it with KAMP_SQL_TRACE=1 (KAMP_SLOW_QUERY_MS sets the threshold), --trace-sql
+on the command line or enable() at runtime. Logs rotate in the data folder:
+sql_trace.log has every statement, slow_queries.log the slow ones with EXPLAIN QUERY PLAN.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import logging
+
+# Statements slower than this go to the slow-query log
+DEFAULT_SLOW_QUERY_MS = 50.0
+
+# The progress handler runs every this many SQLite VM instructions
+PROGRESS_STEPS = 1000
+
+# Log rotation
+LOG_MAX_BYTES = 1_000_000
+LOG_BACKUPS = 3
+
+# Longer statements (mostly bound values) are cut off in the logs
+MAX_LOGGED_SQL = 500
+TRACE_LOG = "sql_trace.log"
+SLOW_QUERY_LOG = "slow_queries.log"
+
+_enabled = os.environ.get("KAMP_SQL_TRACE") == "1"
+_slow_query_ms = float(os.environ.get("KAMP_SLOW_QUERY_MS", DEFAULT_SLOW_QUERY_MS))
+_tracers: Dict[str, "QueryTracer"] = {}
+_lock = threading.Lock()
+
+def is_enabled() -> bool:
+    """Check whether new DataService connections are traced."""
+    return _enabled
+
+def enable(enabled: bool = True, slow_query_ms: Optional[float] = None):
+    """Start or stop tracing new connections, optionally changing the slow-query threshold."""
+    global _enabled, _slow_query_ms
+    _enabled = enabled
+    if slow_query_ms is not None:
+        _slow_query_ms = slow_query_ms
+        for tracer in _tracers.values():
+            tracer.slow_seconds = slow_query_ms / 1000.0
+
+def get_tracer(log_dir: str) -> "QueryTracer":
+    """Get the shared tracer writing its logs to log_dir."""
+    with _lock:
+        tracer = _tracers.get(log_dir)
+        if tracer is None:
+            tracer = _tracers[log_dir] = QueryTracer(log_dir, _slow_query_ms)
+        return tracer
+
+def _rotating_logger(name: str, file_path: str) -> "logging.Logger":
+    """Create a standalone logger writing to a rotating file."""
+    # logging.handlers pulls in socket and pickle, only worth it once tracing is on
+    import logging
+    import logging.handlers
+    logger = logging.Logger(name, logging.DEBUG)
+    handler = logging.handlers.RotatingFileHandler(
+        file_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8", delay=True
+    )
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(handler)
+    return logger
+
+def _one_line(sql: str) -> str:
+    """Collapse the whitespace of a statement onto one line and cut it off if too long."""
+    text = " ".join(sql.split())
+    return text if len(text) <= MAX_LOGGED_SQL else text[:MAX_LOGGED_SQL] + "..."
+
+
+class QueryTracer:
+    """Collects statement timings of traced connections and writes the trace and slow-query logs."""
+
+    def __init__(self, log_dir: str, slow_query_ms: float = DEFAULT_SLOW_QUERY_MS):
+        self.log_dir = log_dir
+        self.slow_seconds = slow_query_ms / 1000.0
+        self.trace_log = _rotating_logger("kamp.sql", os.path.join(log_dir, TRACE_LOG))
+        self.slow_log = _rotating_logger("kamp.sql.slow", os.path.join(log_dir, SLOW_QUERY_LOG))
+        self.statement_count = 0
+        self.slow_count = 0
+        self.total_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def connect(self, db_path: str, timeout: float = 5.0) -> sqlite3.Connection:
+        """Open a connection whose statements are traced."""
+        conn = sqlite3.connect(db_path, timeout=timeout, factory=TracedConnection)
+        conn.install(self)
+        return conn
+
+    def record(self, conn: "TracedConnection", sql: str, parameters, elapsed: float, rows: int, steps: int,
+               calls: int = 1, expanded_sql: Optional[str] = None):
+        """Log one finished statement (with its bound values when known); slow ones also get their query plan."""
+        with self._lock:
+            self.statement_count += 1
+            self.total_seconds += elapsed
+            slow = elapsed >= self.slow_seconds
+            if slow:
+                self.slow_count += 1
+
+        calls_text = f" x{calls}" if calls > 1 else ""
+        summary = f"{elapsed * 1000:9.2f} ms {rows:>8} rows {steps:>10} steps{calls_text}"
+        text = _one_line(expanded_sql or sql)
+        self.trace_log.debug(f"{summary}  {text}")
+        if slow:
+            plan = "\n".join(f"    {line}" for line in conn.explain(sql, parameters))
+            self.slow_log.warning(f"SLOW {summary}\n  {text}\n  plan:\n{plan}")
+
+    def summary(self) -> str:
+        """Describe what was traced so far."""
+        return (f"{self.statement_count} statements in {self.total_seconds * 1000:.0f} ms, "
+                f"{self.slow_count} slow (see {os.path.join(self.log_dir, SLOW_QUERY_LOG)})")
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors report every statement to a QueryTracer.
+
+    The trace callback captures the statement with its bound values and the
+    progress handler counts VM instructions, a measure of the work SQLite did
+    that does not depend on how busy the machine was.
+    """
+
+    def install(self, tracer: QueryTracer):
+        """Attach the tracer and install the SQLite callbacks."""
+        self.tracer = tracer
+        self.steps = 0
+        self.expanded_sql = None
+        self._explaining = False
+        self._pending = weakref.WeakSet()
+        # Callbacks hold a weak reference so the connection is freed as usual
+        ref = weakref.ref(self)
+        self.set_trace_callback(lambda statement: ref() and ref()._on_trace(statement))
+        self.set_progress_handler(lambda: ref() and ref()._on_progress(), PROGRESS_STEPS)
+
+    def _on_trace(self, statement: str):
+        """Remember the first statement SQLite runs for the current cursor call."""
+        if self.expanded_sql is None and not self._explaining and not statement.startswith("BEGIN"):
+            self.expanded_sql = statement
+        return None
+
+    def _on_progress(self) -> int:
+        """Count VM instructions; returning 0 lets the statement continue."""
+        self.steps += PROGRESS_STEPS
+        return 0
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or TracedCursor)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        self.finish_pending()
+        committing = self.in_transaction
+        start = time.perf_counter()
+        super().commit()
+        if committing:
+            self.tracer.record(self, "COMMIT", (), time.perf_counter() - start, 0, 0)
+
+    def close(self):
+        self.finish_pending()
+        super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.finish_pending()
+        committing = self.in_transaction and exc_type is None
+        start = time.perf_counter()
+        result = super().__exit__(exc_type, exc_value, traceback)
+        if committing:
+            self.tracer.record(self, "COMMIT", (), time.perf_counter() - start, 0, 0)
+        return result
+
+    def finish_pending(self):
+        """Log the statements of cursors whose rows were not read to the end."""
+        for cursor in list(self._pending):
+            cursor.finish()
+
+    def explain(self, sql: str, parameters) -> List[str]:
+        """Get the EXPLAIN QUERY PLAN of a statement as indented lines."""
+        if sql == "COMMIT":
+            return ["(transaction commit)"]
+        self._explaining = True
+        try:
+            rows = sqlite3.Cursor(self).execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+        except sqlite3.Error as e:
+            return [f"(no plan: {e})"]
+        finally:
+            self._explaining = False
+
+        depth = {0: -1}
+        lines = []
+        for node_id, parent_id, _, detail in rows:
+            depth[node_id] = depth.get(parent_id, -1) + 1
+            lines.append("  " * depth[node_id] + detail)
+        return lines or ["(no plan)"]
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor timing each statement from execute() until its last row was fetched."""
+
+    _statement = None
+
+    def execute(self, sql, parameters=()):
+        self.finish()
+        self._run(super().execute, sql, parameters)
+        self._statement["parameters"] = parameters
+        return self._complete()
+
+    def executemany(self, sql, seq_of_parameters):
+        self.finish()
+        # Keep the first parameters for the query plan and count the rest as they are consumed
+        first = []
+        calls = [0]
+
+        def counted():
+            for parameters in seq_of_parameters:
+                if not first:
+                    first.append(parameters)
+                calls[0] += 1
+                yield parameters
+
+        self._run(super().executemany, sql, counted())
+        self._statement["parameters"] = first[0] if first else ()
+        self._statement["calls"] = calls[0]
+        return self._complete()
+
+    def _run(self, method, sql, parameters):
+        """Run a statement and start timing it."""
+        conn = self.connection
+        conn.expanded_sql = None
+        steps = conn.steps
+        start = time.perf_counter()
+        method(sql, parameters)
+        self._statement = {
+            "sql": sql,
+            "parameters": (),
+            "expanded_sql": conn.expanded_sql,
+            "elapsed": time.perf_counter() - start,
+            "steps": conn.steps - steps,
+            "rows": 0,
+            "calls": 1,
+        }
+
+    def _complete(self):
+        """Finish a statement without rows right away, leave a query pending until its rows are fetched."""
+        if self.description is None:
+            # Not a query, so it is done: count the changed rows
+            self._statement["rows"] = max(self.rowcount, 0)
+            self.finish()
+        else:
+            self.connection._pending.add(self)
+        return self
+
+    def _fetch(self, method, *args):
+        """Fetch rows, adding the time spent to the pending statement."""
+        statement = self._statement
+        if statement is None:
+            return method(*args)
+        steps = self.connection.steps
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            statement["elapsed"] += time.perf_counter() - start
+            statement["steps"] += self.connection.steps - steps
+
+    def fetchone(self):
+        row = self._fetch(super().fetchone)
+        if row is None:
+            self.finish()
+        elif self._statement is not None:
+            self._statement["rows"] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._fetch(super().fetchmany, self.arraysize if size is None else size)
+        if not rows:
+            self.finish()
+        elif self._statement is not None:
+            self._statement["rows"] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch(super().fetchall)
+        if self._statement is not None:
+            self._statement["rows"] += len(rows)
+        self.finish()
+        return rows
+
+    def __next__(self):
+        try:
+            row = self._fetch(super().__next__)
+        except StopIteration:
+            self.finish()
+            raise
+        if self._statement is not None:
+            self._statement["rows"] += 1
+        return row
+
+    def close(self):
+        self.finish()
+        super().close()
+
+    def finish(self):
+        """Report the pending statement, if any, to the tracer."""
+        statement = self._statement
+        if statement is None:
+            return
+        self._statement = None
+        conn = self.connection
+        conn._pending.discard(self)
+        conn.tracer.record(
+            conn, statement["sql"], statement["parameters"], statement["elapsed"],
+            statement["rows"], statement["steps"], statement["calls"], statement["expanded_sql"]
+        )
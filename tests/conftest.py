@@ -0,0 +1,9 @@
+"""
+Shared pytest setup for Kamp Finances application.
+Makes the modules in src importable the way run.py does.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
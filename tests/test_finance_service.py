@@ -0,0 +1,85 @@
+"""
+Bulk operation tests for Kamp Finances application.
+The batch APIs save every changed leader in one transaction, and a failed save
+leaves the leaders in memory as they were.
+"""
+
+import sqlite3
+
+import pytest
+
+from models.expense import Expense, ExpenseCategory
+from models.leader import Leader
+from models.receipt import Receipt
+from services.data_service import DataService
+from services.finance_service import FinanceService, _leader_state
+
+@pytest.fixture
+def camp(tmp_path):
+    """A saved camp with three leaders and one receipt with two PA items: (service, leaders, receipts)."""
+    data_service = DataService(str(tmp_path))
+    receipt = Receipt(date="2025-07-02", id="R1")
+    receipt.add_item(Expense("Chips", 6.0, ExpenseCategory.PA, "2025-07-02", id="chips"))
+    receipt.add_item(Expense("Snoep", 3.0, ExpenseCategory.PA, "2025-07-02", id="snoep"))
+    jan = Leader("Jan", id="L1", poef_drink_count=2, paid_amount=5.0)
+    jan.add_pa_purchase("chips", 6.0)
+    leaders = [jan, Leader("Els", id="L2"), Leader("Tom", id="L3")]
+    data_service.save_all_data(leaders, [receipt])
+    return FinanceService(data_service), data_service.load_leaders(), data_service.load_receipts()
+
+def by_id(leaders) -> dict:
+    return {leader.id: leader for leader in leaders}
+
+def test_batch_updates_are_saved(camp):
+    service, leaders, receipts = camp
+
+    counts = service.set_poef_counts(leaders, {"L1": {"drinks": 4}, "L2": {"cigarettes": 3}, "L3": {}, "nobody": {}})
+    payments = service.record_payments(leaders, {"L1": 2.5, "L2": 10.0}, add=True)
+    assigned = service.assign_pa_items(leaders, receipts, {"chips": ["L2", "L3"], "snoep": ["L1"]})
+
+    assert (counts["updated"], counts["unchanged"], counts["unknown"]) == (2, 1, ["nobody"])
+    assert (counts["drinks_delta"], counts["cigarettes_delta"]) == (2, 3)
+    assert (payments["updated"], payments["paid_delta"]) == (2, 12.5)
+    assert (assigned["assignments_removed"], assigned["assignments_added"]) == (1, 3)
+
+    saved = by_id(service.data_service.load_leaders())
+    assert (saved["L1"].poef_drink_count, saved["L1"].paid_amount, saved["L1"].pa_purchases) == (4, 7.5, {"snoep": 3.0})
+    assert (saved["L2"].poef_cigarette_count, saved["L2"].paid_amount, saved["L2"].pa_purchases) == (3, 10.0, {"chips": 3.0})
+    assert saved["L3"].total_pa_expenses == 3.0
+
+    unassigned = service.unassign_pa_items(leaders, ["chips"])
+    assert (unassigned["leaders_updated"], unassigned["assignments_removed"]) == (2, 2)
+    assert by_id(service.data_service.load_leaders())["L2"].pa_purchases == {}
+
+def test_invalid_batch_changes_nothing(camp):
+    service, leaders, receipts = camp
+    before = [_leader_state(leader) for leader in leaders]
+
+    with pytest.raises(ValueError):
+        service.set_poef_counts(leaders, {"L2": {"drinks": 1}, "L1": {"drinks": -1}})
+    with pytest.raises(ValueError):
+        service.record_payments(leaders, {"L2": 1.0, "L1": -10.0}, add=True)
+    with pytest.raises(ValueError):
+        service.assign_pa_items(leaders, receipts, {"chips": ["L2", "nobody"]})
+
+    assert [_leader_state(leader) for leader in leaders] == before
+
+@pytest.mark.parametrize("operation", [
+    lambda service, leaders, receipts: service.set_poef_counts(leaders, {"L1": {"drinks": 9, "cigarettes": 9}}),
+    lambda service, leaders, receipts: service.record_payments(leaders, {"L1": 20.0, "L2": 1.0}),
+    lambda service, leaders, receipts: service.assign_pa_items(leaders, receipts, {"chips": ["L2"], "snoep": ["L1", "L3"]}),
+    lambda service, leaders, receipts: service.unassign_pa_items(leaders, ["chips"]),
+], ids=["set_poef_counts", "record_payments", "assign_pa_items", "unassign_pa_items"])
+def test_failed_save_restores_leaders_in_memory(camp, monkeypatch, operation):
+    service, leaders, receipts = camp
+    before = [_leader_state(leader) for leader in leaders]
+
+    def locked(changed):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(service.data_service, "update_leaders", locked)
+
+    with pytest.raises(sqlite3.OperationalError):
+        operation(service, leaders, receipts)
+
+    assert [_leader_state(leader) for leader in leaders] == before
+    assert [_leader_state(leader) for leader in service.data_service.load_leaders()] == before
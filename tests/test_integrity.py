@@ -0,0 +1,94 @@
+"""
+Integrity check tests for Kamp Finances application.
+A camp saved with a deleted PA item still assigned, a non-PA item assigned, a split
+that does not add up and stale totals is checked and repaired.
+"""
+
+import pytest
+
+from cli import main as cli_main
+from models.expense import Expense, ExpenseCategory
+from models.leader import Leader
+from models.receipt import Receipt
+from services import integrity_service
+from services.data_service import DataService
+
+@pytest.fixture
+def data_service(tmp_path):
+    """A camp database with one problem of every kind."""
+    service = DataService(str(tmp_path))
+    receipt = Receipt(date="2025-07-02", store_name="Colruyt", id="R1")
+    for item in (
+        Expense("Chips", 4.0, ExpenseCategory.PA, "2025-07-02", id="pa-split"),
+        Expense("Zonnecrème", 6.0, ExpenseCategory.PA, "2025-07-02", id="pa-ok"),
+        Expense("Brood", 3.0, ExpenseCategory.GROEPSKAS, "2025-07-02", id="groepskas"),
+    ):
+        receipt.add_item(item)
+    receipt.total_amount = 99.0  # stale
+
+    jan = Leader("Jan", id="L1")
+    jan.add_pa_purchase("pa-split", 1.0)  # with Els' share only 2.0 of 4.0
+    jan.add_pa_purchase("pa-ok", 6.0)
+    jan.add_pa_purchase("deleted-item", 2.5)  # orphaned
+    els = Leader("Els", id="L2")
+    els.add_pa_purchase("pa-split", 1.0)
+    els.add_pa_purchase("groepskas", 3.0)  # not a PA item
+    els.total_pa_expenses = 10.0  # stale
+
+    service.save_all_data([jan, els], [receipt])
+    return service
+
+def issue_kinds(issues) -> dict:
+    counts = {}
+    for issue in issues:
+        counts[issue.kind] = counts.get(issue.kind, 0) + 1
+    return counts
+
+def test_check_reports_every_problem(data_service):
+    issues = integrity_service.check_integrity(data_service.load_leaders(), data_service.load_receipts())
+
+    assert issue_kinds(issues) == {
+        "receipt_totals": 1,
+        "orphaned_assignment": 1,
+        "not_pa_assignment": 1,
+        "split_mismatch": 1,
+        "leader_pa_total": 1,
+    }
+    # Reported in repair order
+    assert [issue.kind for issue in issues] == list(integrity_service.ISSUE_KINDS)
+    subjects = {issue.kind: issue.subject_id for issue in issues}
+    assert subjects["orphaned_assignment"] == "L1"
+    assert subjects["not_pa_assignment"] == "L2"
+    assert subjects["split_mismatch"] == "pa-split"
+    assert subjects["leader_pa_total"] == "L2"
+
+def test_repair_fixes_everything_and_survives_a_reload(data_service):
+    leaders, receipts = data_service.load_leaders(), data_service.load_receipts()
+
+    result = integrity_service.repair_integrity(leaders, receipts)
+    data_service.save_all_data(leaders, receipts)
+
+    assert result["issues"] == 5
+    assert result["fixed"] == {kind: 1 for kind in integrity_service.ISSUE_KINDS}
+    assert {leader.id for leader in result["leaders"]} == {"L1", "L2"}
+    assert [receipt.id for receipt in result["receipts"]] == ["R1"]
+
+    leaders = {leader.id: leader for leader in data_service.load_leaders()}
+    [receipt] = data_service.load_receipts()
+    # Stale assignments are dropped, the bad split is shared equally again and totals match
+    assert leaders["L1"].pa_purchases == {"pa-split": 2.0, "pa-ok": 6.0}
+    assert leaders["L2"].pa_purchases == {"pa-split": 2.0}
+    assert leaders["L1"].total_pa_expenses == 8.0
+    assert leaders["L2"].total_pa_expenses == 2.0
+    assert (receipt.total_amount, receipt.pa_total, receipt.groepskas_total) == (13.0, 10.0, 3.0)
+    assert integrity_service.check_integrity(list(leaders.values()), [receipt]) == []
+
+def test_check_command_repairs_with_flag_only(data_service, capsys):
+    assert cli_main(["--data-dir", data_service.data_dir, "check"]) == 1
+    assert "5 problems found" in capsys.readouterr().out
+    # Without --repair nothing is written
+    assert len(integrity_service.check_integrity(data_service.load_leaders(), data_service.load_receipts())) == 5
+
+    assert cli_main(["--data-dir", data_service.data_dir, "check", "--repair"]) == 0
+    assert cli_main(["--data-dir", data_service.data_dir, "check"]) == 0
+    assert "No problems" in capsys.readouterr().out.splitlines()[-1]
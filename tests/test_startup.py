@@ -0,0 +1,36 @@
+"""
+Startup regression tests for Kamp Finances application.
+Fails when the GUI's startup imports load a module that should be deferred, and, when
+KAMP_IMPORT_BUDGET_MS is set, when they take longer than that budget.
+"""
+
+import importlib.util
+import os
+
+import pytest
+
+BENCH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "bench_import_time.py")
+
+# Fresh interpreters timed per check; the median is compared with the budget
+RUNS = 5
+
+def load_bench():
+    """Load the import time benchmark, which holds the budget and the deferred modules."""
+    spec = importlib.util.spec_from_file_location("bench_import_time", BENCH_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+bench = load_bench()
+
+# Import time depends on the machine, so the budget is only checked where it was set for it
+@pytest.mark.skipif("KAMP_IMPORT_BUDGET_MS" not in os.environ, reason="set KAMP_IMPORT_BUDGET_MS to check the import time")
+def test_startup_imports_within_budget():
+    startup_ms = bench.measure_startup_ms(RUNS)
+    assert startup_ms <= bench.IMPORT_BUDGET_MS, (
+        f"startup imports take {startup_ms:.1f} ms, budget is {bench.IMPORT_BUDGET_MS:.0f} ms; "
+        f"run benchmarks/bench_import_time.py to see the slowest modules"
+    )
+
+def test_deferred_modules_not_loaded_at_startup():
+    assert bench.find_loaded_deferred_modules() == []
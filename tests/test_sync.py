@@ -0,0 +1,107 @@
+"""
+Sync merge tests for Kamp Finances application.
+Two copies of one camp edit it independently and exchange changesets both ways.
+"""
+
+import sqlite3
+
+import pytest
+
+from services.data_generator import generate_camp
+from services.data_service import DataService
+from services.sync_service import SyncService
+
+@pytest.fixture
+def laptops(tmp_path):
+    """Two synced copies of a tiny camp: (service A, service B)."""
+    data_service = DataService(str(tmp_path / "a"))
+    generate_camp(data_service, "tiny")
+    laptop_a = SyncService(data_service.db_path)
+    laptop_a.record_local_changes()
+    # Laptop B starts from a copy of A's database, WAL included
+    (tmp_path / "b").mkdir()
+    laptop_b = SyncService(str(tmp_path / "b" / "kamp_finances.db"))
+    source, copy = sqlite3.connect(data_service.db_path), sqlite3.connect(laptop_b.db_path)
+    source.backup(copy)
+    source.close()
+    copy.close()
+    laptop_b.new_site()
+    sync(laptop_a, laptop_b, tmp_path)
+    return laptop_a, laptop_b
+
+def sync(laptop_a: SyncService, laptop_b: SyncService, tmp_path):
+    """Export both laptops' changes, then import each on the other laptop."""
+    a_path, b_path = str(tmp_path / "a.kampsync"), str(tmp_path / "b.kampsync")
+    laptop_a.export_changeset(a_path)
+    laptop_b.export_changeset(b_path)
+    return laptop_a.import_changeset(b_path), laptop_b.import_changeset(a_path)
+
+def execute(laptop: SyncService, sql: str, *params) -> list:
+    conn = sqlite3.connect(laptop.db_path)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+        conn.commit()
+        return rows
+    finally:
+        conn.close()
+
+def first_leader_id(laptop: SyncService) -> str:
+    return execute(laptop, "SELECT id FROM leaders ORDER BY rowid LIMIT 1")[0][0]
+
+def leader(laptop: SyncService, leader_id: str) -> tuple:
+    rows = execute(laptop, "SELECT name, poef_drink_count, paid_amount FROM leaders WHERE id = ?", leader_id)
+    return rows[0] if rows else None
+
+def test_edits_of_different_columns_merge(laptops, tmp_path):
+    laptop_a, laptop_b = laptops
+    leader_id = first_leader_id(laptop_a)
+    execute(laptop_b, "UPDATE leaders SET paid_amount = 10.5 WHERE id = ?", leader_id)
+    execute(laptop_a, "UPDATE leaders SET poef_drink_count = 7 WHERE id = ?", leader_id)
+
+    result_a, result_b = sync(laptop_a, laptop_b, tmp_path)
+
+    assert result_a["conflicts"] == result_b["conflicts"] == 0
+    assert leader(laptop_a, leader_id)[1:] == leader(laptop_b, leader_id)[1:] == (7, 10.5)
+    assert laptop_a.list_conflicts() == laptop_b.list_conflicts() == []
+
+def test_same_field_edits_are_recorded_as_conflicts(laptops, tmp_path):
+    laptop_a, laptop_b = laptops
+    leader_id = first_leader_id(laptop_a)
+    execute(laptop_a, "UPDATE leaders SET paid_amount = 12.5 WHERE id = ?", leader_id)
+    execute(laptop_b, "UPDATE leaders SET paid_amount = 17.5 WHERE id = ?", leader_id)
+
+    result_a, result_b = sync(laptop_a, laptop_b, tmp_path)
+
+    # Each laptop keeps its own value and knows the other one
+    assert result_a["conflicts"] == result_b["conflicts"] == 1
+    assert leader(laptop_a, leader_id)[2] == 12.5
+    assert leader(laptop_b, leader_id)[2] == 17.5
+    [conflict] = laptop_a.list_conflicts()
+    assert (conflict["column"], conflict["local_value"], conflict["incoming_value"]) == ("paid_amount", 12.5, 17.5)
+
+    # The value picked on one laptop wins on the other and settles its conflict too
+    assert laptop_a.resolve_conflict(conflict["id"], use_incoming=True)
+    sync(laptop_a, laptop_b, tmp_path)
+    assert leader(laptop_a, leader_id)[2] == leader(laptop_b, leader_id)[2] == 17.5
+    assert laptop_a.list_conflicts() == laptop_b.list_conflicts() == []
+
+def test_edit_beats_concurrent_delete(laptops, tmp_path):
+    laptop_a, laptop_b = laptops
+    leader_id = first_leader_id(laptop_a)
+    execute(laptop_a, "DELETE FROM leaders WHERE id = ?", leader_id)
+    execute(laptop_b, "UPDATE leaders SET paid_amount = 10.5 WHERE id = ?", leader_id)
+
+    sync(laptop_a, laptop_b, tmp_path)
+
+    assert leader(laptop_a, leader_id) == leader(laptop_b, leader_id)
+    assert leader(laptop_a, leader_id)[2] == 10.5
+
+def test_delete_without_concurrent_edit_is_applied(laptops, tmp_path):
+    laptop_a, laptop_b = laptops
+    leader_id = first_leader_id(laptop_a)
+    execute(laptop_a, "DELETE FROM leaders WHERE id = ?", leader_id)
+
+    sync(laptop_a, laptop_b, tmp_path)
+
+    assert leader(laptop_a, leader_id) is None
+    assert leader(laptop_b, leader_id) is None